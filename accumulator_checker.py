@@ -1,6 +1,23 @@
+import os
+
 import streamlit as st
 import pandas as pd
 
+from utils.accumulator import (
+    DEFAULT_TOLERANCE_DAYS,
+    PACKAGE_SIZE_COLUMN,
+    UNITS_COLUMN,
+    accumulation_ledger,
+    check_accumulation,
+    daily_units,
+    flag_accumulation,
+    ledger_summary,
+    package_sizes,
+)
+from utils.loaders import load_table
+from utils.streaming import DEFAULT_CHUNK_ROWS, read_flagged, stream_to_tempfile
+from utils.viewer import show_table
+
 st.set_page_config(page_title="Accumulator Checker", layout="wide")
 st.title("🧬 340B Accumulator & Claims Validator")
 
@@ -8,48 +25,107 @@ st.title("🧬 340B Accumulator & Claims Validator")
 accum_file = st.file_uploader("📦 Upload TPA Accumulator File", type=["xlsx", "csv"])
 claims_file = st.file_uploader("💊 Upload Claims or Dispenses File", type=["xlsx", "csv"])
 
-if accum_file and claims_file:
-    # Load files
-    acc_df = pd.read_excel(accum_file) if accum_file.name.endswith("xlsx") else pd.read_csv(accum_file)
-    claims_df = pd.read_excel(claims_file) if claims_file.name.endswith("xlsx") else pd.read_csv(claims_file)
+streaming = st.checkbox("🌊 Streaming mode for large CSV claim files (bounded memory)")
+chunk_rows = st.number_input(
+    "Rows per chunk", min_value=10_000, value=DEFAULT_CHUNK_ROWS, step=50_000, disabled=not streaming
+)
+
+with st.expander("📒 Accumulation Ledger Settings"):
+    tolerance_days = st.number_input(
+        "Posting date tolerance (days)", min_value=0, value=DEFAULT_TOLERANCE_DAYS, step=1
+    )
+    default_package_size = st.number_input(
+        f"Units per package (used when no '{PACKAGE_SIZE_COLUMN}' column is uploaded)",
+        min_value=1.0, value=1.0, step=1.0,
+    )
+
+
+def show_ledger(dispensed, acc_df, sizes=None):
+    """Render the accumulation ledger for claims (or their daily totals) against the postings.
+
+    ``sizes`` are per-NDC package sizes collected from streamed claims.
+    """
+    package_size = None
+    if PACKAGE_SIZE_COLUMN not in acc_df.columns and PACKAGE_SIZE_COLUMN not in dispensed.columns:
+        package_size = sizes if sizes is not None and not sizes.empty else default_package_size
+    ledger = accumulation_ledger(dispensed, acc_df, package_size=package_size, tolerance_days=int(tolerance_days))
+    summary = ledger_summary(ledger)
+
+    st.subheader("📒 Accumulation Ledger")
+    col1, col2 = st.columns(2)
+    col1.metric("Under-Accumulated Units", f"{summary['Under-Accumulated Units'].sum():,.0f}")
+    col2.metric("Over-Accumulated Units", f"{summary['Over-Accumulated Units'].sum():,.0f}")
+    st.dataframe(summary)
+
+    st.download_button("⬇️ Download Accumulation Ledger",
+                       ledger.to_csv(index=False),
+                       file_name="accumulation_ledger.csv",
+                       mime="text/csv")
+
+
+if accum_file and claims_file and streaming and claims_file.name.endswith("csv"):
+    acc_df = load_table(accum_file)
 
     st.subheader("📦 Accumulator Preview")
     st.dataframe(acc_df.head())
 
-    st.subheader("💊 Claims Preview")
-    st.dataframe(claims_df.head())
+    # Only one chunk of claims is in memory at a time; flags are appended to disk and
+    # each chunk is reduced to daily unit totals and package sizes for the ledger
+    daily, sizes = [], []
 
-    # Normalize dates
-    acc_df["Date"] = pd.to_datetime(acc_df["Date"])
-    claims_df["Date"] = pd.to_datetime(claims_df["Date"])
+    def screen(chunk):
+        if UNITS_COLUMN in chunk.columns:
+            daily.append(daily_units(chunk))
+            sizes.append(package_sizes(chunk))
+        return flag_accumulation(chunk, acc_df)
 
-    # Merge on NDC and Date
-    merged = pd.merge(claims_df, acc_df, on=["NDC", "Date"], how="left", suffixes=("_claim", "_accum"))
+    output_path, rows_read, rows_flagged = stream_to_tempfile(
+        claims_file, screen, chunksize=int(chunk_rows), prefix="accumulator_"
+    )
 
-    # Check accumulation presence
-    merged["Accumulated"] = merged["Account Type_accum"].notna()
+    st.subheader("🚨 Flagged Issues")
+    st.success(f"✅ Checked {rows_read:,} claims in chunks of {int(chunk_rows):,}; {rows_flagged:,} flagged.")
+    if rows_flagged:
+        st.dataframe(read_flagged(output_path, nrows=1000))
+        with open(output_path, "rb") as f:
+            st.download_button("⬇️ Download Issue Report",
+                               f,
+                               file_name="accumulator_issues.csv",
+                               mime="text/csv")
+    else:
+        st.info("No claims flagged.")
+    os.remove(output_path)
 
-    # Flag logic
-    def determine_issue(row):
-        if row["Billed 340B"] and not row["Accumulated"]:
-            return "❌ Claimed as 340B but not accumulated (Duplicate Risk)"
-        elif not row["Billed 340B"] and row["Accumulated"]:
-            return "⚠️ Accumulated but not billed as 340B (Lost Savings)"
-        else:
-            return ""
+    if daily:
+        sizes = pd.concat(sizes)
+        show_ledger(pd.concat(daily, ignore_index=True), acc_df, sizes[~sizes.index.duplicated()])
 
-    if "Billed 340B" in merged.columns:
-        merged["Issue"] = merged.apply(determine_issue, axis=1)
-    else:
-        merged["Issue"] = merged["Accumulated"].apply(lambda x: "" if x else "❌ No accumulation found")
+elif accum_file and claims_file:
+    if streaming:
+        st.warning("⚠️ Streaming mode needs a CSV claims file; checking in memory instead.")
+
+    # Load files
+    acc_df = load_table(accum_file)
+    claims_df = load_table(claims_file)
+
+    st.subheader("📦 Accumulator Preview")
+    st.dataframe(acc_df.head())
+
+    st.subheader("💊 Claims Preview")
+    st.dataframe(claims_df.head())
+
+    merged = check_accumulation(claims_df, acc_df)
 
     # Filter only issues
     flagged = merged[merged["Issue"] != ""]
 
     st.subheader("🚨 Flagged Issues")
-    st.dataframe(flagged)
+    show_table(flagged, key="flagged")
 
     st.download_button("⬇️ Download Issue Report",
                        flagged.to_csv(index=False),
                        file_name="accumulator_issues.csv",
                        mime="text/csv")
+
+    if UNITS_COLUMN in claims_df.columns:
+        show_ledger(claims_df, acc_df)
@@ -0,0 +1,192 @@
+"""Headless 340B Batch Runner
+
+Runs the screening analyses from the command line against files on disk, without
+Streamlit. Every primary input file (or manifest row) is one facility job, and jobs
+fan out across a process pool. Outputs use the same file names as the download
+buttons on the matching pages.
+
+Examples:
+    python batch.py compliance --claims "extracts/*/claims.csv" --providers providers.xlsx \\
+        --sites sites.xlsx --orphans orphans.xlsx --mef mef.xlsx --output out/
+    python batch.py invoices --manifest facilities.csv --format parquet --workers 8
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from utils.claims import flag_claims
+from utils.compliance import flag_violations
+from utils.invoice import flag_overcharges
+from utils.loaders import load_table
+from utils.ndc_migration import migration_report
+from utils.streaming import stream_flagged
+from utils.waste import waste_report
+
+# Each analysis: its inputs (the first is the per-facility primary file), optional
+# inputs, the function producing the report and the download file name it mirrors
+ANALYSES = {
+    "compliance": {
+        "inputs": ["claims", "providers", "sites", "orphans", "mef"],
+        "optional": [],
+        "run": flag_violations,
+        "output": "monthly_compliance_violations",
+        "streamable": True,
+    },
+    "invoices": {
+        "inputs": ["invoices", "prices"],
+        "optional": [],
+        "run": flag_overcharges,
+        "output": "overcharge_report",
+        "streamable": True,
+    },
+    "medicaid": {
+        "inputs": ["claims", "plans"],
+        "optional": [],
+        "run": flag_claims,
+        "output": "medicaid_claim_issues",
+        "streamable": True,
+    },
+    "migration": {
+        "inputs": ["accumulator", "migration"],
+        "optional": [],
+        "run": migration_report,
+        "output": "ndc_migration_report",
+        "streamable": False,
+    },
+    "waste": {
+        "inputs": ["encounters", "dispenses"],
+        "optional": ["prices", "packages"],
+        "run": waste_report,
+        "output": "waste_recovery_report",
+        "streamable": False,
+    },
+}
+
+
+def run_job(analysis, facility, paths, output_dir, fmt="csv", chunk_rows=None):
+    """Run one analysis for one facility and write its report. Returns a summary row."""
+    spec = ANALYSES[analysis]
+    started = time.perf_counter()
+    facility_dir = os.path.join(output_dir, facility)
+    os.makedirs(facility_dir, exist_ok=True)
+    output_path = os.path.join(facility_dir, f"{spec['output']}.{fmt}")
+
+    primary, *references = spec["inputs"]
+    optional = [paths.get(name) for name in spec["optional"]]
+    refs = [load_table(paths[name]) for name in references]
+    refs += [load_table(path) if path else None for path in optional]
+
+    if chunk_rows and spec["streamable"] and fmt == "csv" and paths[primary].lower().endswith(".csv"):
+        rows_in, rows_out = stream_flagged(
+            paths[primary], lambda chunk: spec["run"](chunk, *refs), output_path, chunk_rows
+        )
+    else:
+        data = load_table(paths[primary])
+        report = spec["run"](data, *refs)
+        if fmt == "parquet":
+            report.to_parquet(output_path, index=False)
+        else:
+            report.to_csv(output_path, index=False)
+        rows_in, rows_out = len(data), len(report)
+
+    return {
+        "Facility": facility,
+        "Analysis": analysis,
+        "Rows Read": rows_in,
+        "Rows Written": rows_out,
+        "Output": output_path,
+        "Seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def facility_names(files):
+    """Name each matched file's job: its facility folder when those are distinct, else the file.
+
+    Folders name the jobs only when every file sits in a different one; otherwise the
+    file name is used, prefixed with its folder if file names repeat too.
+    """
+    parents = [os.path.basename(os.path.dirname(path)) for path in files]
+    stems = [os.path.splitext(os.path.basename(path))[0] for path in files]
+    if len(files) > 1 and all(parents) and len(set(parents)) == len(files):
+        return parents
+    if len(set(stems)) == len(files):
+        return stems
+    return [f"{parent}_{stem}" if parent else stem for parent, stem in zip(parents, stems)]
+
+
+def build_jobs(analysis, args):
+    """Expand CLI globs or a manifest into (facility, input paths) jobs."""
+    spec = ANALYSES[analysis]
+    names = spec["inputs"] + spec["optional"]
+    defaults = {name: getattr(args, name) for name in names if getattr(args, name)}
+
+    if args.manifest:
+        manifest = pd.read_csv(args.manifest, dtype=str)
+        jobs = []
+        for i, row in manifest.iterrows():
+            paths = dict(defaults)
+            paths.update({name: row[name] for name in names if name in row and pd.notna(row[name])})
+            facility = row.get("facility") if pd.notna(row.get("facility")) else f"facility_{i + 1}"
+            jobs.append((facility, paths))
+    else:
+        primary = spec["inputs"][0]
+        files = sorted(glob.glob(defaults.get(primary, "")))
+        jobs = [(facility, dict(defaults, **{primary: path})) for facility, path in zip(facility_names(files), files)]
+
+    # Facilities share an output folder by name, so a duplicate would overwrite another's reports
+    counts = pd.Series([facility for facility, _ in jobs], dtype=object).value_counts()
+    if (counts > 1).any():
+        raise SystemExit(f"{analysis}: duplicate facility names: {', '.join(counts[counts > 1].index)}")
+
+    for facility, paths in jobs:
+        missing = [name for name in spec["inputs"] if name not in paths]
+        if missing:
+            raise SystemExit(f"{analysis}: facility '{facility}' is missing --{', --'.join(missing)}")
+    return jobs
+
+
+def main(argv=None):
+    """Parse arguments, fan the jobs out over a process pool and print a run summary."""
+    parser = argparse.ArgumentParser(description="Run 340B analyses on files without Streamlit.")
+    subparsers = parser.add_subparsers(dest="analysis", required=True)
+    for analysis, spec in ANALYSES.items():
+        sub = subparsers.add_parser(analysis)
+        for name in spec["inputs"] + spec["optional"]:
+            sub.add_argument(f"--{name}", help=f"{name} file (glob for the primary input)")
+        sub.add_argument("--manifest", help="CSV with a 'facility' column and one column per input")
+        sub.add_argument("--output", default="batch_output", help="output folder")
+        sub.add_argument("--format", choices=["csv", "parquet"], default="csv")
+        sub.add_argument("--workers", type=int, default=os.cpu_count())
+        sub.add_argument("--chunk-rows", type=int, help="stream CSV inputs in chunks of this many rows")
+
+    args = parser.parse_args(argv)
+    jobs = build_jobs(args.analysis, args)
+    if not jobs:
+        raise SystemExit("No input files matched.")
+
+    results = []
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = {
+            pool.submit(run_job, args.analysis, facility, paths, args.output, args.format, args.chunk_rows): facility
+            for facility, paths in jobs
+        }
+        for future in as_completed(futures):
+            try:
+                results.append(future.result())
+            except Exception as e:  # noqa: BLE001 - one bad extract should not stop the batch
+                results.append({"Facility": futures[future], "Analysis": args.analysis, "Error": f"{type(e).__name__}: {e}"})
+
+    summary = pd.DataFrame(results).sort_values("Facility")
+    summary.to_csv(os.path.join(args.output, f"{args.analysis}_batch_summary.csv"), index=False)
+    print(summary.to_string(index=False))
+    return 1 if "Error" in summary.columns and summary["Error"].notna().any() else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
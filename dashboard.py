@@ -0,0 +1,42 @@
+"""340B Program Dashboard
+
+Landing page of the 340B Program Manager: program summary metrics from the library store
+and links to every tool, grouped the same way as the sidebar.
+"""
+
+import streamlit as st
+
+from utils.navigation import SECTION_ICONS, SECTIONS
+from utils.store import count_distinct, count_rows
+
+st.set_page_config(page_title="340B Program Manager", layout="wide")
+st.title("🏥 340B Program Manager")
+
+st.markdown(
+    "Welcome to your centralized 340B program management platform. Select a tab to explore "
+    "compliance tools, financial analytics, operational modules, or audit preparation."
+)
+
+# Optional dashboard summary, answered by indexed queries against the library store
+st.subheader("📊 Program Summary Metrics")
+
+col1, col2, col3 = st.columns(3)
+with col1:
+    st.metric("Total Claims", f"{count_rows('compliance_flags'):,}")
+with col2:
+    flagged = count_rows("compliance_flags", {"Flag": "Yes"})
+    st.metric("Compliance Flags", f"{flagged:,}")
+with col3:
+    stores = count_distinct("contract_pharmacies", "Store ID")
+    st.metric("Contract Pharmacies", f"{stores:,}")
+
+# Grouped Module Links; pages open in this server and keep the session
+st.subheader("🧭 Navigation")
+
+tabs = st.tabs(list(SECTIONS))
+
+for tab, (section, pages) in zip(tabs, SECTIONS.items()):
+    with tab:
+        st.markdown(f"### {SECTION_ICONS[section]} {section}")
+        for path, title, icon in pages:
+            st.page_link(path, label=title, icon=icon)
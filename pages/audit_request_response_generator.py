@@ -4,10 +4,11 @@ Allows upload of HRSA audit request template and auto-populates data for a selec
 Parent Covered Entity (CE) from internal data sources like providers, contracts, and sites.
 """
 
-import os
-import pandas as pd
 import streamlit as st
 
+from utils.store import table_columns
+from utils.workbook import build_workbook
+
 st.set_page_config(page_title="📑 HRSA Audit Response Generator", layout="wide")
 st.title("📑 HRSA Audit Request Response Generator")
 
@@ -22,44 +23,37 @@ parent_ce = st.selectbox("🏥 Select Parent Covered Entity", [
     "CE003 - Community Clinic"
 ])
 
-# Load stored data files (example placeholders)
-provider_file = os.path.join("library", "provider_list.csv")
-contract_file = os.path.join("library", "contract_pharmacies.csv")
-claim_file = os.path.join("library", "compliance_flags.csv")
-site_file = os.path.join("library", "340B_site_crosswalk.csv")
+ce_id = parent_ce.split(" - ")[0]
 
-def load_file(path):
-    """Loads a CSV file from the library folder if available."""
-    return pd.read_csv(path) if os.path.exists(path) else pd.DataFrame()
 
-providers = load_file(provider_file)
-contracts = load_file(contract_file)
-claims = load_file(claim_file)
-sites = load_file(site_file)
+# Response tabs and the library tables behind them
+RESPONSE_TABS = {
+    "Providers": "provider_list",
+    "Claims": "compliance_flags",
+    "Contracts": "contract_pharmacies",
+    "Sites": "site_crosswalk",
+}
 
-if template_file:
-    try:
-        writer = pd.ExcelWriter("audit_response.xlsx", engine="xlsxwriter")
 
-        # Fill template with matching data (mock tab structure)
-        if not providers.empty:
-            providers.to_excel(writer, sheet_name="Providers", index=False)
-        if not claims.empty:
-            claims.to_excel(writer, sheet_name="Claims", index=False)
-        if not contracts.empty:
-            contracts.to_excel(writer, sheet_name="Contracts", index=False)
-        if not sites.empty:
-            sites.to_excel(writer, sheet_name="Sites", index=False)
+def ce_filter(table):
+    """Limits a library table to the selected CE when the table is tagged by CE ID."""
+    return {"CE ID": ce_id} if "CE ID" in table_columns(table) else None
 
-        writer.close()
 
-        with open("audit_response.xlsx", "rb") as f:
-            st.download_button(
-                label="⬇️ Download Completed Audit Response",
-                data=f,
-                file_name=f"HRSA_Audit_Response_{parent_ce.replace(' ', '_')}.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            )
+if template_file:
+    try:
+        # Stored data is only queried once a template is uploaded; tabs are read concurrently
+        # and streamed into an in-memory workbook built for this request alone
+        tabs = {sheet: (table, ce_filter(table)) for sheet, table in RESPONSE_TABS.items()}
+        workbook, summary = build_workbook(tabs)
+
+        st.download_button(
+            label="⬇️ Download Completed Audit Response",
+            data=workbook,
+            file_name=f"HRSA_Audit_Response_{parent_ce.replace(' ', '_')}.xlsx",
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        )
+        st.dataframe(summary, hide_index=True)
         st.success("✅ Audit response file generated and ready for download.")
     except (ValueError, IOError, KeyError) as e:
         st.error(f"❌ Error generating file: {e}")
@@ -4,9 +4,12 @@ Analyzes historical audit findings, compares them to current program data, and g
 risk scores, root cause analyses, and remediation plans.
 """
 
-import pandas as pd
 import streamlit as st
 
+from utils.audit_risk import BASE_SCORE, LOW_RISK, MAX_SCORE, area_risk, score_areas
+from utils.loaders import load_table
+from utils.viewer import show_table
+
 st.set_page_config(page_title="🛡️ Audit Risk Analyzer", layout="wide")
 st.title("🛡️ Audit Risk Analyzer and RCA Generator")
 
@@ -25,16 +28,8 @@ current_data_file = st.file_uploader(
 
 if findings_file and current_data_file:
     # Load files
-    past = (
-        pd.read_excel(findings_file)
-        if findings_file.name.endswith("xlsx")
-        else pd.read_csv(findings_file)
-    )
-    current = (
-        pd.read_excel(current_data_file)
-        if current_data_file.name.endswith("xlsx")
-        else pd.read_csv(current_data_file)
-    )
+    past = load_table(findings_file)
+    current = load_table(current_data_file)
 
     st.subheader("📊 Risk Scoring and Analysis")
     if "Finding Type" in past.columns and "Area Affected" in past.columns:
@@ -44,20 +39,15 @@ if findings_file and current_data_file:
         ) * 100
         st.dataframe(summary)
 
-    if "Area" in current.columns:
-        def assign_risk(area):
-            """Assigns a risk category based on audit history matching the area."""
-            if pd.isna(area):
-                return "Low Risk"
-            return next(
-                (ft for ft in past["Area Affected"].unique() if ft in str(area)),
-                "Low Risk"
-            )
-        current["Risk Category"] = current["Area"].map(assign_risk)
+    if "Area" in current.columns and "Area Affected" in past.columns:
+        # Finding areas are matched in one automaton pass per distinct area and scored by
+        # frequency, severity and recency rather than a flat 90/10
+        st.markdown("**📚 Historical Risk by Finding Area**")
+        st.dataframe(area_risk(past), hide_index=True)
 
-        current["Risk Score"] = current["Risk Category"].apply(
-            lambda x: 90 if x != "Low Risk" else 10
-        )
+        # Scores from an earlier run in the upload are replaced, not joined alongside
+        scores = score_areas(current["Area"], past)
+        current = current.drop(columns=scores.columns, errors="ignore").join(scores)
 
         st.markdown("**🔍 Current Risk Profile by Area**")
         st.dataframe(
@@ -65,14 +55,18 @@ if findings_file and current_data_file:
         )
 
         st.subheader("🛠️ Root Cause and Remediation Suggestions")
-        flagged = current[current["Risk Score"] > 50].copy()
+        # Every area matching a past finding is flagged unless a higher cutoff is chosen
+        min_score = st.slider(
+            "Minimum Risk Score to include", min_value=BASE_SCORE, max_value=MAX_SCORE, value=BASE_SCORE
+        )
+        flagged = current[(current["Risk Category"] != LOW_RISK) & (current["Risk Score"] >= min_score)].copy()
         flagged["Root Cause"] = "Likely process gap or data mismatch"
         flagged["Suggested Fix"] = (
             "Review provider alignment, TPA logs, and 340B carve-in rules"
         )
         flagged["Owner"] = "Compliance Officer"
         flagged["Timeline"] = "30 days"
-        st.dataframe(flagged)
+        show_table(flagged, key="rca")
 
         st.download_button(
             label="⬇️ Download RCA Report",
@@ -2,29 +2,30 @@
 
 Allows submission of proposed program changes (e.g., new contracts, providers, drugs)
 and generates a cost-benefit summary, risk score, and implementation plan.
+
+Submissions are appended to the store's change log one row at a time; ROI and
+implementation-time rollups per change type are kept up to date as rows are appended.
 """
 
-import os
 import pandas as pd
 import streamlit as st
 from datetime import date
 
+from utils.store import append_rows, read_latest, read_table, table_version
+from utils.viewer import show_table
+
 st.set_page_config(page_title="📝 Change Evaluation Toolkit", layout="wide")
 st.title("📝 Change Evaluation Toolkit")
 
 st.markdown("Submit and evaluate proposed changes to your 340B program including provider, drug, contract, or operational changes. "
             "This tool will calculate estimated ROI, risk level, and build a timeline for implementation.")
 
-# Load prior submissions if exist
-data_path = "library"
-log_file = os.path.join(data_path, "change_evaluation_log.csv")
-if os.path.exists(log_file):
-    change_log = pd.read_csv(log_file)
-else:
-    change_log = pd.DataFrame(columns=[
-        "Change Type", "Description", "Go-Live Date", "Estimated Cost ($)", "Estimated Savings ($)",
-        "Risk Level", "ROI (%)", "Implementation Time (days)", "Submitted By", "Date Submitted"
-    ])
+LOG_COLUMNS = [
+    "Change Type", "Description", "Go-Live Date", "Estimated Cost ($)", "Estimated Savings ($)",
+    "Risk Level", "ROI (%)", "Implementation Time (days)", "Submitted By", "Date Submitted"
+]
+ROLLUP_TABLE = "change_evaluation_rollup"
+RECENT_ENTRIES = 20
 
 # Form submission
 st.subheader("📤 Submit New Change Request")
@@ -58,17 +59,48 @@ if submit:
         "Submitted By": submitted_by,
         "Date Submitted": date.today()
     }])
-    change_log = pd.concat([change_log, new_row], ignore_index=True)
-    change_log.to_csv(log_file, index=False)
+    append_rows("change_evaluation_log", new_row)
     st.success("✅ Change evaluation submitted and logged.")
 
-# Show all evaluations
+# Rollups per change type, kept up to date on every submission
+rollup = read_table(ROLLUP_TABLE)
+submissions = int(rollup["Rows"].sum()) if not rollup.empty else 0
+
+st.subheader("📊 Evaluation Rollup")
+col1, col2, col3 = st.columns(3)
+col1.metric("📝 Evaluations Logged", f"{submissions:,}")
+if submissions:
+    col2.metric("📈 Average ROI (%)", f"{rollup['ROI (%)'].sum() / submissions:,.2f}")
+    col3.metric("⏱️ Average Implementation Time (days)", f"{rollup['Implementation Time (days)'].sum() / submissions:,.1f}")
+    st.dataframe(pd.DataFrame({
+        "Change Type": rollup["Change Type"],
+        "Evaluations": rollup["Rows"],
+        "Average ROI (%)": (rollup["ROI (%)"] / rollup["Rows"]).round(2),
+        "Average Implementation Time (days)": (rollup["Implementation Time (days)"] / rollup["Rows"]).round(1),
+        "Total Estimated Cost ($)": rollup["Estimated Cost ($)"],
+        "Total Estimated Savings ($)": rollup["Estimated Savings ($)"],
+    }), hide_index=True)
+
 st.subheader("📋 Logged Change Evaluations")
-st.dataframe(change_log)
-
-st.download_button(
-    "⬇️ Download Evaluation Log",
-    data=change_log.to_csv(index=False),
-    file_name="change_evaluation_log.csv",
-    mime="text/csv"
-)
+st.caption(f"The {RECENT_ENTRIES} most recent evaluations, newest first.")
+recent = read_latest("change_evaluation_log", RECENT_ENTRIES)
+st.dataframe(recent.reindex(columns=LOG_COLUMNS) if recent.empty else recent, hide_index=True)
+
+
+@st.cache_data(show_spinner="Reading the evaluation log...")
+def full_log(version):
+    """Read the whole log once per store version of the table, which every write changes."""
+    change_log = read_table("change_evaluation_log")
+    return change_log if not change_log.empty else pd.DataFrame(columns=LOG_COLUMNS)
+
+
+if st.toggle("📚 Show full history and download"):
+    change_log = full_log(table_version("change_evaluation_log"))
+    show_table(change_log, key="change_log")
+
+    st.download_button(
+        "⬇️ Download Evaluation Log",
+        data=change_log.to_csv(index=False),
+        file_name="change_evaluation_log.csv",
+        mime="text/csv"
+    )
@@ -6,7 +6,11 @@ duplicate discounts or billing rule violations.
 """
 
 import streamlit as st
-import pandas as pd
+
+from utils.claims import build_plan_index, flag_claims
+from utils.loaders import content_key, load_table, source_bytes
+from utils.streaming import DEFAULT_CHUNK_ROWS, read_flagged, stream_cached
+from utils.viewer import show_table
 
 st.set_page_config(page_title="Medicaid Claims Validator", layout="wide")
 st.title("🧾 340B Medicaid Claims Validator")
@@ -15,59 +19,63 @@ st.title("🧾 340B Medicaid Claims Validator")
 claims_file = st.file_uploader("💊 Upload Medicaid Claims File", type=["xlsx", "csv"])
 bin_file = st.file_uploader("📚 Upload Medicaid BIN/PCN/Group Library", type=["xlsx", "csv"])
 
-if claims_file and bin_file:
-    # Read files into DataFrames
-    claims_df = (
-        pd.read_excel(claims_file)
-        if claims_file.name.endswith("xlsx")
-        else pd.read_csv(claims_file)
-    )
-    plans_df = (
-        pd.read_excel(bin_file)
-        if bin_file.name.endswith("xlsx")
-        else pd.read_csv(bin_file)
-    )
+streaming = st.checkbox("🌊 Streaming mode for large CSV claim files (bounded memory)")
+chunk_rows = st.number_input(
+    "Rows per chunk", min_value=10_000, value=DEFAULT_CHUNK_ROWS, step=50_000, disabled=not streaming
+)
 
-    st.subheader("💊 Claims Preview")
-    st.dataframe(claims_df.head())
+if claims_file and bin_file and streaming and claims_file.name.endswith("csv"):
+    plans_df = load_table(bin_file)
 
     st.subheader("📚 Plan Library Preview")
     st.dataframe(plans_df.head())
 
-    # Normalize fields for consistent matching
-    for col in ["BIN", "PCN", "Group"]:
-        if col in plans_df.columns:
-            plans_df[col] = plans_df[col].astype(str)
-        if col in claims_df.columns:
-            claims_df[col] = claims_df[col].astype(str)
-
-    # Merge on BIN/PCN/Group to map each claim to a plan
-    merged = pd.merge(
-        claims_df,
-        plans_df,
-        on=["BIN", "PCN", "Group"],
-        how="left",
-        suffixes=("", "_plan")
+    # Only one chunk of claims is in memory at a time; flags are appended to disk.
+    # The output is kept per pair of uploads, so reruns do not re-scan the file.
+    plan_index = build_plan_index(plans_df)
+    key = tuple(content_key(source_bytes(f)) for f in (claims_file, bin_file)) + (int(chunk_rows),)
+    output_path, rows_read, rows_flagged = stream_cached(
+        st.session_state,
+        key,
+        claims_file,
+        lambda chunk: flag_claims(chunk, plans_df, plan_index),
+        chunksize=int(chunk_rows),
+        prefix="medicaid_claims_",
     )
 
-    def flag_issue(row):
-        """Determine billing compliance based on claim and plan attributes."""
-        if pd.isna(row.get("Plan Name", None)):
-            return "❌ Unknown Plan (No 340B policy)"
-        if row["Claim Type"].upper() == "FFS":
-            if str(row.get("Modifier", "")).upper() not in ["UD", "U6"]:
-                return "❌ FFS claim missing required 340B modifier"
-        if row["Claim Type"].upper() == "MCO":
-            if row.get("Allow 340B", True) is False:
-                return "❌ MCO plan excludes 340B billing"
-        return ""
+    st.subheader("🚨 Flagged Claims")
+    st.success(f"✅ Validated {rows_read:,} claims in chunks of {int(chunk_rows):,}; {rows_flagged:,} flagged.")
+    if rows_flagged:
+        st.dataframe(read_flagged(output_path, nrows=1000))
+        with open(output_path, "rb") as f:
+            st.download_button(
+                label="⬇️ Download Claim Issues",
+                data=f,
+                file_name="medicaid_claim_issues.csv",
+                mime="text/csv"
+            )
+    else:
+        st.info("No claims flagged.")
+
+elif claims_file and bin_file:
+    if streaming:
+        st.warning("⚠️ Streaming mode needs a CSV claims file; validating in memory instead.")
 
-    merged["Issue"] = merged.apply(flag_issue, axis=1)
+    # Read files into DataFrames
+    claims_df = load_table(claims_file)
+    plans_df = load_table(bin_file)
+
+    st.subheader("💊 Claims Preview")
+    st.dataframe(claims_df.head())
+
+    st.subheader("📚 Plan Library Preview")
+    st.dataframe(plans_df.head())
 
-    flagged = merged[merged["Issue"] != ""]
+    flagged = flag_claims(claims_df, plans_df)
 
     st.subheader("🚨 Flagged Claims")
-    st.dataframe(flagged)
+    st.caption("Plans are matched on BIN+PCN+Group, then BIN+PCN, then BIN; see the 'Plan Match' column.")
+    show_table(flagged, key="flagged")
 
     st.download_button(
         label="⬇️ Download Claim Issues",
@@ -4,8 +4,14 @@ This module audits 340B compliance across all claims/dispenses by validating
 provider eligibility, site registration, Medicaid carve-in status, and orphan drug rules.
 """
 
-import streamlit as st
 import pandas as pd
+import streamlit as st
+
+from utils.compliance import flag_violations, screen_claims
+from utils.incremental import incremental_screen
+from utils.loaders import content_key, load_table, source_bytes
+from utils.streaming import DEFAULT_CHUNK_ROWS, read_flagged, stream_cached
+from utils.viewer import show_table
 
 st.set_page_config(
     page_title="340B Monthly Compliance Screener",
@@ -35,6 +41,12 @@ mef_file = st.file_uploader(
     type=["xlsx", "csv"]
 )
 
+streaming = st.checkbox("🌊 Streaming mode for large CSV claim files (bounded memory)")
+chunk_rows = st.number_input(
+    "Rows per chunk", min_value=10_000, value=DEFAULT_CHUNK_ROWS, step=50_000, disabled=not streaming
+)
+incremental = st.checkbox("♻️ Incremental mode (reuse results from earlier monthly runs)")
+
 # Proceed when all files are uploaded
 if all([
     dispense_file,
@@ -43,88 +55,72 @@ if all([
     orphan_file,
     mef_file
 ]):
-    claims = pd.read_excel(dispense_file) if dispense_file.name.endswith("xlsx") else pd.read_csv(
-        dispense_file
-    )
-    claims = (
-        pd.read_excel(dispense_file)
-        if dispense_file.name.endswith("xlsx")
-        else pd.read_csv(dispense_file)
-    )
-    providers = (
-        pd.read_excel(provider_file)
-        if provider_file.name.endswith("xlsx")
-        else pd.read_csv(provider_file)
-    )
-    sites = (
-        pd.read_excel(site_file)
-        if site_file.name.endswith("xlsx")
-        else pd.read_csv(site_file)
-    )
-    orphans = (
-        pd.read_excel(orphan_file)
-        if orphan_file.name.endswith("xlsx")
-        else pd.read_csv(orphan_file)
-    )
-    mef = (
-        pd.read_excel(mef_file)
-        if mef_file.name.endswith("xlsx")
-        else pd.read_csv(mef_file)
-    )
-
-    orphans = pd.read_excel(orphan_file) if orphan_file.name.endswith("xlsx") else pd.read_csv(
-        orphan_file
-    )
-    mef = pd.read_excel(mef_file) if mef_file.name.endswith("xlsx") else pd.read_csv(
-        mef_file
-    )
-
-    # Normalize date fields
-    claims["Date"] = pd.to_datetime(claims["Date"])
-    providers["Start Date"] = pd.to_datetime(providers["Start Date"])
-    providers["End Date"] = pd.to_datetime(providers["End Date"])
+    providers = load_table(provider_file)
+    sites = load_table(site_file)
+    orphans = load_table(orphan_file)
+    mef = load_table(mef_file)
 
-    # Merge all reference data into the claims
-    merged = pd.merge(claims, providers, on="NPI", how="left")
-    merged = pd.merge(merged, sites, on="Site", how="left")
-    merged["Orphan"] = merged["NDC"].isin(orphans["NDC"])
-    merged = pd.merge(merged, mef, on="NPI", how="left")
+    if streaming and dispense_file.name.endswith("csv"):
+        # Only one chunk of claims is in memory at a time; flags are appended to disk.
+        # The output is kept per set of uploads, so reruns do not re-scan the file.
+        files = [dispense_file, provider_file, site_file, orphan_file, mef_file]
+        key = tuple(content_key(source_bytes(f)) for f in files) + (int(chunk_rows),)
+        output_path, rows_read, rows_flagged = stream_cached(
+            st.session_state,
+            key,
+            dispense_file,
+            lambda chunk: flag_violations(chunk, providers, sites, orphans, mef),
+            chunksize=int(chunk_rows),
+            prefix="compliance_",
+        )
 
-    def check_compliance(row):
-        """Return a compliance flag based on all applicable 340B rules."""
-        if pd.isna(row["Provider Name"]):
-            return "❌ Invalid Provider"
-        if row["Date"] < row["Start Date"] or (
-            pd.notna(row["End Date"]) and row["Date"] > row["End Date"]
-        ):
-            return "❌ Provider Not Active"
-        if pd.isna(row["Site Type"]):
-            return "❌ Unregistered Site"
-        if (
-            row["Claim Type"] == "Medicaid"
-            and row.get("Carve-In", True) is False
-            and row.get("Billed 340B", False)
-        ):
-            return "❌ Duplicate Discount (Carved Out)"
-        if row["Orphan"] and row.get("Entity Type", "") in ["PED", "CAN", "CAH"]:
-            return "❌ Orphan Drug Restriction"
-        return "✅ Compliant"
+        st.subheader("🚨 Compliance Flags")
+        st.success(f"✅ Screened {rows_read:,} claims in chunks of {int(chunk_rows):,}; {rows_flagged:,} flagged.")
+        if rows_flagged:
+            st.dataframe(read_flagged(output_path, nrows=1000))
+            with open(output_path, "rb") as f:
+                st.download_button(
+                    label="⬇️ Download Compliance Report",
+                    data=f,
+                    file_name="monthly_compliance_violations.csv",
+                    mime="text/csv"
+                )
+        else:
+            st.info("No claims flagged.")
+    else:
+        if streaming:
+            st.warning("⚠️ Streaming mode needs a CSV claims file; screening in memory instead.")
+        claims = load_table(dispense_file)
 
-    merged["Compliance Status"] = merged.apply(check_compliance, axis=1)
+        if incremental:
+            # Only new claims, changed claims and claims whose reference entries changed are re-screened.
+            # A run is recorded once per set of uploads; reruns reuse its results.
+            files = [dispense_file, provider_file, site_file, orphan_file, mef_file]
+            key = ("incremental_screen",) + tuple(content_key(source_bytes(f)) for f in files)
+            if key not in st.session_state:
+                st.session_state[key] = incremental_screen(claims, providers, sites, orphans, mef)
+            merged, run = st.session_state[key]
+            watermark = run["Watermark"].iloc[0]
+            col1, col2, col3, col4 = st.columns(4)
+            col1.metric("Screened", f"{run['Screened'].iloc[0]:,}")
+            col2.metric("Reused", f"{run['Reused'].iloc[0]:,}")
+            col3.metric("Changed References", f"{run['Changed References'].iloc[0]:,}")
+            col4.metric("Watermark", "—" if pd.isna(watermark) else f"{watermark:%Y-%m-%d}")
+        else:
+            # Merge reference data and evaluate every rule as a vectorized mask
+            merged = screen_claims(claims, providers, sites, orphans, mef)
 
-    st.subheader("🧾 Compliance Screening Results")
-    st.dataframe(
-        merged[["NDC", "Site", "NPI", "Date", "Compliance Status"]]
-    )
+        st.subheader("🧾 Compliance Screening Results")
+        show_table(merged[["NDC", "Site", "NPI", "Date", "Compliance Status", "Violations"]], key="results")
 
-    violations = merged[merged["Compliance Status"] != "✅ Compliant"]
+        violations = merged[merged["Violation Mask"] != 0]
 
-    st.subheader("🚨 Compliance Flags")
-    st.dataframe(violations)
+        st.subheader("🚨 Compliance Flags")
+        show_table(violations, key="violations")
 
-    st.download_button(
-        label="⬇️ Download Compliance Report",
-        data=violations.to_csv(index=False),
-        file_name="monthly_compliance_violations.csv",
-        mime="text/csv"
-    )
+        st.download_button(
+            label="⬇️ Download Compliance Report",
+            data=violations.to_csv(index=False),
+            file_name="monthly_compliance_violations.csv",
+            mime="text/csv"
+        )
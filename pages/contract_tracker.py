@@ -3,11 +3,15 @@
 This module helps manage drug contracts by identifying expired, missing, or uncovered
 NDCs based on uploaded contract and invoice files.
 """
-from datetime import datetime, timedelta
+from datetime import datetime
 
 import streamlit as st
 import pandas as pd
 
+from utils.contracts import OVERLAP, contract_coverage, contract_status, coverage_issues
+from utils.loaders import load_table
+from utils.viewer import show_table
+
 st.set_page_config(page_title="340B Contract Tracker", layout="wide")
 st.title("📑 340B Contract & Coverage Manager")
 
@@ -21,11 +25,7 @@ invoice_file = st.file_uploader(
 )
 
 if contract_file:
-    contracts = (
-        pd.read_excel(contract_file)
-        if contract_file.name.endswith("xlsx")
-        else pd.read_csv(contract_file)
-    )
+    contracts = load_table(contract_file)
     contracts["Start Date"] = pd.to_datetime(contracts["Start Date"])
     contracts["End Date"] = pd.to_datetime(contracts["End Date"])
     today = pd.to_datetime(datetime.today().date())
@@ -33,43 +33,40 @@ if contract_file:
     st.subheader("📋 Contracts Preview")
     st.dataframe(contracts.head())
 
-    contracts["Status"] = contracts["End Date"].apply(
-        lambda x: (
-            "❌ Expired"
-            if x < today
-            else ("⚠️ Expires Soon" if x < today + timedelta(days=30) else "✅ Active")
-        )
-    )
+    contracts["Status"] = contract_status(contracts["End Date"], today)
 
     st.subheader("📅 Contract Status by Account Type")
-    st.dataframe(
-        contracts[["NDC", "Account Type", "Wholesaler", "End Date", "Status"]]
-    )
+    show_table(contracts[["NDC", "Account Type", "Wholesaler", "End Date", "Status"]], key="contract_status")
 
-    if invoice_file:
-        invoice = (
-            pd.read_excel(invoice_file)
-            if invoice_file.name.endswith("xlsx")
-            else pd.read_csv(invoice_file)
-        )
+    # Gaps and overlaps across the whole contract book, per NDC and account type
+    issues = coverage_issues(contracts)
+    overlaps = int((issues["Issue"] == OVERLAP).sum())
 
-        merged = pd.merge(invoice, contracts, on="NDC", how="left")
+    st.subheader("🧭 Coverage Gaps and Overlapping Contracts")
+    col1, col2 = st.columns(2)
+    col1.metric("Coverage Gaps", f"{len(issues) - overlaps:,}")
+    col2.metric("Overlapping Contract Periods", f"{overlaps:,}")
+    show_table(issues, key="coverage_issues")
 
-    def coverage_flag(row):
-        """Return contract coverage status for each invoice row based on contract matching."""
-        if pd.isna(row["Wholesaler"]):
-            return "❌ Not Under Any Contract"
-        if row["End Date"] < today:
-            return "❌ Contract Expired"
-        return "✅ Covered"
+    st.download_button(
+        label="⬇️ Download Gap and Overlap Report",
+        data=issues.to_csv(index=False),
+        file_name="contract_gap_overlap_report.csv",
+        mime="text/csv"
+    )
 
     if invoice_file:
-        merged["Contract Coverage Status"] = merged.apply(coverage_flag, axis=1)
+        invoice = load_table(invoice_file)
+
+        # Each invoice line resolves to the contract in force on its purchase date
+        merged = contract_coverage(invoice, contracts, today)
 
         st.subheader("🔍 Invoice Coverage Validation")
-        st.dataframe(
-            merged[["NDC", "Drug Name", "Account Type_inv", "Contract Coverage Status"]]
-        )
+        columns = [
+            "NDC", "Drug Name", "Account Type", "Wholesaler", "Purchase Date", "Invoice Date", "Date",
+            "Contract #", "Start Date", "End Date", "Contract Coverage Status",
+        ]
+        show_table(merged[[c for c in columns if c in merged.columns]], key="invoice_coverage")
 
         st.download_button(
             label="⬇️ Download Coverage Report",
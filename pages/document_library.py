@@ -4,23 +4,9 @@ Allows users to upload, categorize, store, and view a searchable list of histori
 such as pricing files, cost reports, contracts, and invoice exports.
 """
 
-import os
-from datetime import datetime
-
-import pandas as pd
 import streamlit as st
 
-# Constants should be uppercase
-LIBRARY_FOLDER = "library"
-os.makedirs(LIBRARY_FOLDER, exist_ok=True)
-
-INDEX_FILE = os.path.join(LIBRARY_FOLDER, "library_index.csv")
-
-# Load or create the index log
-if os.path.exists(INDEX_FILE):
-    index_df = pd.read_csv(INDEX_FILE)
-else:
-    index_df = pd.DataFrame(columns=["Filename", "Category", "Upload Date", "Path"])
+from utils.library import add_document, library_index, search_library
 
 st.set_page_config(page_title="📂 Document Library", layout="wide")
 st.title("📂 340B Document Library")
@@ -39,23 +25,30 @@ category = st.selectbox(  # type: ignore[attr-defined]
 )
 
 if uploaded_file and category:
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    SAVE_NAME = f"{timestamp}_{uploaded_file.name}"
-    save_path = os.path.join(LIBRARY_FOLDER, SAVE_NAME)
-
-    with open(save_path, "wb") as f:
-        f.write(uploaded_file.getbuffer())  # type: ignore[attr-defined]
-
-    new_entry = {
-        "Filename": uploaded_file.name,
-        "Category": category,
-        "Upload Date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        "Path": save_path
-    }
-    index_df = pd.concat([index_df, pd.DataFrame([new_entry])], ignore_index=True)
-    index_df.to_csv(INDEX_FILE, index=False)
-
-    st.success(f"✅ File '{uploaded_file.name}' uploaded and stored under '{category}'.")
+    # Streamlit reruns the page on every interaction; each upload is stored once per session
+    stored = st.session_state.setdefault("library_uploads", {})
+    upload_key = (uploaded_file.file_id, category)
+    if upload_key not in stored:
+        stored[upload_key] = add_document(uploaded_file, uploaded_file.name, category)
+    _, added = stored[upload_key]
+
+    if added:
+        st.success(f"✅ File '{uploaded_file.name}' uploaded and stored under '{category}'.")
+    else:
+        st.info(f"ℹ️ '{uploaded_file.name}' is already in the library under '{category}'; it was not stored again.")
+
+index_df = library_index()
+
+st.subheader("🔎 Search Documents")
+query = st.text_input("Find stored documents mentioning an NDC, NPI or site address")
+if query:
+    # Answered from the identifier postings built at upload; no spreadsheet is re-read
+    hits = search_library(query)
+    if hits.empty:
+        st.info(f"ℹ️ No stored document mentions '{query}'.")
+    else:
+        st.caption(f"{len(hits):,} mentions in {hits['SHA-256'].nunique():,} documents")
+        st.dataframe(hits)
 
 st.subheader("📚 Stored Documents")
 st.dataframe(index_df)
@@ -5,7 +5,10 @@ to identify potential overcharges and pricing discrepancies.
 """
 
 import streamlit as st
-import pandas as pd
+
+from utils.invoice import flag_overcharges, overcharge_rollup, price_history, store_price_history
+from utils.loaders import content_key, load_table, source_bytes
+from utils.viewer import show_table
 
 st.set_page_config(page_title="Invoice Price Validator", layout="wide")
 st.title("💰 340B Invoice Overcharge Checker")
@@ -18,18 +21,14 @@ price_file = st.file_uploader(
     "💸 Upload 340B Ceiling Price File",
     type=["xlsx", "csv"]
 )
+use_history = st.checkbox(
+    "📚 Save ceiling prices to the price history and check invoices against every stored quarter",
+    value=True,
+)
 
 if invoice_file and price_file:
-    invoice_df = (
-        pd.read_excel(invoice_file)
-        if invoice_file.name.endswith("xlsx")
-        else pd.read_csv(invoice_file)
-    )
-    price_df = (
-        pd.read_excel(price_file)
-        if price_file.name.endswith("xlsx")
-        else pd.read_csv(price_file)
-    )
+    invoice_df = load_table(invoice_file)
+    price_df = load_table(price_file)
 
     st.subheader("📦 Invoice Preview")
     st.dataframe(invoice_df.head())
@@ -37,17 +36,34 @@ if invoice_file and price_file:
     st.subheader("📈 Ceiling Price Preview")
     st.dataframe(price_df.head())
 
-    merged = pd.merge(invoice_df, price_df, on="NDC", how="left")
-
-    merged["Overcharged"] = merged["Unit Price"] > merged["Ceiling Price"]
-    merged["Overcharge Amount"] = (
-        merged["Unit Price"] - merged["Ceiling Price"]
-    ).clip(lower=0)
+    if use_history and "Effective Date" in price_df.columns:
+        # Each price file is saved once; reruns reuse the history read after saving it
+        key = ("price_history", content_key(source_bytes(price_file)))
+        if key not in st.session_state:
+            added, replaced = store_price_history(price_df)
+            st.session_state[key] = (added, replaced, price_history())
+        added, replaced, price_df = st.session_state[key]
+        st.info(
+            f"📚 {added:,} new prices saved and {replaced:,} corrected prices replaced; checking against "
+            f"{len(price_df):,} prices from {price_df['Effective Date'].nunique():,} effective dates."
+        )
+    elif use_history:
+        st.warning("⚠️ The price file has no 'Effective Date' column, so it was not added to the history.")
 
-    overcharged = merged[merged["Overcharged"]]
+    overcharged = flag_overcharges(invoice_df, price_df)
 
     st.subheader("⚠️ Overcharged Items")
-    st.dataframe(overcharged)
+    show_table(overcharged, key="overcharged")
+
+    st.subheader("🏭 Overcharges by Manufacturer and Quarter")
+    rollup = overcharge_rollup(overcharged)
+    st.dataframe(rollup)
+    st.download_button(
+        label="⬇️ Download Overcharge Rollup",
+        data=rollup.to_csv(index=False),
+        file_name="overcharge_rollup.csv",
+        mime="text/csv"
+    )
 
     st.download_button(
         label="⬇️ Download Overcharge Report",
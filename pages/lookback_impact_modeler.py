@@ -6,7 +6,9 @@ and financial performance change with different configurations.
 
 import pandas as pd
 import streamlit as st
-from datetime import timedelta
+
+from utils.loaders import load_table
+from utils.lookback import MAX_WINDOW_DAYS, eligible_dispenses, lookback_grid, qualifies, visit_gaps
 
 st.set_page_config(page_title="🕒 Lookback Impact Modeler", layout="wide")
 st.title("🕒 Lookback Impact Modeler")
@@ -21,45 +23,51 @@ st.markdown(
 dispense_file = st.file_uploader("📄 Upload Dispensed Drug File", type=["xlsx", "csv"])
 visit_file = st.file_uploader("🩺 Upload Encounter Visit File", type=["xlsx", "csv"])
 
-before_days = st.slider("⬅️ Lookback Days BEFORE Dispense", min_value=0, max_value=30, value=4)
-after_days = st.slider("➡️ Lookback Days AFTER Dispense", min_value=0, max_value=30, value=4)
+before_days = st.slider("⬅️ Lookback Days BEFORE Dispense", min_value=0, max_value=MAX_WINDOW_DAYS, value=4)
+after_days = st.slider("➡️ Lookback Days AFTER Dispense", min_value=0, max_value=MAX_WINDOW_DAYS, value=4)
+
+
+@st.cache_data(show_spinner="Indexing encounters...")
+def cached_visit_gaps(disp, visits):
+    """Compute dispense-to-visit gaps once per pair of uploaded files."""
+    return visit_gaps(disp, visits)
+
 
 if dispense_file and visit_file:
-    disp = (
-        pd.read_excel(dispense_file)
-        if dispense_file.name.endswith("xlsx")
-        else pd.read_csv(dispense_file)
-    )
-    visits = (
-        pd.read_excel(visit_file)
-        if visit_file.name.endswith("xlsx")
-        else pd.read_csv(visit_file)
-    )
+    disp = load_table(dispense_file)
+    visits = load_table(visit_file)
 
     # Expected columns
     disp["Dispense Date"] = pd.to_datetime(disp["Dispense Date"])
     visits["Visit Date"] = pd.to_datetime(visits["Visit Date"])
 
-    merged = disp.merge(visits, on="Patient ID", suffixes=("_disp", "_visit"))
-
-    def is_eligible(row):
-        """Returns True if visit is within the lookback window around the dispense date."""
-        start = row["Dispense Date"] - timedelta(days=before_days)
-        end = row["Dispense Date"] + timedelta(days=after_days)
-        return start <= row["Visit Date"] <= end
-
-    merged["Eligible"] = merged.apply(is_eligible, axis=1)
-
-    eligible = merged[merged["Eligible"]].sort_values("Visit Date", ascending=False)
-    eligible = eligible.drop_duplicates(subset=["Dispense ID"])
+    # Window-independent gaps to the nearest visit; slider moves only re-threshold them
+    gaps = cached_visit_gaps(disp, visits)
+    eligible = eligible_dispenses(disp, visits, gaps, before_days, after_days)
 
+    savings = None
     if "Unit Price ($)" in disp.columns and "Quantity" in disp.columns:
-        disp["Qualified"] = disp["Dispense ID"].isin(eligible["Dispense ID"])
+        disp["Qualified"] = qualifies(gaps, before_days, after_days)
         disp["Potential Savings"] = disp["Quantity"] * disp["Unit Price ($)"]
+        savings = disp["Potential Savings"]
         impact = disp.groupby("Qualified")["Potential Savings"].sum().reset_index()
         st.subheader("💰 Financial Impact Summary")
         st.dataframe(impact)
 
+    st.subheader("🗺️ Lookback Sensitivity Grid")
+    grid = lookback_grid(gaps, savings)
+    metric = "Qualified Savings ($)" if savings is not None else "Qualified Dispenses"
+    heatmap = grid.pivot(index="Before Days", columns="After Days", values=metric)
+    st.caption(f"{metric} for every BEFORE (rows) × AFTER (columns) window")
+    st.dataframe(heatmap)
+
+    st.download_button(
+        label="⬇️ Download Sensitivity Heatmap",
+        data=heatmap.to_csv(),
+        file_name="lookback_sensitivity_heatmap.csv",
+        mime="text/csv"
+    )
+
     st.subheader("📋 Eligible Dispenses Based on Current Lookback")
     st.dataframe(eligible)
 
@@ -4,9 +4,10 @@ Manages state-specific manufacturer 340B restrictions and links restricted NDCs
 approved therapeutic or biosimilar alternatives. Also tracks markup logic for cost modeling.
 """
 
-import pandas as pd
 import streamlit as st
 
+from utils.loaders import load_optional
+
 st.set_page_config(page_title="🚫 Manufacturer Restrictions Manager", layout="wide")
 st.title("🚫 Manufacturer Restrictions Manager")
 
@@ -18,17 +19,9 @@ restrictions_file = st.file_uploader("📥 Upload Manufacturer Restrictions List
 alternatives_file = st.file_uploader("🔄 Upload NDC Alternative Crosswalk", type=["csv", "xlsx"])
 markup_file = st.file_uploader("💰 Upload Markup Algorithm Table", type=["csv", "xlsx"])
 
-# Load data
-def load_uploaded(file):
-    if not file:
-        return pd.DataFrame()
-    if file.name.endswith("xlsx"):
-        return pd.read_excel(file)
-    return pd.read_csv(file)
-
-restrictions_df = load_uploaded(restrictions_file)
-alternatives_df = load_uploaded(alternatives_file)
-markup_df = load_uploaded(markup_file)
+restrictions_df = load_optional(restrictions_file)
+alternatives_df = load_optional(alternatives_file)
+markup_df = load_optional(markup_file)
 
 # Display manufacturer restrictions
 if not restrictions_df.empty:
@@ -8,23 +8,35 @@ Worksheet A, Worksheet C, and Worksheet E Part A.
 import pandas as pd
 import streamlit as st
 
+from utils.excel import list_sheets, read_sheets
+
 st.set_page_config(page_title="340B MCR Parser", layout="wide")
 st.title("📊 340B Medicare Cost Report Parser")
 
+# Only the worksheets (and rows) the parser uses; Line 33 of E Part A holds the DSH %
+MCR_SHEETS = {
+    "Worksheet A": {},
+    "Worksheet C": {},
+    "Worksheet E Part A": {"nrows": 33},
+}
+
 uploaded_file = st.file_uploader(
     "📥 Upload Medicare Cost Report (Excel)", type=["xlsx"]
 )
 
 if uploaded_file:
     try:
-        xls = pd.ExcelFile(uploaded_file)
-        sheet_names = xls.sheet_names
+        sheet_names = list_sheets(uploaded_file)
         st.success("✅ File loaded successfully")
         st.write("Worksheets found:", sheet_names)
 
-        ws_a = xls.parse("Worksheet A")
-        ws_c = xls.parse("Worksheet C")
-        ws_e = xls.parse("Worksheet E Part A")
+        sheets, parse_times = read_sheets(uploaded_file, MCR_SHEETS)
+        ws_a = sheets["Worksheet A"]
+        ws_c = sheets["Worksheet C"]
+        ws_e = sheets["Worksheet E Part A"]
+
+        with st.expander("⏱️ Sheet Parse Times"):
+            st.dataframe(parse_times)
 
         st.subheader("📉 DSH % from Worksheet E Part A")
         try:
@@ -7,6 +7,10 @@ records to detect mismatches in 340B-registered locations and Medicaid carve-in
 import pandas as pd
 import streamlit as st
 
+from utils.address import MATCHED, POSSIBLE, match_addresses
+from utils.loaders import load_table
+from utils.viewer import show_table
+
 st.set_page_config(page_title="MEF & OPAIS Checker", layout="wide")
 st.title("📍 MEF and OPAIS File Validator")
 
@@ -21,29 +25,22 @@ mef_file = st.file_uploader(
 )
 
 if invoice_file and opais_file and mef_file:
-    invoices = (
-        pd.read_excel(invoice_file)
-        if invoice_file.name.endswith("xlsx")
-        else pd.read_csv(invoice_file)
-    )
-    opais = (
-        pd.read_excel(opais_file)
-        if opais_file.name.endswith("xlsx")
-        else pd.read_csv(opais_file)
-    )
-    mef = (
-        pd.read_excel(mef_file)
-        if mef_file.name.endswith("xlsx")
-        else pd.read_csv(mef_file)
-    )
+    invoices = load_table(invoice_file)
+    opais = load_table(opais_file)
+    mef = load_table(mef_file)
 
-    invoices["Address"] = invoices["Address"].str.lower().str.strip()
-    opais["Address"] = opais["Address"].str.lower().str.strip()
+    # Normalized, ZIP-blocked matching tolerates "Ste"/"Suite", "St"/"Street" and typos
+    matches = pd.concat([invoices, match_addresses(invoices, opais)], axis=1)
+    unmatched = matches[matches["Match Status"] != MATCHED]
 
-    unmatched = invoices[~invoices["Address"].isin(opais["Address"])]
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Matched", f"{(matches['Match Status'] == MATCHED).sum():,}")
+    col2.metric("Possible Matches to Review", f"{(matches['Match Status'] == POSSIBLE).sum():,}")
+    col3.metric("Not Found", f"{(~matches['Match Status'].isin([MATCHED, POSSIBLE])).sum():,}")
 
     st.subheader("📍 Sites on Invoice NOT Found in OPAIS")
-    st.dataframe(unmatched)
+    st.caption("Possible matches list the closest OPAIS address and a confidence score for review.")
+    show_table(unmatched.sort_values("Match Confidence", ascending=False), key="unmatched")
 
     st.download_button(
         label="⬇️ Download OPAIS Mismatch Report",
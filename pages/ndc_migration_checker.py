@@ -5,7 +5,10 @@ and ensures accumulation is moved correctly when allowed.
 """
 
 import streamlit as st
-import pandas as pd
+
+from utils.loaders import load_table
+from utils.ndc_migration import compile_migrations, default_ndc_check, migration_report
+from utils.viewer import show_table
 
 st.set_page_config(page_title="NDC Migration Checker", layout="wide")
 st.title("🔄 NDC Migration and Accumulation Validator")
@@ -15,40 +18,22 @@ migration_file = st.file_uploader("🔄 Upload NDC Migration List", type=["xlsx"
 default_ndc_file = st.file_uploader("💊 Upload Default NDC Report from EHR", type=["xlsx", "csv"])
 
 if accumulator_file and migration_file and default_ndc_file:
-    acc = (
-        pd.read_excel(accumulator_file)
-        if accumulator_file.name.endswith("xlsx")
-        else pd.read_csv(accumulator_file)
-    )
-    migration = (
-        pd.read_excel(migration_file)
-        if migration_file.name.endswith("xlsx")
-        else pd.read_csv(migration_file)
-    )
-    default_ndc = (
-        pd.read_excel(default_ndc_file)
-        if default_ndc_file.name.endswith("xlsx")
-        else pd.read_csv(default_ndc_file)
-    )
-
-    acc["NDC"] = acc["NDC"].astype(str)
-    migration["Old NDC"] = migration["Old NDC"].astype(str)
-    migration["New NDC"] = migration["New NDC"].astype(str)
-
-    acc = pd.merge(acc, migration, left_on="NDC", right_on="Old NDC", how="left")
+    acc = load_table(accumulator_file)
+    migration = load_table(migration_file)
+    default_ndc = load_table(default_ndc_file)
 
-    def ndc_migration_status(row):
-        """Determine if the NDC accumulation should be migrated and whether it's allowed."""
-        if pd.isna(row["New NDC"]):
-            return "✅ Current NDC"
-        if row.get("Allow Migration", False):
-            return "🔁 Migration Allowed"
-        return "❌ Discontinued - Migration Not Allowed"
+    chains = compile_migrations(migration)
+    acc = migration_report(acc, migration, chains)
 
-    acc["Migration Status"] = acc.apply(ndc_migration_status, axis=1)
+    st.subheader("🔗 Resolved Migration Chains")
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Discontinued NDCs", f"{len(chains):,}")
+    col2.metric("Multi-Hop Chains", f"{(chains['Hops'] > 1).sum():,}")
+    col3.metric("Cycles / Conflicts", f"{(chains['Chain Issue'] != '').sum():,}")
+    st.dataframe(chains.drop(columns=["Old NDC Key", "Resolved NDC Key"]))
 
     st.subheader("📊 Accumulator and Migration Review")
-    st.dataframe(acc)
+    show_table(acc, key="migration")
 
     st.download_button(
         label="⬇️ Download Migration Report",
@@ -58,6 +43,20 @@ if accumulator_file and migration_file and default_ndc_file:
     )
 
     st.subheader("💊 Default NDCs from EHR")
-    st.dataframe(default_ndc.head())
+    if any(c in default_ndc.columns for c in ["Default NDC", "NDC"]):
+        defaults = default_ndc_check(default_ndc, migration, chains)
+        outdated = defaults[defaults["Default NDC Status"] != "✅ Default is current"]
+        st.metric("Defaults Pointing at Discontinued NDCs", f"{len(outdated):,}")
+        st.dataframe(outdated)
+
+        st.download_button(
+            label="⬇️ Download Default NDC Updates",
+            data=outdated.to_csv(index=False),
+            file_name="ehr_default_ndc_updates.csv",
+            mime="text/csv"
+        )
+    else:
+        st.warning("⚠️ The EHR report needs a 'Default NDC' or 'NDC' column to cross-check.")
+        st.dataframe(default_ndc.head())
 
     st.success("✅ NDC migration validation complete.")
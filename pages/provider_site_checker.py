@@ -7,33 +7,38 @@ against 340B-registered sites to verify eligibility alignment.
 import pandas as pd
 import streamlit as st
 
+from utils.intervals import effective_join
+from utils.loaders import load_table
+from utils.viewer import show_table
+
 st.set_page_config(page_title="Provider-Site Eligibility Checker", layout="wide")
 st.title("👩‍⚕️ Provider and Site Eligibility Validator")
 
 provider_file = st.file_uploader("👨‍⚕️ Upload Provider List (with NPI)", type=["xlsx", "csv"])
 site_file = st.file_uploader("🏥 Upload 340B Site Registration List", type=["xlsx", "csv"])
+as_of = st.date_input("📅 Check Alignment As Of", value=pd.Timestamp.today().date())
 
 if provider_file and site_file:
-    providers = (
-        pd.read_excel(provider_file)
-        if provider_file.name.endswith("xlsx")
-        else pd.read_csv(provider_file)
-    )
-    sites = (
-        pd.read_excel(site_file)
-        if site_file.name.endswith("xlsx")
-        else pd.read_csv(site_file)
-    )
+    providers = load_table(provider_file)
+    sites = load_table(site_file)
 
     providers["NPI"] = providers["NPI"].astype(str)
     sites["NPI"] = sites["NPI"].astype(str)
 
-    merged = pd.merge(providers, sites, on="NPI", how="left")
+    if {"Start Date", "End Date"}.issubset(sites.columns):
+        # Effective-dated registrations: only the period in force on the as-of date counts
+        providers["As Of Date"] = pd.Timestamp(as_of)
+        merged = effective_join(
+            providers, sites, on="NPI", date_col="As Of Date",
+            nearest=False, suffixes=("", "_site")
+        ).drop(columns="As Of Date")
+    else:
+        merged = pd.merge(providers, sites, on="NPI", how="left")
 
     unmatched = merged[merged["Site Name"].isna()]
 
     st.subheader("📍 Providers NOT aligned to any 340B-registered site")
-    st.dataframe(unmatched)
+    show_table(unmatched, key="unmatched")
 
     st.download_button(
         label="⬇️ Download Unmatched Providers",
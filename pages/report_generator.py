@@ -4,11 +4,11 @@ Generates on-demand summary reports from available uploaded or generated files,
 compliance flags, overcharge summaries, and monthly report insights.
 """
 
-import os
-
-import pandas as pd
 import streamlit as st
 
+from utils.store import read_table, table_columns
+from utils.viewer import show_table
+
 st.set_page_config(page_title="📊 Report Generator", layout="wide")
 st.title("📊 340B Report Generator")
 
@@ -17,26 +17,25 @@ st.markdown(
     "to give you a monthly or flagged snapshot of 340B compliance and activity."
 )
 
-# Set paths
-LIBRARY_FOLDER = "library"
+# Library store tables behind each report
 SUMMARY_DATA = {
-    "Compliance Flags": "compliance_flags.csv",
-    "Overcharges": "invoice_overcharges.csv",
-    "Eligible Sites": "340B_site_crosswalk.csv",
-    "Document Log": "library_index.csv"
+    "Compliance Flags": "compliance_flags",
+    "Overcharges": "invoice_overcharges",
+    "Eligible Sites": "site_crosswalk",
+    "Document Log": "library_index"
 }
 
 # Select report type
 st.subheader("📁 Select Report Type")
 report_type = st.selectbox("Choose a report to view", list(SUMMARY_DATA.keys()))
 
-report_path = os.path.join(LIBRARY_FOLDER, SUMMARY_DATA[report_type])
+report_table = SUMMARY_DATA[report_type]
 
-if os.path.exists(report_path):
-    df = pd.read_csv(report_path)
+if table_columns(report_table):
+    df = read_table(report_table)
 
     st.success(f"✅ Loaded report: {report_type}")
-    st.dataframe(df)
+    show_table(df, key=report_table)
 
     st.download_button(
         f"⬇️ Download {report_type} Report",
@@ -4,9 +4,12 @@ Analyzes INMAR reverse distributor reports to identify lost drugs, unrecoverable
 and patterns of high-expiration or return risks.
 """
 
-import pandas as pd
 import streamlit as st
 
+from utils.loaders import load_table
+from utils.ndc import merge_on_ndc
+from utils.viewer import show_table
+
 st.set_page_config(page_title="♻️ Reverse Distribution Analyzer", layout="wide")
 st.title("♻️ Reverse Distribution Analyzer")
 
@@ -17,28 +20,18 @@ reverse_file = st.file_uploader("📦 Upload Reverse Distribution Report", type=
 price_file = st.file_uploader("💰 Upload NDC Price File (optional)", type=["xlsx", "csv"])
 
 if reverse_file:
-    rev = (
-        pd.read_excel(reverse_file)
-        if reverse_file.name.endswith("xlsx")
-        else pd.read_csv(reverse_file)
-    )
+    rev = load_table(reverse_file)
 
     if price_file:
-        price = (
-            pd.read_excel(price_file)
-            if price_file.name.endswith("xlsx")
-            else pd.read_csv(price_file)
-        )
-        rev["NDC"] = rev["NDC"].astype(str)
-        price["NDC"] = price["NDC"].astype(str)
-        rev = pd.merge(rev, price[["NDC", "Unit Price ($)"]], on="NDC", how="left")
+        price = load_table(price_file)
+        rev = merge_on_ndc(rev, price[["NDC", "Unit Price ($)"]], how="left")
         rev["Lost Value ($)"] = rev["Quantity Returned"] * rev["Unit Price ($)"]
 
     rev["Recouped"] = rev["Return Status"].str.lower().str.contains("recoup")
     rev["Flag"] = ~rev["Recouped"]
 
     st.subheader("🔍 Returned Drug Analysis")
-    st.dataframe(rev)
+    show_table(rev, key="returns")
 
     st.download_button(
         "⬇️ Download Reverse Return Report",
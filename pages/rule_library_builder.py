@@ -4,9 +4,10 @@ This module allows users to upload and store reference rules such as orphan drug
 provider carve-in status, and Medicaid plan logic for ongoing 340B compliance validation.
 """
 
-import pandas as pd
 import streamlit as st
 
+from utils.loaders import load_table
+
 st.set_page_config(page_title="340B Rule Library", layout="wide")
 st.title("📚 340B Compliance Rule Library Builder")
 
@@ -15,11 +16,7 @@ rule_file = st.file_uploader(
 )
 
 if rule_file:
-    rules = (
-        pd.read_excel(rule_file)
-        if rule_file.name.endswith("xlsx")
-        else pd.read_csv(rule_file)
-    )
+    rules = load_table(rule_file)
 
     st.subheader("📖 Rule File Preview")
     st.dataframe(rules.head())
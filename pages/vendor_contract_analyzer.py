@@ -8,6 +8,8 @@ import os
 import pandas as pd
 import streamlit as st
 
+from utils.loaders import load_optional
+
 st.set_page_config(page_title="📄 Vendor Contract Analyzer", layout="wide")
 st.title("📄 Vendor Contract Analyzer")
 
@@ -18,13 +20,8 @@ st.markdown("Upload vendor agreements, pharmacy performance reports, and fee sch
 contract_file = st.file_uploader("📜 Upload Contract/Vendor Agreement Data", type=["xlsx", "csv"])
 performance_file = st.file_uploader("📊 Upload Contract Pharmacy Performance Report", type=["xlsx", "csv"])
 
-def load_data(file):
-    if not file:
-        return pd.DataFrame()
-    return pd.read_excel(file) if file.name.endswith("xlsx") else pd.read_csv(file)
-
-contracts = load_data(contract_file)
-performance = load_data(performance_file)
+contracts = load_optional(contract_file)
+performance = load_optional(performance_file)
 
 if not contracts.empty and not performance.empty:
     st.subheader("🔗 Merged Vendor & Performance Data")
@@ -2,9 +2,12 @@
 Calculates eligible waste from EPIC data and estimates recoverable 340B savings.
 """
 
-import pandas as pd
 import streamlit as st
 
+from utils.loaders import load_table
+from utils.viewer import show_table
+from utils.waste import store_packages, stored_packages, waste_report
+
 st.set_page_config(page_title="🧮 Waste Recovery Calculator", layout="wide")
 st.title("🧮 340B Waste Recovery Calculator")
 
@@ -14,38 +17,29 @@ st.markdown("Upload EPIC encounter and dispense reports to calculate recoverable
 encounter_file = st.file_uploader("📥 Upload Encounter File", type=["xlsx", "csv"])
 dispense_file = st.file_uploader("💉 Upload Dispense File", type=["xlsx", "csv"])
 price_file = st.file_uploader("💰 Upload NDC Price File (optional)", type=["xlsx", "csv"])
+package_file = st.file_uploader(
+    "📐 Upload NDC Package-Size File (optional: Strength (mg/mL), Volume (mL), Billing Unit, Package Quantity)",
+    type=["xlsx", "csv"]
+)
 
 if encounter_file and dispense_file:
-    enc = (
-        pd.read_excel(encounter_file)
-        if encounter_file.name.endswith("xlsx")
-        else pd.read_csv(encounter_file)
-    )
-    disp = (
-        pd.read_excel(dispense_file)
-        if dispense_file.name.endswith("xlsx")
-        else pd.read_csv(dispense_file)
-    )
-
-    merged = pd.merge(enc, disp, on=["Encounter ID", "NDC"], how="inner")
+    enc = load_table(encounter_file)
+    disp = load_table(dispense_file)
 
-    merged["Waste (mg)"] = (
-        merged["Vial Size (mg)"] * merged["Vials Dispensed"]
-    ) - merged["Dose Administered (mg)"]
+    price = load_table(price_file) if price_file else None
 
-    if price_file:
-        price = (
-            pd.read_excel(price_file)
-            if price_file.name.endswith("xlsx")
-            else pd.read_csv(price_file)
-        )
-        price["NDC"] = price["NDC"].astype(str)
-        merged["NDC"] = merged["NDC"].astype(str)
-        merged = pd.merge(merged, price[["NDC", "Unit Price ($)"]], on="NDC", how="left")
-        merged["Savings ($)"] = merged["Waste (mg)"] * merged["Unit Price ($)"]
+    # Package sizes are saved to the library once and reused for every later run
+    if package_file:
+        key = ("waste_packages", package_file.file_id)
+        if key not in st.session_state:
+            st.session_state[key] = store_packages(load_table(package_file))
+    if price is not None:
+        st.caption(f"📐 Package sizes on file for {len(stored_packages()):,} NDCs; "
+                   "NDCs without one are priced per mg.")
+    merged = waste_report(enc, disp, price)
 
     st.subheader("📊 Waste Recovery Detail")
-    st.dataframe(merged)
+    show_table(merged, key="waste")
 
     st.download_button(
         "⬇️ Download Waste Recovery Report",
@@ -2,10 +2,22 @@
 
 Allows simulation of financial or compliance impact when adjusting 340B program variables
 such as waste recovery, overcharge recovery, site participation, and return recoup.
+
+Savings distributions are fitted from the reports the other modules produce, and every
+change to the controls draws a fresh set of Monte Carlo scenarios.
 """
 
-import streamlit as st
+import time
+
+import numpy as np
 import pandas as pd
+import streamlit as st
+
+from utils.loaders import load_table
+from utils.scenarios import (
+    DEFAULT_SCENARIOS, DRIVERS, SITE_DRIVER, distribution_summary, fit_pool, report_amounts, simulate, tornado
+)
+from utils.store import read_table
 
 st.set_page_config(page_title="📊 What-If Scenario Modeler", layout="wide")
 st.title("📊 What-If Scenario Modeler")
@@ -13,55 +25,80 @@ st.title("📊 What-If Scenario Modeler")
 st.markdown("Adjust key 340B program assumptions and model the resulting impact on overall savings, "
             "waste recovery, overcharges, and duplicate discount risks.")
 
+# Program outputs the distributions are fitted from
+with st.expander("📂 Program Data (reports from the other modules)"):
+    report_files = {
+        "Recovered Waste Savings": st.file_uploader("♻️ Waste Recovery Report", type=["xlsx", "csv"]),
+        "Resolved Overcharges": st.file_uploader(
+            "💰 Overcharged Items or Overcharge Rollup (defaults to the stored invoice overcharges)",
+            type=["xlsx", "csv"],
+        ),
+        "Recouped Drug Returns": st.file_uploader("📦 Reverse Distribution Report", type=["xlsx", "csv"]),
+        SITE_DRIVER: st.file_uploader("🏥 Site Savings Report (one row per site)", type=["xlsx", "csv"]),
+    }
+
+reports = {driver: load_table(file) if file else None for driver, file in report_files.items()}
+if reports["Resolved Overcharges"] is None:
+    reports["Resolved Overcharges"] = read_table("invoice_overcharges")
+
+fits = {
+    driver: fit_pool(report_amounts(reports[driver], driver), spec["default"], per_item=driver == SITE_DRIVER)
+    for driver, spec in DRIVERS.items()
+}
+st.dataframe(
+    pd.DataFrame.from_dict(fits, orient="index").rename_axis("Driver").reset_index(),
+    hide_index=True,
+)
+
 # Input sliders for assumptions
 st.subheader("⚙️ Scenario Controls")
 
 waste_recovery_rate = st.slider("Waste Recovery Rate (%)", 0, 100, 60)
 overcharge_recovery_rate = st.slider("Overcharge Dispute Success Rate (%)", 0, 100, 80)
+base_sites = st.number_input("Current 340B-Eligible Sites", min_value=0, step=1, value=12)
 site_expansion = st.number_input("New 340B-Eligible Sites Added", min_value=0, step=1, value=0)
 return_recoup_rate = st.slider("Return Credit Success Rate (%)", 0, 100, 70)
+scenarios = st.select_slider("Scenarios", [10_000, 100_000, 250_000, 500_000, 1_000_000], value=DEFAULT_SCENARIOS)
 
-# Mock base values (replace with real backend link later)
-base_waste_savings = 50000
-base_overcharges = 40000
-base_return_losses = 20000
-base_sites = 12
-avg_site_savings = 15000
+rates = {
+    "Recovered Waste Savings": waste_recovery_rate / 100,
+    "Resolved Overcharges": overcharge_recovery_rate / 100,
+    "Recouped Drug Returns": return_recoup_rate / 100,
+}
 
-# Calculated scenarios
-projected_waste = base_waste_savings * (waste_recovery_rate / 100)
-projected_overcharges = base_overcharges * (overcharge_recovery_rate / 100)
-projected_return = base_return_losses * (return_recoup_rate / 100)
-projected_site_savings = site_expansion * avg_site_savings
+started = time.perf_counter()
+draws = simulate(fits, rates, site_expansion, scenarios)
+summary_df = distribution_summary(draws)
+ranking = tornado(summary_df)
+elapsed = time.perf_counter() - started
 
-total_projection = projected_waste + projected_overcharges + projected_return + projected_site_savings
-baseline = base_waste_savings + base_overcharges + (base_sites * avg_site_savings)
+# Baseline: the full waste and overcharge pools plus the current sites
+baseline = (
+    fits["Recovered Waste Savings"]["Mean"] + fits["Resolved Overcharges"]["Mean"]
+    + base_sites * fits[SITE_DRIVER]["Mean"]
+)
 
 # Display projections
 st.subheader("📈 Scenario Impact Summary")
+st.caption(f"{scenarios:,} scenarios simulated in {elapsed:.2f}s")
+
+total = summary_df.set_index("Component").loc["Total"]
+col1, col2, col3 = st.columns(3)
+for col, p in zip([col1, col2, col3], [10, 50, 90]):
+    delta = total[f"P{p} ($)"] - baseline
+    delta_percent = (delta / baseline) * 100 if baseline else 0
+    col.metric(label=f"💰 Total Projected Program Savings (P{p})", value=f"${total[f'P{p} ($)']:,.2f}",
+               delta=f"{delta:+,.2f} ({delta_percent:+.1f}%)")
+
+st.dataframe(summary_df, hide_index=True)
+
+counts, edges = np.histogram(draws["Total"], bins=50)
+st.bar_chart(pd.DataFrame({"Scenarios": counts}, index=pd.Index(edges[:-1].round(0), name="Total Savings ($)")))
 
-summary_df = pd.DataFrame({
-    "Category": [
-        "Recovered Waste Savings",
-        "Resolved Overcharges",
-        "Recouped Drug Returns",
-        "Savings from Site Expansion"
-    ],
-    "Projected Impact ($)": [
-        projected_waste,
-        projected_overcharges,
-        projected_return,
-        projected_site_savings
-    ]
-})
-
-st.dataframe(summary_df)
-
-delta = total_projection - baseline
-delta_percent = (delta / baseline) * 100
-
-st.metric(label="💰 Total Projected Program Savings", value=f"${total_projection:,.2f}",
-          delta=f"{delta:+,.2f} ({delta_percent:+.1f}%)")
+st.subheader("🌪️ Sensitivity (Tornado)")
+st.caption("Total savings (at the other drivers' medians) as each driver moves from its P10 to its P90.")
+st.bar_chart(ranking.set_index("Driver")[["Swing ($)"]], horizontal=True)
+st.dataframe(ranking, hide_index=True)
 
 # Download option
 csv = summary_df.to_csv(index=False)
@@ -0,0 +1,12 @@
+"""Shared fixtures: every test gets its own library folder and database."""
+
+import pytest
+
+from utils import store
+
+
+@pytest.fixture(autouse=True)
+def library(tmp_path, monkeypatch):
+    monkeypatch.setattr(store, "LIBRARY_FOLDER", str(tmp_path))
+    monkeypatch.setattr(store, "DB_PATH", str(tmp_path / "library.db"))
+    return tmp_path
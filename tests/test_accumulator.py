@@ -0,0 +1,45 @@
+"""Tests for accumulator validation and the accumulation ledger."""
+
+import pandas as pd
+
+from utils.accumulator import (
+    NO_ACCUMULATION, NOT_ACCUMULATED, NOT_BILLED, accumulation_ledger, check_accumulation, daily_units, package_sizes
+)
+
+
+def test_issues_compare_billing_with_accumulation():
+    claims = pd.DataFrame({
+        "NDC": ["00002-1433-80"] * 4,
+        "Date": ["2025-01-01", "2025-01-02", "2025-01-03", "2025-01-04"],
+        "Billed 340B": [True, True, False, False],
+    })
+    postings = pd.DataFrame({"NDC": ["0002-1433-80"] * 2, "Date": ["2025-01-01", "2025-01-03"], "Account Type": "340B"})
+    assert check_accumulation(claims, postings)["Issue"].tolist() == ["", NOT_ACCUMULATED, NOT_BILLED, ""]
+
+
+def test_claims_without_billing_flag_need_a_posting():
+    claims = pd.DataFrame({"NDC": ["00002143380", "00002143380"], "Date": ["2025-01-01", "2025-01-02"]})
+    postings = pd.DataFrame({"NDC": ["00002143380"], "Date": ["2025-01-01"], "Account Type": "340B"})
+    assert check_accumulation(claims, postings)["Issue"].tolist() == ["", NO_ACCUMULATION]
+
+
+def test_streamed_ledger_keeps_per_ndc_package_sizes():
+    claims = pd.DataFrame({
+        "NDC": ["00002143380", "00002143380", "0003-0293-11", "00003029311"],
+        "Date": ["2025-01-01", "2025-01-02", "2025-01-01", "2025-01-02"],
+        "Account Type": "340B",
+        "Quantity": [5, 5, 2, 2],
+        "Package Size": [10, 10, 4, 4],
+    })
+    postings = pd.DataFrame({
+        "NDC": ["00002143380", "00003029311"], "Date": ["2025-01-02", "2025-01-02"], "Account Type": "340B",
+    })
+    in_memory = accumulation_ledger(claims, postings)
+
+    chunks = [claims.iloc[:2], claims.iloc[2:]]
+    daily = pd.concat([daily_units(c) for c in chunks], ignore_index=True)
+    sizes = pd.concat([package_sizes(c) for c in chunks])
+    streamed = accumulation_ledger(daily, postings, package_size=sizes)
+
+    assert streamed["Package Size"].tolist() == [10, 10, 4, 4]
+    pd.testing.assert_frame_equal(streamed, in_memory)
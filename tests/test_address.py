@@ -0,0 +1,34 @@
+"""Tests for site address matching."""
+
+import pandas as pd
+
+from utils.address import MATCHED, NOT_FOUND, POSSIBLE, match_addresses, normalize_addresses
+
+
+def test_normalization_uses_usps_abbreviations():
+    assert normalize_addresses(["123 North Main Street, Suite #4"]).tolist() == ["123 n main st ste ste 4"]
+
+
+def test_identical_addresses_match_when_only_one_side_has_a_zip():
+    invoices = pd.DataFrame({"Address": ["123 Main Street Springfield IL", "9 Oak Avenue Springfield IL 62701"]})
+    opais = pd.DataFrame({
+        "Address": ["123 Main St Springfield IL", "9 Oak Ave Springfield IL"],
+        "ZIP": ["62701", "62701-1234"],
+    })
+    matches = match_addresses(invoices, opais)
+    assert matches["Match Status"].tolist() == [MATCHED, MATCHED]
+    assert matches["OPAIS Match"].tolist() == opais["Address"].tolist()
+
+
+def test_similar_address_without_a_zip_is_still_blocked():
+    invoices = pd.DataFrame({"Address": ["123 Main Street Ste 200 Springfield"]})
+    opais = pd.DataFrame({"Address": ["123 Main St Springfield", "77 Elm Rd Chicago"], "ZIP": ["62701", "60601"]})
+    matches = match_addresses(invoices, opais)
+    assert matches["OPAIS Match"].tolist() == ["123 Main St Springfield"]
+    assert matches["Match Status"].iloc[0] in (MATCHED, POSSIBLE)
+
+
+def test_different_zips_do_not_match_outright():
+    invoices = pd.DataFrame({"Address": ["123 Main St"], "ZIP": ["10001"]})
+    opais = pd.DataFrame({"Address": ["123 Main St"], "ZIP": ["62701"]})
+    assert match_addresses(invoices, opais)["Match Status"].tolist() == [NOT_FOUND]
@@ -0,0 +1,44 @@
+"""Tests for audit finding risk scoring."""
+
+import random
+
+import pandas as pd
+
+from utils.audit_risk import BASE_SCORE, LOW_RISK, MAX_SCORE, area_risk, build_automaton, find_patterns, score_areas
+
+
+def test_automaton_finds_what_a_substring_scan_finds():
+    rng = random.Random(0)
+    patterns = ["".join(rng.choice("ab") for _ in range(rng.randint(1, 4))) for _ in range(30)]
+    automaton = build_automaton(patterns)
+    for _ in range(200):
+        text = "".join(rng.choice("abc") for _ in range(rng.randint(0, 12)))
+        expected = {i for i, p in enumerate(patterns) if p in text}
+        assert find_patterns(automaton, text) == expected, text
+
+
+def test_overlapping_and_nested_patterns():
+    automaton = build_automaton(["he", "she", "his", "hers"])
+    assert find_patterns(automaton, "ushers") == {0, 1, 3}
+    assert find_patterns(automaton, "") == set()
+
+
+def test_risk_weighs_count_severity_and_recency():
+    findings = pd.DataFrame({
+        "Area Affected": ["Contract Pharmacy", "Contract Pharmacy", "Orphan Drugs", "Medicaid", None],
+        "Severity": ["High", "Low", "Critical", "Low", "High"],
+        "Finding Date": ["2025-01-01", "2025-01-01", "2025-01-01", "2021-01-01", "2025-01-01"],
+    })
+    risk = area_risk(findings).set_index("Area Affected")
+    assert risk["Findings"].to_dict() == {"Contract Pharmacy": 2, "Orphan Drugs": 1, "Medicaid": 1}
+    assert risk.loc["Contract Pharmacy", "Risk Score"] == MAX_SCORE
+    # Four years old is two half-lives: 1 * 0.25 against the top weight of 4
+    assert risk.loc["Medicaid", "Risk Weight"] == 0.25
+    assert risk.loc["Medicaid", "Risk Score"] == round(BASE_SCORE + (MAX_SCORE - BASE_SCORE) * 0.25 / 4, 1)
+
+
+def test_areas_take_their_riskiest_matching_finding_area():
+    findings = pd.DataFrame({"Area Affected": ["Pharmacy", "Pharmacy", "Contract Pharmacy"]})
+    scored = score_areas(["Contract Pharmacy Oversight", "Retail Pharmacy", "Billing"], findings)
+    assert scored["Risk Category"].tolist() == ["Pharmacy", "Pharmacy", LOW_RISK]
+    assert scored["Risk Score"].tolist() == [MAX_SCORE, MAX_SCORE, BASE_SCORE]
@@ -0,0 +1,29 @@
+"""Tests for the headless batch runner's job naming."""
+
+from argparse import Namespace
+
+import pytest
+
+from batch import build_jobs, facility_names
+
+
+def test_facility_folders_name_the_jobs():
+    assert facility_names(["in/east/claims.csv", "in/west/claims.csv"]) == ["east", "west"]
+
+
+def test_flat_folder_uses_the_file_names():
+    assert facility_names(["flat/east.xlsx", "flat/west.xlsx"]) == ["east", "west"]
+    assert facility_names(["flat/only.xlsx"]) == ["only"]
+
+
+def test_repeated_folders_and_names_use_both():
+    files = ["a/x/claims.csv", "a/x/claims.xlsx", "b/y/claims.csv"]
+    assert facility_names(files) == ["x_claims", "x_claims", "y_claims"]
+
+
+def test_duplicate_facilities_fail(tmp_path):
+    for name in ["claims.csv", "claims.xlsx"]:
+        (tmp_path / name).write_text("")
+    args = Namespace(manifest=None, invoices=str(tmp_path / "claims.*"), prices="prices.csv")
+    with pytest.raises(SystemExit, match="duplicate facility names"):
+        build_jobs("invoices", args)
@@ -0,0 +1,46 @@
+"""Tests for BIN/PCN/Group plan lookup and claim issues."""
+
+import pandas as pd
+
+from utils.claims import MCO_EXCLUDED, MISSING_MODIFIER, UNKNOWN_PLAN, build_plan_index, flag_claims, validate_claims
+
+
+def _plans():
+    return pd.DataFrame({
+        "BIN": ["610494", "610494", "004336", "003858"],
+        "PCN": ["MEDDPRIME", "MEDDPRIME", "*", "MA"],
+        "Group": ["RX4000", "", "ANY", "GRP1"],
+        "Plan Name": ["Exact", "PCN-wide", "BIN-wide", "Other"],
+        "Allow 340B": ["Yes", "Yes", "No", "Yes"],
+    })
+
+
+def _claims():
+    return pd.DataFrame({
+        "BIN": ["610494", " 610494 ", "004336", "999999", "003858"],
+        "PCN": ["meddprime", "MEDDPRIME", "ADV", "X", "MA"],
+        "Group": ["RX4000", "RX9999", "G", "G", "GRP2"],
+        "Claim Type": ["FFS", "MCO", "MCO", "MCO", "FFS"],
+        "Modifier": ["UD", "", "", "", "UD"],
+    })
+
+
+def test_claims_take_the_most_specific_entry():
+    merged = validate_claims(_claims(), _plans())
+    assert merged["Plan Name"].fillna("").tolist() == ["Exact", "PCN-wide", "BIN-wide", "", ""]
+    assert merged["Plan Match"].tolist() == ["BIN+PCN+Group", "BIN+PCN", "BIN", "", ""]
+
+
+def test_issues_in_precedence_order():
+    merged = validate_claims(_claims(), _plans())
+    assert merged["Issue"].tolist() == ["", "", MCO_EXCLUDED, UNKNOWN_PLAN, UNKNOWN_PLAN]
+
+    ffs = _claims().iloc[:1].assign(Modifier="")
+    assert validate_claims(ffs, _plans())["Issue"].tolist() == [MISSING_MODIFIER]
+
+
+def test_a_prebuilt_index_gives_the_same_flags():
+    index = build_plan_index(_plans())
+    flagged = flag_claims(_claims(), _plans(), index)
+    pd.testing.assert_frame_equal(flagged, flag_claims(_claims(), _plans()))
+    assert len(flagged) == 3
@@ -0,0 +1,68 @@
+"""Tests for the compliance rule engine."""
+
+import pandas as pd
+
+from utils.compliance import (
+    COMPLIANT, DUPLICATE_DISCOUNT, INVALID_PROVIDER, ORPHAN_RESTRICTION, PROVIDER_NOT_ACTIVE, RULE_LABELS,
+    UNREGISTERED_SITE, describe_violations, screen_claims, violation_mask,
+)
+
+
+def _merged(**columns):
+    base = {
+        "Date": pd.to_datetime(["2025-03-01"]),
+        "Start Date": pd.to_datetime(["2025-01-01"]),
+        "End Date": pd.to_datetime([None]),
+        "Provider Name": ["Dr. A"],
+        "Site Type": ["Parent"],
+        "Claim Type": ["Commercial"],
+    }
+    base.update(columns)
+    return pd.DataFrame(base)
+
+
+def test_compliant_claim_has_no_bits():
+    assert violation_mask(_merged()).tolist() == [0]
+
+
+def test_each_rule_sets_its_bit():
+    cases = {
+        INVALID_PROVIDER: _merged(**{"Provider Name": [None]}),
+        PROVIDER_NOT_ACTIVE: _merged(**{"End Date": pd.to_datetime(["2025-02-01"])}),
+        UNREGISTERED_SITE: _merged(**{"Site Type": [None]}),
+        DUPLICATE_DISCOUNT: _merged(**{"Claim Type": ["Medicaid"], "Carve-In": [False], "Billed 340B": [True]}),
+        ORPHAN_RESTRICTION: _merged(Orphan=[True], **{"Entity Type": ["CAH"]}),
+    }
+    for bit, merged in cases.items():
+        assert violation_mask(merged).tolist() == [bit], RULE_LABELS[bit]
+
+
+def test_every_failed_rule_is_reported_in_precedence_order():
+    mask = violation_mask(_merged(**{"Provider Name": [None], "Site Type": [None]}))
+    assert mask.tolist() == [INVALID_PROVIDER | UNREGISTERED_SITE]
+    status, violations = describe_violations(mask)
+    assert list(status) == [RULE_LABELS[INVALID_PROVIDER]]
+    assert list(violations) == [f"{RULE_LABELS[INVALID_PROVIDER]}; {RULE_LABELS[UNREGISTERED_SITE]}"]
+
+
+def test_describe_covers_every_mask():
+    status, violations = describe_violations(range(32))
+    assert status[0] == COMPLIANT and violations[0] == COMPLIANT
+    assert violations[31].count(";") == 4
+    assert status[DUPLICATE_DISCOUNT | ORPHAN_RESTRICTION] == RULE_LABELS[DUPLICATE_DISCOUNT]
+
+
+def test_screen_claims_merges_the_reference_files():
+    claims = pd.DataFrame({
+        "NDC": ["0002-1433-80", "00002143381"], "NPI": ["1", "2"], "Site": ["Main", "Annex"],
+        "Date": ["2025-03-01", "2025-03-01"], "Claim Type": ["Medicaid", "Commercial"], "Billed 340B": [True, True],
+    })
+    providers = pd.DataFrame({"NPI": ["1"], "Provider Name": ["Dr. A"], "Start Date": ["2025-01-01"], "End Date": [None]})
+    sites = pd.DataFrame({"Site": ["Main"], "Site Type": ["Parent"], "Entity Type": ["CAH"]})
+    orphans = pd.DataFrame({"NDC": ["00002143380"]})
+    mef = pd.DataFrame({"NPI": ["1"], "Carve-In": [False]})
+    result = screen_claims(claims, providers, sites, orphans, mef)
+    assert result["Violation Mask"].tolist() == [
+        DUPLICATE_DISCOUNT | ORPHAN_RESTRICTION,
+        INVALID_PROVIDER | UNREGISTERED_SITE,
+    ]
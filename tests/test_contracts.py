@@ -0,0 +1,56 @@
+"""Tests for contract coverage and the gap/overlap sweep."""
+
+import pandas as pd
+
+from utils.contracts import GAP, OVERLAP, contract_coverage, coverage_issues
+
+TODAY = pd.Timestamp("2026-01-01")
+
+
+def _contracts(starts, ends, wholesalers=None):
+    return pd.DataFrame({
+        "NDC": "00002-1433-80",
+        "Account Type": "340B",
+        "Wholesaler": wholesalers or ["A"] * len(starts),
+        "Start Date": pd.to_datetime(starts),
+        "End Date": pd.to_datetime(ends),
+    })
+
+
+def test_nested_contract_does_not_hide_the_longer_one():
+    contracts = _contracts(["2024-01-01", "2024-02-01"], ["2024-12-31", "2024-03-31"])
+    invoice = pd.DataFrame({
+        "NDC": ["00002143380"] * 4,
+        "Account Type": "340B",
+        "Purchase Date": ["2024-06-01", "2024-03-15", "2025-02-01", "2023-06-01"],
+    })
+    coverage = contract_coverage(invoice, contracts, TODAY)
+    assert coverage["Contract #"].tolist() == [1, 2, 2, 1]
+    assert coverage["Contract Coverage Status"].tolist() == [
+        "✅ Covered", "✅ Covered", "❌ Contract Expired", "❌ Before Contract Start",
+    ]
+
+
+def test_lines_match_one_contract_per_wholesaler():
+    contracts = _contracts(["2024-01-01", "2024-01-01"], ["2024-12-31", "2024-12-31"], ["A", "B"])
+    invoice = pd.DataFrame({
+        "NDC": ["00002143380", "00002143380", "99999999999"],
+        "Account Type": "340B",
+        "Wholesaler": ["B", "A", "A"],
+        "Purchase Date": ["2024-06-01"] * 3,
+    })
+    coverage = contract_coverage(invoice, contracts, TODAY)
+    assert len(coverage) == 3
+    assert coverage["Contract #"].tolist()[:2] == [2, 1]
+    assert coverage["Contract Coverage Status"].iloc[2] == "❌ Not Under Any Contract"
+
+
+def test_sweep_reports_gaps_and_overlaps():
+    contracts = _contracts(
+        ["2025-01-01", "2025-07-01", "2025-06-15"], ["2025-03-31", "2025-12-31", None], ["A", "A", "B"]
+    )
+    issues = coverage_issues(contracts)
+    assert issues["Issue"].tolist() == [GAP, OVERLAP]
+    assert issues["From"].tolist() == [pd.Timestamp("2025-04-01"), pd.Timestamp("2025-07-01")]
+    assert issues["To"].tolist() == [pd.Timestamp("2025-06-14"), pd.Timestamp("2025-12-31")]
+    assert issues["Days"].tolist() == [75, 184]
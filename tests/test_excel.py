@@ -0,0 +1,26 @@
+"""Tests for the sheet-selective Excel reader."""
+
+import pandas as pd
+import pytest
+
+from utils.excel import read_sheets
+
+WORKBOOK = "sample_data/Hospital-Cost-Report.xlsx"
+
+
+@pytest.fixture(scope="module")
+def workbook():
+    with pd.ExcelFile(WORKBOOK, engine="openpyxl") as wb:
+        yield wb
+
+
+@pytest.mark.parametrize("sheet", ["1  Cover", "2  Summary", "3   Statistics", "19  340B"])
+def test_openpyxl_matches_read_excel(workbook, sheet):
+    frames, _ = read_sheets(WORKBOOK, {sheet: {}}, engine="openpyxl")
+    pd.testing.assert_frame_equal(frames[sheet], workbook.parse(sheet))
+
+
+def test_openpyxl_matches_read_excel_on_a_range(workbook):
+    sheet = "2  Summary"
+    frames, _ = read_sheets(WORKBOOK, {sheet: {"nrows": 20, "usecols": "A:F"}}, engine="openpyxl")
+    pd.testing.assert_frame_equal(frames[sheet], workbook.parse(sheet, nrows=20, usecols="A:F"))
@@ -0,0 +1,17 @@
+"""Tests for incremental compliance screening fingerprints."""
+
+import numpy as np
+import pandas as pd
+
+from utils.incremental import _key_fingerprints
+
+
+def test_fingerprints_keep_every_hash_bit():
+    reference = pd.DataFrame({"NPI": ["1", "2", "1"], "Provider Name": ["A", "B", "C"]})
+    rows = pd.util.hash_pandas_object(reference, index=False).to_numpy(dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        expected = [rows[0] + rows[2], np.uint64(0), rows[1]]
+
+    fingerprints = _key_fingerprints(reference, "NPI", pd.Series(["1", "3", "2"]))
+    assert fingerprints.dtype == np.uint64
+    assert fingerprints.tolist() == [int(v) for v in expected]
@@ -0,0 +1,37 @@
+"""Tests for the effective-dated interval join."""
+
+import pandas as pd
+
+from utils.intervals import effective_join
+
+PERIODS = pd.DataFrame({
+    "NPI": ["1", "1", "2"],
+    "Start Date": ["2024-01-01", "2024-02-01", "2024-01-01"],
+    "End Date": ["2024-12-31", "2024-03-31", "2024-01-31"],
+    "Site": ["Main", "Annex", "Clinic"],
+})
+
+
+def test_nested_period_does_not_hide_the_open_one():
+    claims = pd.DataFrame({"NPI": ["1", "1"], "Date": ["2024-06-01", "2024-03-01"]})
+    merged = effective_join(claims, PERIODS, on="NPI", date_col="Date", nearest=False)
+    assert merged["Site"].tolist() == ["Main", "Annex"]
+
+
+def test_uncovered_dates_keep_the_nearest_period():
+    claims = pd.DataFrame({"NPI": ["1", "1", "2"], "Date": ["2025-02-01", "2023-01-01", "2024-05-01"]})
+    nearest = effective_join(claims, PERIODS, on="NPI", date_col="Date")
+    assert nearest["Site"].tolist() == ["Annex", "Main", "Clinic"]
+    strict = effective_join(claims, PERIODS, on="NPI", date_col="Date", nearest=False)
+    assert strict["Site"].isna().all()
+
+
+def test_keeps_rows_order_and_index():
+    claims = pd.DataFrame(
+        {"NPI": ["2", "3", "1"], "Date": [None, "2024-01-01", "2024-06-01"]}, index=["a", "b", "c"]
+    )
+    merged = effective_join(claims, PERIODS, on="NPI", date_col="Date")
+    assert merged.index.tolist() == ["a", "b", "c"]
+    assert merged["NPI"].tolist() == ["2", "3", "1"]
+    assert merged["Site"].tolist()[0] == "Clinic"
+    assert pd.isna(merged["Site"].iloc[1])
@@ -0,0 +1,39 @@
+"""Tests for invoice overcharge checks and the ceiling price history."""
+
+import pandas as pd
+
+from utils.invoice import check_invoices, overcharge_rollup, price_history, store_price_history
+
+
+def _prices(price):
+    return pd.DataFrame({
+        "NDC": ["00002-1433-80", "00002143381"],
+        "Effective Date": ["2025-01-01", "2025-01-01"],
+        "Ceiling Price": [price, 5.0],
+    })
+
+
+def test_corrected_prices_replace_the_stored_ones():
+    assert store_price_history(_prices(10.0)) == (2, 0)
+    assert store_price_history(_prices(10.0)) == (0, 0)
+    assert store_price_history(_prices(12.5)) == (0, 1)
+    history = price_history()
+    assert len(history) == 2
+    assert sorted(history["Ceiling Price"]) == [5.0, 12.5]
+
+
+def test_reports_leave_out_the_ndc_key():
+    invoices = pd.DataFrame({"NDC": ["0002-1433-80"], "Invoice Date": ["2025-02-01"], "Unit Price": [11.0]})
+    checked = check_invoices(invoices, _prices(10.0))
+    assert "NDC Key" not in checked.columns
+    assert checked["Overcharge Amount"].tolist() == [1.0]
+
+
+def test_shared_columns_come_from_the_invoice():
+    invoices = pd.DataFrame({
+        "NDC": ["0002-1433-80"], "Invoice Date": ["2025-02-01"], "Unit Price": [11.0], "Manufacturer": ["Lilly"],
+    })
+    prices = _prices(10.0).assign(Manufacturer="Eli Lilly")
+    checked = check_invoices(invoices, prices)
+    assert "Manufacturer_x" not in checked.columns
+    assert overcharge_rollup(checked[checked["Overcharged"]])["Manufacturer"].tolist() == ["Lilly"]
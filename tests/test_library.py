@@ -0,0 +1,68 @@
+"""Tests for the document library and its identifier postings."""
+
+from io import BytesIO
+
+import pandas as pd
+import pytest
+
+from utils import library
+
+
+@pytest.fixture(autouse=True)
+def objects(tmp_path, monkeypatch):
+    monkeypatch.setattr(library, "OBJECTS_FOLDER", str(tmp_path / "objects"))
+
+
+def _upload(frame):
+    data = BytesIO()
+    frame.to_csv(data, index=False)
+    data.seek(0)
+    return data
+
+
+def test_postings_collapse_consecutive_rows():
+    frame = pd.DataFrame({"NDC": ["0002-1433-80"] * 3 + [None, "00002143380", "not an ndc"]})
+    postings = library.sheet_postings(frame, "Claims")
+    assert postings[["Term", "Kind", "Sheet", "Rows", "Mentions"]].values.tolist() == [
+        ["00002143380", "NDC", "Claims", "2-4,6", 4],
+    ]
+
+
+def test_search_normalizes_each_kind():
+    frame = pd.DataFrame({
+        "NDC": ["0002-1433-80", "01234567890"],
+        "Prescriber NPI": ["1234567890", "1234567890"],
+        "Site Address": ["123 Main Street", "9 Oak Ave"],
+    })
+    entry, new = library.add_document(_upload(frame), "claims.csv", "Claims")
+    assert new
+    assert not library.add_document(_upload(frame), "claims.csv", "Claims")[1]
+
+    assert library.search_library("00002-1433-80")[["Kind", "Rows"]].values.tolist() == [["NDC", "2"]]
+    assert library.search_library("123 MAIN ST")[["Kind", "Rows"]].values.tolist() == [["Address", "2"]]
+    assert library.search_library("nothing here").empty
+
+
+def test_an_npi_query_does_not_match_zero_padded_ndcs():
+    frame = pd.DataFrame({"NDC": ["01234567890"], "NPI": ["1234567890"]})
+    library.add_document(_upload(frame), "claims.csv", "Claims")
+    hits = library.search_library("1234567890")
+    assert hits[["Kind", "Term"]].values.tolist() == [["NPI", "1234567890"]]
+    assert library.search_library("01234567890")["Kind"].tolist() == ["NDC"]
+
+
+def test_identical_content_is_stored_once(tmp_path):
+    data = b"NDC\n00002143380\n"
+    digest, size = library.file_digest(BytesIO(data))
+    assert size == len(data)
+    path, written = library.store_object(BytesIO(data), digest)
+    assert written
+    assert library.store_object(BytesIO(data), digest) == (path, False)
+    assert open(path, "rb").read() == data
+    assert not [p for p in (tmp_path / "objects").rglob("*.part")]
+
+    # The same content under another name and category shares the stored object
+    first, _ = library.add_document(BytesIO(data), "a.csv", "Invoices")
+    second, new = library.add_document(BytesIO(data), "b.csv", "Contracts")
+    assert new and first["Path"] == second["Path"] == path
+    assert library.library_index()["Category"].tolist() == ["Invoices", "Contracts"]
@@ -0,0 +1,60 @@
+"""Tests for the cached table loader."""
+
+import pandas as pd
+
+from utils import loaders
+
+
+def _csv(tmp_path, name, rows):
+    path = tmp_path / name
+    pd.DataFrame({"NDC": [f"{i:011d}" for i in range(rows)], "Quantity": range(rows)}).to_csv(path, index=False)
+    return path
+
+
+def test_memory_cache_is_bounded_in_bytes(tmp_path, monkeypatch):
+    monkeypatch.setattr(loaders, "CACHE_FOLDER", str(tmp_path / "cache"))
+    monkeypatch.setattr(loaders, "_memory", type(loaders._memory)())
+    monkeypatch.setattr(loaders, "_memory_bytes", 0)
+    small = _csv(tmp_path, "small.csv", 10)
+    frame_bytes = int(loaders.load_table(small).memory_usage(index=True, deep=True).sum())
+    monkeypatch.setattr(loaders, "MAX_MEMORY_BYTES", frame_bytes * 2)
+
+    for i in range(3):
+        loaders.load_table(_csv(tmp_path, f"copy{i}.csv", 10 + i))
+    assert loaders._memory_bytes <= loaders.MAX_MEMORY_BYTES
+    assert len(loaders._memory) < 4
+
+    # A frame over the whole budget is returned but not kept
+    large = loaders.load_table(_csv(tmp_path, "large.csv", 1000))
+    assert len(large) == 1000
+    assert loaders._memory_bytes <= loaders.MAX_MEMORY_BYTES
+
+
+def test_spill_leaves_no_temp_files(tmp_path, monkeypatch):
+    folder = tmp_path / "cache"
+    monkeypatch.setattr(loaders, "CACHE_FOLDER", str(folder))
+    loaders.load_table(_csv(tmp_path, "claims.csv", 5))
+    assert not [p for p in folder.iterdir() if p.suffix == ".tmp"]
+
+
+def test_only_date_columns_are_parsed_as_dates(tmp_path, monkeypatch):
+    monkeypatch.setattr(loaders, "CACHE_FOLDER", str(tmp_path / "cache"))
+    path = tmp_path / "log.csv"
+    pd.DataFrame({
+        "Date": ["2025-01-01"], "Go-Live Date": ["2025-02-01"], "Date Submitted": ["2025-03-01"],
+        "Date Submitted Notes": ["2025-04-01"], "Update Reason": ["2025-05-01"],
+    }).to_csv(path, index=False)
+    df = loaders.load_table(path)
+    parsed = [c for c in df.columns if pd.api.types.is_datetime64_any_dtype(df[c])]
+    assert parsed == ["Date", "Go-Live Date", "Date Submitted"]
+
+
+def test_changed_parsing_rules_miss_the_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(loaders, "CACHE_FOLDER", str(tmp_path / "cache"))
+    monkeypatch.setattr(loaders, "_memory", type(loaders._memory)())
+    path = tmp_path / "claims.csv"
+    pd.DataFrame({"Rx Number": ["00123"]}).to_csv(path, index=False)
+    assert loaders.load_table(path)["Rx Number"].tolist() == [123]
+
+    monkeypatch.setattr(loaders, "IDENTIFIER_COLUMNS", loaders.IDENTIFIER_COLUMNS + ["Rx Number"])
+    assert loaders.load_table(path)["Rx Number"].tolist() == ["00123"]
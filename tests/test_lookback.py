@@ -0,0 +1,50 @@
+"""Tests for the lookback window join."""
+
+import numpy as np
+import pandas as pd
+
+from utils.lookback import eligible_dispenses, lookback_grid, qualifies, visit_gaps
+
+
+def _visits():
+    return pd.DataFrame({
+        "Patient ID": ["A", "A", "B"],
+        "Visit Date": ["2025-01-01", "2025-01-11", "2025-03-01"],
+        "Visit ID": ["V1", "V2", "V3"],
+    })
+
+
+def _dispenses():
+    return pd.DataFrame({
+        "Patient ID": ["A", "A", "B", "C"],
+        "Dispense Date": ["2025-01-06", "2025-01-09", "2025-02-20", "2025-01-01"],
+        "Savings": [10.0, 20.0, 30.0, 40.0],
+    })
+
+
+def test_gaps_to_the_prior_and_next_visit():
+    gaps = visit_gaps(_dispenses(), _visits())
+    assert gaps["Days Before"].tolist() == [5, 8, pd.NA, pd.NA]
+    assert gaps["Days After"].tolist() == [5, 2, 9, pd.NA]
+    assert gaps["Prior Visit"].tolist() == [0, 0, -1, -1]
+    assert gaps["Next Visit"].tolist() == [1, 1, 2, -1]
+
+
+def test_a_tie_goes_to_the_later_visit():
+    disp, visits = _dispenses(), _visits()
+    gaps = visit_gaps(disp, visits)
+    assert qualifies(gaps, 5, 5).tolist() == [True, True, False, False]
+    joined = eligible_dispenses(disp, visits, gaps, 10, 10)
+    # Five days either side of the first dispense: the later visit wins; the second is closer to V2
+    assert joined["Visit ID"].tolist() == ["V2", "V2", "V3"]
+
+
+def test_grid_matches_each_window_checked_directly():
+    disp = _dispenses()
+    gaps = visit_gaps(disp, _visits())
+    grid = lookback_grid(gaps, disp["Savings"], max_days=10)
+    assert len(grid) == 11 * 11
+    for row in grid.itertuples(index=False):
+        mask = qualifies(gaps, row[0], row[1]).to_numpy()
+        assert row[2] == mask.sum()
+        assert np.isclose(row[3], disp["Savings"].to_numpy()[mask].sum())
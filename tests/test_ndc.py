@@ -0,0 +1,35 @@
+"""Tests for NDC canonicalization."""
+
+import pandas as pd
+
+from utils.ndc import canonical_ndc, merge_on_ndc, ndc_isin
+
+
+def test_ten_digit_formats_pad_the_right_segment():
+    ndcs = ["0002-1433-80", "50242-040-62", "60505-2519-8", "00002-1433-80"]
+    assert canonical_ndc(ndcs).tolist() == ["00002143380", "50242004062", "60505251908", "00002143380"]
+
+
+def test_plain_digits_are_eleven_digit_codes():
+    # Excel integers lose their leading zeros; floats gain a ".0"
+    assert canonical_ndc(["00002143380", "2143380", 2143380, "2143380.0"]).tolist() == ["00002143380"] * 4
+
+
+def test_unrecognized_and_missing_values():
+    keys = canonical_ndc([" ABC-1 ", None, "123456789012"])
+    assert keys.iloc[0] == "ABC-1"
+    assert pd.isna(keys.iloc[1])
+    assert keys.iloc[2] == "123456789012"
+
+
+def test_spaces_separate_segments():
+    assert canonical_ndc(["0002 1433 80"]).tolist() == ["00002143380"]
+
+
+def test_joins_and_lookups_use_the_key():
+    left = pd.DataFrame({"NDC": ["0002-1433-80", "50242-040-62"], "Qty": [1, 2]})
+    right = pd.DataFrame({"NDC": ["00002143380"], "Price": [9.5]})
+    merged = merge_on_ndc(left, right, how="left")
+    assert merged["NDC"].tolist() == ["0002-1433-80", "50242-040-62"]
+    assert merged["Price"].fillna(0).tolist() == [9.5, 0]
+    assert ndc_isin(left["NDC"], right["NDC"]).tolist() == [True, False]
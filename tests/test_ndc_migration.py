@@ -0,0 +1,58 @@
+"""Tests for NDC migration chains."""
+
+import pandas as pd
+
+from utils.ndc_migration import (
+    CURRENT, CYCLE, FORK, MIGRATION_ALLOWED, MIGRATION_NOT_ALLOWED, compile_migrations, default_ndc_check,
+    migration_report,
+)
+
+
+def _ndc(digit):
+    return str(digit) * 11
+
+
+def _migrations():
+    hops = [
+        (1, 2, "Yes"), (2, 3, "Yes"), (3, 4, "Yes"),  # chain 1 -> 2 -> 3 -> 4
+        (5, 6, "No"),                                 # one hop, not allowed
+        (7, 8, "Yes"), (8, 7, "Yes"),                 # cycle
+        (9, 6, "Yes"), (9, 4, "Yes"),                 # fork
+    ]
+    return pd.DataFrame({
+        "Old NDC": [_ndc(a) for a, _, _ in hops],
+        "New NDC": [_ndc(b) for _, b, _ in hops],
+        "Allow Migration": [allow for _, _, allow in hops],
+    })
+
+
+def test_chains_resolve_to_the_current_ndc():
+    chains = compile_migrations(_migrations()).set_index("Old NDC")
+    assert chains.loc[_ndc(1), ["New NDC", "Resolved NDC", "Hops"]].tolist() == [_ndc(2), _ndc(4), 3]
+    assert chains.loc[_ndc(3), ["Resolved NDC", "Hops"]].tolist() == [_ndc(4), 1]
+    assert bool(chains.loc[_ndc(1), "All Hops Allowed"])
+    assert not chains.loc[_ndc(5), "All Hops Allowed"]
+
+
+def test_cycles_and_forks_are_flagged():
+    chains = compile_migrations(_migrations()).set_index("Old NDC")
+    assert chains.loc[[_ndc(7), _ndc(8)], "Chain Issue"].tolist() == [CYCLE, CYCLE]
+    assert chains.loc[[_ndc(7), _ndc(8)], "Resolved NDC"].isna().all()
+    assert chains.loc[_ndc(9), "Chain Issue"] == FORK
+    assert chains.loc[_ndc(1), "Chain Issue"] == ""
+
+
+def test_a_chain_into_a_fork_is_a_fork():
+    migrations = pd.concat([_migrations(), pd.DataFrame({"Old NDC": [_ndc(0)], "New NDC": [_ndc(9)]})])
+    chains = compile_migrations(migrations).set_index("Old NDC")
+    assert chains.loc[_ndc(0), "Chain Issue"] == FORK
+
+
+def test_report_statuses():
+    acc = pd.DataFrame({"NDC": [_ndc(1), _ndc(5), _ndc(7), _ndc(9), _ndc(4)]})
+    report = migration_report(acc, _migrations())
+    assert report["Migration Status"].tolist() == [MIGRATION_ALLOWED, MIGRATION_NOT_ALLOWED, CYCLE, FORK, CURRENT]
+
+    defaults = default_ndc_check(pd.DataFrame({"Default NDC": [_ndc(2), _ndc(4)]}), _migrations())
+    assert defaults["Resolved NDC"].tolist()[0] == _ndc(4)
+    assert defaults["Default NDC Status"].tolist()[1] == "✅ Default is current"
@@ -0,0 +1,57 @@
+"""Tests for the what-if Monte Carlo engine."""
+
+import numpy as np
+import pandas as pd
+
+from utils.scenarios import (
+    DRIVERS, SITE_DRIVER, SITE_SAVINGS, distribution_summary, fit_pool, report_amounts, simulate, tornado,
+)
+
+
+def test_report_amounts_keep_positive_numbers_of_the_first_known_column():
+    report = pd.DataFrame({"Overcharge Amount": [5, -1, None, "x"], "Overcharge Total": [10, 20, 0, 30]})
+    assert report_amounts(report, "Resolved Overcharges").tolist() == [10, 20, 30]
+    assert report_amounts(None, "Resolved Overcharges").size == 0
+
+
+def test_pools_sum_their_items():
+    amounts = np.array([3.0, 4.0])
+    assert fit_pool(amounts, 100) == {"Mean": 7.0, "Std": 5.0, "Items": 2, "Source": "Report"}
+    assert fit_pool(amounts, 100, per_item=True)["Mean"] == 3.5
+    assert fit_pool(np.array([]), 100) == {"Mean": 100.0, "Std": 0.0, "Items": 0, "Source": "Default"}
+
+
+def _fits():
+    fits = {driver: fit_pool(np.array([]), spec["default"]) for driver, spec in DRIVERS.items()}
+    fits["Resolved Overcharges"] = fit_pool(np.array([1000.0] * 50), 0)
+    return fits
+
+
+def test_simulation_matches_the_fitted_means():
+    rates = {"Recovered Waste Savings": 0.5, "Resolved Overcharges": 0.8, "Recouped Drug Returns": 1.0}
+    draws = simulate(_fits(), rates, new_sites=2, scenarios=200_000, seed=1)
+    assert list(draws.columns) == list(rates) + [SITE_SAVINGS, "Total"]
+    # Fixed drivers times a Beta rate around the slider value; the fitted pool is lognormal
+    assert np.isclose(draws["Recovered Waste Savings"].mean(), 50_000 * 0.5, rtol=0.01)
+    assert np.isclose(draws["Resolved Overcharges"].mean(), 50_000 * 0.8, rtol=0.01)
+    assert (draws["Recouped Drug Returns"] == 20_000).all()
+    assert (draws[SITE_SAVINGS] == 2 * DRIVERS[SITE_DRIVER]["default"]).all()
+    assert np.allclose(draws["Total"], draws.drop(columns="Total").sum(axis=1))
+
+
+def test_same_seed_same_draws():
+    rates = {"Resolved Overcharges": 0.8}
+    pd.testing.assert_frame_equal(simulate(_fits(), rates, 0, 1000, seed=3), simulate(_fits(), rates, 0, 1000, seed=3))
+
+
+def test_tornado_ranks_by_swing():
+    draws = pd.DataFrame({"Narrow": np.linspace(9, 11, 101), "Wide": np.linspace(0, 20, 101)})
+    draws["Total"] = draws.sum(axis=1)
+    summary = distribution_summary(draws)
+    assert summary["Component"].tolist() == ["Narrow", "Wide", "Total"]
+    assert np.allclose(summary["P50 ($)"], [10, 10, 20])
+
+    ranking = tornado(summary)
+    assert ranking["Driver"].tolist() == ["Wide", "Narrow"]
+    assert np.allclose(ranking["Swing ($)"], [16, 1.6])
+    assert np.allclose(ranking["Total at P10 ($)"], [12, 19.2])
@@ -0,0 +1,97 @@
+"""Tests for the SQLite library store."""
+
+import os
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from utils import store
+
+
+def test_failed_replace_keeps_the_old_rows():
+    store.replace_table("compliance_flags", pd.DataFrame({"Flag": ["A", "B"], "NDC": ["1", "2"]}))
+    # A list cannot be bound as a SQLite value, so the insert fails after the DROP
+    broken = pd.DataFrame({"Flag": ["C"], "NDC": [["3"]]})
+    with pytest.raises((sqlite3.Error, ValueError, TypeError)):
+        store.replace_table("compliance_flags", broken)
+    assert store.read_table("compliance_flags")["Flag"].tolist() == ["A", "B"]
+
+
+def test_failed_csv_import_keeps_the_old_rows(library):
+    store.replace_table("provider_list", pd.DataFrame({"NPI": ["1234567890"]}))
+    (library / "provider_list.csv").write_text('NPI\n"unterminated\n')
+    with pytest.raises(Exception):
+        store.read_table("provider_list")
+    with sqlite3.connect(store.DB_PATH) as conn:
+        assert conn.execute('SELECT "NPI" FROM "provider_list"').fetchall() == [("1234567890",)]
+
+
+def test_append_keeps_the_rollup_in_step():
+    log = "change_evaluation_log"
+    rows = pd.DataFrame({"Change Type": ["New Drug", "New Drug", "Policy Revision"], "ROI (%)": [10.0, 30.0, 5.0]})
+    store.append_rows(log, rows)
+    store.append_rows(log, rows.iloc[:1])
+    rollup = store.read_table("change_evaluation_rollup").set_index("Change Type")
+    assert rollup.loc["New Drug", "Rows"] == 3
+    assert rollup.loc["New Drug", "ROI (%)"] == 50.0
+    assert rollup.loc["Policy Revision", "Rows"] == 1
+
+
+def test_every_write_changes_the_version():
+    log = "change_evaluation_log"
+    rows = pd.DataFrame({"Change Type": ["New Drug", "Policy Revision"], "ROI (%)": [10.0, 5.0]})
+    versions = [store.table_version(log)]
+    store.append_rows(log, rows)
+    versions.append(store.table_version(log))
+    store.delete_rows(log, "Change Type", ["Policy Revision"])
+    versions.append(store.table_version(log))
+    store.append_rows(log, rows.iloc[1:])
+    versions.append(store.table_version(log))
+    assert len(set(versions)) == len(versions)
+    assert store.read_table("change_evaluation_rollup").set_index("Change Type")["Rows"].to_dict() == {
+        "New Drug": 1, "Policy Revision": 1,
+    }
+
+
+def test_update_sees_rows_written_before_it():
+    store.append_rows("compliance_flags", pd.DataFrame({"Flag": ["A"], "NDC": ["1"]}))
+    store.update_table("compliance_flags", lambda rows: (rows.assign(Flag="B"), True))
+    store.update_table("compliance_flags", lambda rows: (pd.DataFrame({"Flag": ["C"], "NDC": [str(len(rows))]}), False))
+    assert store.read_table("compliance_flags").values.tolist() == [["B", "1"], ["C", "1"]]
+
+
+def test_changed_csv_keeps_rows_written_through_the_store(library):
+    csv = library / "change_evaluation_log.csv"
+    pd.DataFrame({"Change Type": ["Policy Revision"], "Estimated Cost ($)": [100]}).to_csv(csv, index=False)
+    store.append_rows("change_evaluation_log", pd.DataFrame({"Change Type": ["New Vendor"], "Estimated Cost ($)": [50]}))
+
+    # Touching the file re-reads it without dropping the appended row
+    os.utime(csv, (os.path.getmtime(csv) + 10, os.path.getmtime(csv) + 10))
+    assert store.read_table("change_evaluation_log")["Change Type"].tolist() == ["Policy Revision", "New Vendor"]
+
+    # Rows the file gains are merged in, once
+    pd.DataFrame({"Change Type": ["Policy Revision", "Software Update"], "Estimated Cost ($)": [100, 20]}).to_csv(
+        csv, index=False
+    )
+    assert store.read_table("change_evaluation_log")["Change Type"].tolist() == [
+        "Policy Revision", "New Vendor", "Software Update",
+    ]
+    assert store.read_table("change_evaluation_rollup").set_index("Change Type")["Rows"].to_dict() == {
+        "Policy Revision": 1, "New Vendor": 1, "Software Update": 1,
+    }
+
+
+def test_delete_imports_the_csv_first(library):
+    pd.DataFrame({"NPI": ["1", "2"]}).to_csv(library / "provider_list.csv", index=False)
+    store.delete_rows("provider_list", "NPI", ["1"])
+    assert store.read_table("provider_list")["NPI"].tolist() == ["2"]
+
+
+def test_rollup_reads_import_the_log_first(library):
+    pd.DataFrame({"Change Type": ["New Drug", "New Drug"], "ROI (%)": [10, 30]}).to_csv(
+        library / "change_evaluation_log.csv", index=False
+    )
+    rollup = store.read_table("change_evaluation_rollup").set_index("Change Type")
+    assert rollup.loc["New Drug", "Rows"] == 2
+    assert rollup.loc["New Drug", "ROI (%)"] == 40
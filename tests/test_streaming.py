@@ -0,0 +1,37 @@
+"""Tests for chunked claims screening."""
+
+import os
+
+from utils.streaming import read_flagged, stream_cached
+
+
+def test_header_only_upload_reads_as_no_rows(tmp_path):
+    claims = tmp_path / "claims.csv"
+    claims.write_text("NDC,Date\n")
+    cache = {}
+    output_path, rows_read, rows_flagged = stream_cached(cache, "a", str(claims), lambda chunk: chunk, prefix="test_")
+    assert (rows_read, rows_flagged) == (0, 0)
+    assert read_flagged(output_path).empty
+    os.remove(output_path)
+
+
+def test_reruns_reuse_the_output_until_the_key_changes(tmp_path):
+    claims = tmp_path / "claims.csv"
+    claims.write_text("NDC,Date\n1,2025-01-01\n2,2025-01-02\n")
+    screened = []
+
+    def screen(chunk):
+        screened.append(len(chunk))
+        return chunk[chunk["NDC"] == "1"]
+
+    cache = {}
+    first = stream_cached(cache, "a", str(claims), screen, prefix="test_")
+    assert stream_cached(cache, "a", str(claims), screen, prefix="test_") == first
+    assert screened == [2]
+    assert read_flagged(first[0])["NDC"].tolist() == [1]
+
+    second = stream_cached(cache, "b", str(claims), screen, prefix="test_")
+    assert screened == [2, 2]
+    assert second[0] != first[0]
+    assert not os.path.exists(first[0])
+    os.remove(second[0])
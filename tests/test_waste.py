@@ -0,0 +1,36 @@
+"""Tests for the stored NDC package index."""
+
+import pandas as pd
+
+from utils import store
+from utils.waste import MG_PER_UNIT, PACKAGE_TABLE, package_index, store_packages, stored_packages
+
+
+def _packages(strength):
+    return pd.DataFrame({"NDC": ["00002143380"], "Strength (mg/mL)": [strength], "Volume (mL)": [2], "Billing Unit": ["EA"]})
+
+
+def test_other_writers_are_seen(library):
+    store_packages(_packages(10))
+    assert stored_packages()[MG_PER_UNIT].tolist() == [20.0]
+
+    # Another process replaces the table directly
+    store.replace_table(PACKAGE_TABLE, package_index(_packages(25)))
+    assert stored_packages()[MG_PER_UNIT].tolist() == [50.0]
+
+    # Rows a changed CSV adds are picked up too, and win over the stored ones
+    package_index(_packages(5)).to_csv(library / "ndc_package_index.csv", index=False)
+    assert stored_packages()[MG_PER_UNIT].tolist() == [10.0]
+
+
+def test_each_database_has_its_own_index(library, monkeypatch):
+    store_packages(_packages(10))
+    assert stored_packages()[MG_PER_UNIT].tolist() == [20.0]
+
+    # Another database at the same table version
+    other = library / "other"
+    other.mkdir()
+    monkeypatch.setattr(store, "LIBRARY_FOLDER", str(other))
+    monkeypatch.setattr(store, "DB_PATH", str(other / "library.db"))
+    store_packages(_packages(25))
+    assert stored_packages()[MG_PER_UNIT].tolist() == [50.0]
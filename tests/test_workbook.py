@@ -0,0 +1,41 @@
+"""Tests for the streaming workbook writer."""
+
+import threading
+from io import BytesIO
+
+import pandas as pd
+
+from utils import store, workbook
+
+
+def test_writer_error_does_not_leave_readers_blocked(monkeypatch):
+    store.replace_table("compliance_flags", pd.DataFrame({"Flag": ["A"] * 50, "NDC": [str(i) for i in range(50)]}))
+    monkeypatch.setattr(workbook, "FETCH_ROWS", 1)
+    monkeypatch.setattr(workbook, "_READ_AHEAD", 1)
+
+    def fail(state, rows, max_rows):
+        raise ValueError("disk full")
+
+    monkeypatch.setattr(workbook, "_write_rows", fail)
+    result = {}
+
+    def build():
+        try:
+            workbook.build_workbook({"Flags": ("compliance_flags", None), "More": ("compliance_flags", None)})
+        except ValueError as e:
+            result["error"] = e
+
+    thread = threading.Thread(target=build, daemon=True)
+    thread.start()
+    thread.join(timeout=30)
+    assert not thread.is_alive()
+    assert str(result["error"]) == "disk full"
+
+
+def test_tabs_split_at_the_row_limit():
+    store.replace_table("compliance_flags", pd.DataFrame({"Flag": list("ABCDE"), "NDC": list("12345")}))
+    data, summary = workbook.build_workbook({"Flags": ("compliance_flags", None)}, max_rows=2)
+    assert summary["Sheets"].tolist() == [3]
+    sheets = pd.read_excel(BytesIO(data), sheet_name=None)
+    assert list(sheets) == ["Flags", "Flags (2)", "Flags (3)"]
+    assert pd.concat(sheets.values())["Flag"].tolist() == list("ABCDE")
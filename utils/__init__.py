@@ -0,0 +1 @@
+"""Shared 340B analysis helpers used by the Streamlit pages."""
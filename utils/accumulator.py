@@ -0,0 +1,201 @@
+"""Accumulator Validation
+
+Compares claims or dispenses with TPA accumulator postings to find 340B claims that
+never accumulated and accumulations that were never billed as 340B, and keeps a
+unit-level accumulation ledger per NDC and account that measures how far postings
+run ahead of or behind the packages actually dispensed.
+"""
+
+import numpy as np
+import pandas as pd
+
+from utils.ndc import NDC_KEY, canonical_ndc, ndc_frames
+
+
+NOT_ACCUMULATED = "❌ Claimed as 340B but not accumulated (Duplicate Risk)"
+NOT_BILLED = "⚠️ Accumulated but not billed as 340B (Lost Savings)"
+NO_ACCUMULATION = "❌ No accumulation found"
+
+
+def check_accumulation(claims_df, acc_df):
+    """Match claims to accumulator postings on NDC and date and add an ``Issue`` column."""
+    # Normalize dates
+    acc_df["Date"] = pd.to_datetime(acc_df["Date"])
+    claims_df["Date"] = pd.to_datetime(claims_df["Date"])
+
+    # Merge on canonical NDC and Date, one posting per day so claims are never duplicated
+    claims_df, acc_df = ndc_frames(claims_df, acc_df)
+    acc_df = acc_df.drop_duplicates(subset=[NDC_KEY, "Date"])
+    merged = pd.merge(claims_df, acc_df, on=[NDC_KEY, "Date"], how="left", suffixes=("_claim", "_accum"))
+
+    # Check accumulation presence
+    account_col = "Account Type_accum" if "Account Type_accum" in merged.columns else "Account Type"
+    merged["Accumulated"] = merged[account_col].notna()
+
+    accumulated = merged["Accumulated"].to_numpy()
+    if "Billed 340B" in merged.columns:
+        billed = merged["Billed 340B"].astype(bool).to_numpy()
+        merged["Issue"] = np.select(
+            [billed & ~accumulated, ~billed & accumulated], [NOT_ACCUMULATED, NOT_BILLED], default=""
+        )
+    else:
+        merged["Issue"] = np.where(accumulated, "", NO_ACCUMULATION)
+    return merged
+
+
+def flag_accumulation(claims_df, acc_df):
+    """Return only the claims with an accumulation issue."""
+    merged = check_accumulation(claims_df, acc_df)
+    return merged[merged["Issue"] != ""]
+
+
+# Ledger defaults: dispense units, package conversion, and how late a posting may land
+UNITS_COLUMN = "Quantity"
+PACKAGES_COLUMN = "Packages"
+PACKAGE_SIZE_COLUMN = "Package Size"
+DEFAULT_TOLERANCE_DAYS = 3
+LEDGER_KEYS = ["NDC", "Account Type"]
+
+# Account a dispense accrues to when the file only says whether it was billed as 340B
+BILLED_ACCOUNTS = {True: "340B", False: "WAC"}
+
+
+def _with_accounts(df):
+    """Return ``df`` with an ``Account Type``, derived from ``Billed 340B`` when missing."""
+    if "Account Type" in df.columns or "Billed 340B" not in df.columns:
+        return df
+    df = df.copy()
+    df["Account Type"] = df["Billed 340B"].astype(bool).map(BILLED_ACCOUNTS)
+    return df
+
+
+def _ledger_keys(dispenses, postings):
+    """Return the ledger keys both files carry (always at least ``NDC``)."""
+    return [k for k in LEDGER_KEYS if k in dispenses.columns and k in postings.columns]
+
+
+def daily_units(dispenses, keys=LEDGER_KEYS):
+    """Reduce dispenses to total units per ledger key and day.
+
+    Daily totals add up across chunks, so a streamed claims file can be reduced chunk by
+    chunk and the combined totals passed to :func:`accumulation_ledger`.
+    """
+    dispenses = _with_accounts(dispenses)
+    keys = [k for k in keys if k in dispenses.columns]
+    df = dispenses[keys].copy()
+    df["NDC"] = canonical_ndc(dispenses["NDC"])
+    df["Date"] = pd.to_datetime(dispenses["Date"]).dt.normalize()
+    df[UNITS_COLUMN] = pd.to_numeric(dispenses[UNITS_COLUMN], errors="coerce").fillna(0)
+    return df.groupby(keys + ["Date"], as_index=False, observed=True, dropna=False)[UNITS_COLUMN].sum()
+
+
+def package_sizes(dispenses):
+    """Return the first ``Package Size`` given for each NDC, indexed by canonical NDC.
+
+    Like :func:`daily_units` this reduces a streamed file chunk by chunk; concatenate the
+    chunks' sizes and pass them to :func:`accumulation_ledger` as ``package_size``.
+    """
+    if PACKAGE_SIZE_COLUMN not in dispenses.columns:
+        return pd.Series(dtype=float)
+    sizes = pd.to_numeric(dispenses[PACKAGE_SIZE_COLUMN], errors="coerce")
+    sizes.index = canonical_ndc(dispenses["NDC"]).astype(object)
+    sizes = sizes[(sizes > 0) & sizes.index.notna()]
+    return sizes[~sizes.index.duplicated()]
+
+
+def _daily_packages(postings, keys):
+    """Reduce accumulator postings to packages per ledger key and day (one per row by default)."""
+    df = postings[keys].copy()
+    df["NDC"] = canonical_ndc(postings["NDC"])
+    df["Date"] = pd.to_datetime(postings["Date"]).dt.normalize()
+    if PACKAGES_COLUMN in postings.columns:
+        df[PACKAGES_COLUMN] = pd.to_numeric(postings[PACKAGES_COLUMN], errors="coerce").fillna(0)
+    else:
+        df[PACKAGES_COLUMN] = 1
+    return df.groupby(keys + ["Date"], as_index=False, observed=True, dropna=False)[PACKAGES_COLUMN].sum()
+
+
+def _package_sizes(ledger, dispenses, postings, package_size):
+    """Return units per package for each ledger row.
+
+    ``package_size`` may be a number or an NDC-indexed Series; otherwise a ``Package Size``
+    column in either file is used, falling back to one unit per package.
+    """
+    if package_size is None:
+        for df in (postings, dispenses):
+            if PACKAGE_SIZE_COLUMN in df.columns:
+                package_size = df.set_index("NDC")[PACKAGE_SIZE_COLUMN]
+                break
+    if isinstance(package_size, pd.Series):
+        package_size = package_size.set_axis(canonical_ndc(package_size.index.to_series()).astype(object))
+        package_size = package_size[~package_size.index.duplicated()]
+        sizes = ledger["NDC"].astype(object).map(package_size)
+    else:
+        sizes = pd.Series(package_size, index=ledger.index)
+    return pd.to_numeric(sizes, errors="coerce").where(lambda s: s > 0).fillna(1)
+
+
+def accumulation_ledger(dispenses, postings, package_size=None, tolerance_days=DEFAULT_TOLERANCE_DAYS):
+    """Build a running accumulation ledger per NDC/account and compare it with the postings.
+
+    ``dispenses`` are claim-level rows (or :func:`daily_units` totals) with ``NDC``,
+    ``Date`` and ``Quantity``; ``postings`` are accumulator rows with ``NDC``, ``Date`` and
+    optionally ``Packages``. Dispensed units accumulate into whole packages, and a posting
+    may land up to ``tolerance_days`` after (or before) the dispenses that earned it.
+    Each ledger row is one key/day with the cumulative units, earned and posted packages,
+    and any ``Under-Accumulated Units`` / ``Over-Accumulated Units`` outstanding that day.
+    NDCs are grouped by their canonical 11-digit key, which the ledger reports as ``NDC``.
+    """
+    dispenses = _with_accounts(dispenses)
+    keys = _ledger_keys(dispenses, postings)
+
+    units = daily_units(dispenses, keys)
+    posted = _daily_packages(postings, keys)
+    ledger = pd.merge(units, posted, on=keys + ["Date"], how="outer")
+    ledger[[UNITS_COLUMN, PACKAGES_COLUMN]] = ledger[[UNITS_COLUMN, PACKAGES_COLUMN]].fillna(0)
+    ledger = ledger.sort_values(keys + ["Date"], kind="stable", ignore_index=True)
+
+    # Running totals per key from one sort and group-wise cumsums
+    groups = ledger.groupby(keys, observed=True, dropna=False, sort=False)
+    ledger["Package Size"] = _package_sizes(ledger, dispenses, postings, package_size)
+    ledger["Cumulative Units"] = groups[UNITS_COLUMN].cumsum()
+    ledger["Packages Earned"] = np.floor(ledger["Cumulative Units"] / ledger["Package Size"])
+    ledger["Packages Posted"] = groups[PACKAGES_COLUMN].cumsum()
+
+    # Position of each key 'tolerance_days' later: the last ledger day on or before it
+    ahead = ledger[keys + ["Date"]].copy()
+    ahead["Date"] = ahead["Date"] + pd.Timedelta(days=tolerance_days)
+    ahead["_row"] = np.arange(len(ledger))
+    totals = ledger[keys + ["Date", "Packages Earned", "Packages Posted"]]
+    later = pd.merge_asof(
+        ahead.sort_values("Date", kind="stable"),
+        totals.sort_values("Date", kind="stable"),
+        on="Date", by=keys, direction="backward",
+    ).sort_values("_row")
+
+    # Earned but still not posted after the tolerance, and posted before being earned
+    short = ledger["Packages Earned"].to_numpy() - later["Packages Posted"].to_numpy()
+    excess = ledger["Packages Posted"].to_numpy() - later["Packages Earned"].to_numpy()
+    size = ledger["Package Size"].to_numpy()
+    ledger["Under-Accumulated Units"] = np.clip(short, 0, None) * size
+    ledger["Over-Accumulated Units"] = np.clip(excess, 0, None) * size
+
+    ledger["Ledger Status"] = np.select(
+        [ledger["Under-Accumulated Units"] > 0, ledger["Over-Accumulated Units"] > 0],
+        ["❌ Under-accumulated", "⚠️ Over-accumulated"],
+        default="✅ Balanced",
+    )
+    return ledger
+
+
+def ledger_summary(ledger):
+    """Return the closing ledger position for each NDC/account, largest discrepancies first."""
+    keys = [k for k in LEDGER_KEYS if k in ledger.columns]
+    closing = ledger.groupby(keys, observed=True, dropna=False, sort=False).tail(1)
+    closing = closing.assign(Discrepancy=closing["Under-Accumulated Units"] + closing["Over-Accumulated Units"])
+    closing = closing.sort_values("Discrepancy", ascending=False, kind="stable").drop(columns="Discrepancy")
+    columns = keys + [
+        "Date", "Cumulative Units", "Package Size", "Packages Earned", "Packages Posted",
+        "Under-Accumulated Units", "Over-Accumulated Units", "Ledger Status",
+    ]
+    return closing[columns].rename(columns={"Date": "Last Activity"}).reset_index(drop=True)
@@ -0,0 +1,169 @@
+"""Site Address Matching
+
+Normalizes street addresses (case, punctuation, USPS abbreviations such as Suite → STE
+and Street → ST) and matches invoice ship-to addresses to OPAIS registrations. Rather
+than comparing every pair, candidates are blocked on ZIP code plus shared address tokens
+(or the tokens alone when one side has no ZIP), and only the few best candidates per
+address are scored.
+"""
+
+import difflib
+import re
+
+import numpy as np
+import pandas as pd
+
+# USPS standard abbreviations for street suffixes, unit designators and directions
+ABBREVIATIONS = {
+    "street": "st", "str": "st", "avenue": "ave", "av": "ave", "road": "rd", "drive": "dr",
+    "boulevard": "blvd", "lane": "ln", "court": "ct", "place": "pl", "parkway": "pkwy",
+    "highway": "hwy", "circle": "cir", "terrace": "ter", "square": "sq", "trail": "trl",
+    "suite": "ste", "apartment": "apt", "building": "bldg", "floor": "fl", "room": "rm",
+    "department": "dept", "unit": "unit", "number": "", "no": "",
+    "north": "n", "south": "s", "east": "e", "west": "w",
+    "northeast": "ne", "northwest": "nw", "southeast": "se", "southwest": "sw",
+}
+
+ZIP_COLUMNS = ["ZIP", "Zip", "Zip Code", "ZIP Code", "Postal Code"]
+
+MATCHED = "✅ Matched"
+POSSIBLE = "⚠️ Possible Match"
+NOT_FOUND = "❌ Not in OPAIS"
+
+MATCH_THRESHOLD = 0.9
+REVIEW_THRESHOLD = 0.6
+
+# Candidate bounds: blocks larger than this are too common to discriminate, and only the
+# top candidates by shared tokens get the character-level comparison
+MAX_BLOCK_SIZE = 200
+MAX_CANDIDATES = 3
+
+_ZIP = re.compile(r"\b(\d{5})(?:-\d{4})?\b")
+
+
+def _normalize_one(address):
+    """Normalize a single address string."""
+    text = re.sub(r"[^a-z0-9\s]", " ", str(address).lower().replace("#", " ste "))
+    tokens = [ABBREVIATIONS.get(t, t) for t in text.split()]
+    return " ".join(t for t in tokens if t)
+
+
+def normalize_addresses(addresses):
+    """Return normalized addresses, processing each distinct value once."""
+    addresses = pd.Series(addresses)
+    codes, uniques = pd.factorize(addresses)
+    normalized = np.array([_normalize_one(a) for a in uniques] + [""], dtype=object)
+    return pd.Series(normalized[codes], index=addresses.index)
+
+
+def address_zips(df, address_col="Address"):
+    """Return each row's 5-digit ZIP from a ZIP column, else the last ZIP in the address."""
+    column = next((c for c in ZIP_COLUMNS if c in df.columns), None)
+    if column is not None:
+        zips = df[column].astype("string").str.extract(r"(\d{5})", expand=False)
+    else:
+        zips = df[address_col].astype("string").str.findall(_ZIP).str[-1]
+    return zips.fillna("").astype(object)
+
+
+def _tokens(ids, zips, normalized):
+    """Explode addresses into (id, zip, token) rows, leaving the ZIP out of the tokens."""
+    frame = pd.DataFrame({"id": ids, "zip": zips, "token": normalized.str.split()})
+    frame = frame.explode("token").dropna(subset=["token"])
+    return frame[frame["token"] != frame["zip"]].drop_duplicates()
+
+
+def _without_zip(normalized, zips):
+    """Drop each address's ZIP token, so an address compares equal with or without it."""
+    return pd.Series(
+        [" ".join(t for t in a.split() if t != z) for a, z in zip(normalized, zips)],
+        index=normalized.index, dtype=object,
+    )
+
+
+def _similarity(a, b):
+    """Character-level similarity of two normalized addresses, between 0 and 1."""
+    return difflib.SequenceMatcher(None, a, b, autojunk=False).ratio()
+
+
+def match_addresses(invoices, opais, address_col="Address"):
+    """Find the best OPAIS registration for each invoice address.
+
+    Returns a frame aligned with ``invoices`` holding the ``OPAIS Match`` address, a
+    ``Match Confidence`` between 0 and 1 and a ``Match Status``. Addresses identical after
+    normalization, apart from the ZIP, score 1; the rest score half token overlap, half
+    character similarity against their best blocked candidates. Each distinct invoice
+    address is matched once.
+    """
+    inv_norm = normalize_addresses(invoices[address_col])
+    inv_zip = address_zips(invoices, address_col)
+    op_norm = normalize_addresses(opais[address_col])
+    op_zip = address_zips(opais, address_col)
+
+    # Work on distinct (address, zip) pairs on both sides
+    inv_keys = pd.DataFrame({"address": inv_norm, "zip": inv_zip})
+    inv_codes, inv_unique = pd.factorize(pd.MultiIndex.from_frame(inv_keys))
+    inv_unique = inv_unique.to_frame(index=False, name=["address", "zip"])
+    op_unique = pd.DataFrame({"address": op_norm, "zip": op_zip, "row": np.arange(len(opais))})
+    op_unique = op_unique.drop_duplicates(["address", "zip"]).reset_index(drop=True)
+
+    # Addresses identical after normalization (ZIP aside) match outright, unless both
+    # sides have a ZIP and they differ; a same-ZIP registration is preferred
+    inv_unique["key"] = _without_zip(inv_unique["address"], inv_unique["zip"])
+    op_unique["key"] = _without_zip(op_unique["address"], op_unique["zip"])
+    exact = inv_unique.reset_index().merge(op_unique[op_unique["key"] != ""], on="key", suffixes=("", "_op"))
+    exact["other_zip"] = exact["zip"] != exact["zip_op"]
+    exact = exact[~exact["other_zip"] | (exact["zip"] == "") | (exact["zip_op"] == "")]
+    exact = exact.sort_values("other_zip", kind="stable").drop_duplicates("index")
+    confidence = np.zeros(len(inv_unique))
+    op_row = np.full(len(inv_unique), -1, dtype=np.int64)
+    confidence[exact["index"]] = 1.0
+    op_row[exact["index"]] = exact["row"]
+    pending = np.flatnonzero((op_row < 0) & (inv_unique["address"] != "").to_numpy())
+
+    # Block the rest on (ZIP, token), or on the token alone when either side has no ZIP;
+    # blocks shared by too many registrations are skipped
+    inv_tokens = _tokens(pending, inv_unique["zip"].to_numpy()[pending], inv_unique["address"].iloc[pending])
+    op_tokens = _tokens(np.arange(len(op_unique)), op_unique["zip"], op_unique["address"])
+    inv_len = np.bincount(inv_tokens["id"], minlength=len(inv_unique))
+    op_len = np.bincount(op_tokens["id"], minlength=len(op_unique))
+    op_zip_blocks = op_tokens[
+        (op_tokens["zip"] != "") & (op_tokens.groupby(["zip", "token"])["id"].transform("size") <= MAX_BLOCK_SIZE)
+    ]
+    op_token_blocks = op_tokens[op_tokens.groupby("token")["id"].transform("size") <= MAX_BLOCK_SIZE]
+    inv_has_zip = inv_tokens["zip"] != ""
+    pairs = pd.concat([
+        inv_tokens[inv_has_zip].merge(op_zip_blocks, on=["zip", "token"], suffixes=("_inv", "_op")),
+        inv_tokens[inv_has_zip].merge(op_token_blocks[op_token_blocks["zip"] == ""], on="token", suffixes=("_inv", "_op")),
+        inv_tokens[~inv_has_zip].merge(op_token_blocks, on="token", suffixes=("_inv", "_op")),
+    ])
+    pairs = pairs.groupby(["id_inv", "id_op"], as_index=False).size().rename(columns={"size": "shared"})
+
+    # Token Jaccard picks the top candidates; only those get the character comparison
+    union = inv_len[pairs["id_inv"]] + op_len[pairs["id_op"]] - pairs["shared"]
+    pairs["jaccard"] = pairs["shared"] / union.clip(lower=1)
+    pairs = pairs.sort_values(["id_inv", "jaccard"], ascending=[True, False], kind="stable")
+    pairs = pairs.groupby("id_inv").head(MAX_CANDIDATES)
+
+    pairs["chars"] = [
+        _similarity(a, b)
+        for a, b in zip(inv_unique["key"].to_numpy()[pairs["id_inv"]],
+                        op_unique["key"].to_numpy()[pairs["id_op"]])
+    ]
+    pairs["confidence"] = (pairs["jaccard"] + pairs["chars"]) / 2
+    best = pairs.sort_values("confidence", ascending=False, kind="stable").drop_duplicates("id_inv")
+    confidence[best["id_inv"]] = best["confidence"]
+    op_row[best["id_inv"]] = op_unique["row"].to_numpy()[best["id_op"]]
+
+    confidence = confidence[inv_codes]
+    op_row = op_row[inv_codes]
+    matched_address = opais[address_col].reset_index(drop=True).reindex(op_row).to_numpy()
+    return pd.DataFrame({
+        "OPAIS Match": np.where(op_row >= 0, matched_address, None),
+        "Match Confidence": confidence.round(3),
+        "Match Status": np.select(
+            [confidence >= MATCH_THRESHOLD, confidence >= REVIEW_THRESHOLD],
+            [MATCHED, POSSIBLE],
+            default=NOT_FOUND,
+        ),
+    }, index=invoices.index)
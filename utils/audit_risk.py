@@ -0,0 +1,140 @@
+"""Audit Finding Risk Scoring
+
+Matches current program areas against the areas named in historical audit findings and
+scores them. The finding areas are compiled once into an Aho–Corasick automaton, so each
+distinct area text is scanned in a single pass however many findings there are. An
+area's risk weighs how often it was cited, how severe the findings were and how recent
+they are.
+"""
+
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+LOW_RISK = "Low Risk"
+
+# Findings columns for severity and date, in order of preference
+SEVERITY_COLUMNS = ["Severity", "Risk Level", "Finding Severity"]
+DATE_COLUMNS = ["Finding Date", "Audit Date", "Date"]
+SEVERITY_WEIGHTS = {"critical": 4, "high": 3, "medium": 2, "moderate": 2, "low": 1}
+
+# A finding's weight halves every HALF_LIFE_YEARS before the latest finding
+HALF_LIFE_YEARS = 2.0
+
+# Unmatched areas score BASE_SCORE; the riskiest finding area scores MAX_SCORE
+BASE_SCORE = 10
+MAX_SCORE = 100
+
+
+def build_automaton(patterns):
+    """Compile patterns into an Aho–Corasick automaton: goto, failure and output tables."""
+    goto, fail, output = [{}], [0], [[]]
+    for i, pattern in enumerate(patterns):
+        state = 0
+        for ch in pattern:
+            if ch not in goto[state]:
+                goto[state][ch] = len(goto)
+                goto.append({})
+                fail.append(0)
+                output.append([])
+            state = goto[state][ch]
+        output[state].append(i)
+
+    # Breadth-first, so every failure link points at an already finished state
+    pending = deque(goto[0].values())
+    while pending:
+        state = pending.popleft()
+        for ch, child in goto[state].items():
+            pending.append(child)
+            link = fail[state]
+            while link and ch not in goto[link]:
+                link = fail[link]
+            fail[child] = goto[link].get(ch, 0)
+            output[child] = output[child] + output[fail[child]]
+    return goto, fail, output
+
+
+def find_patterns(automaton, text):
+    """Return the indexes of every pattern occurring in ``text``."""
+    goto, fail, output = automaton
+    found, state = set(), 0
+    for ch in text:
+        while state and ch not in goto[state]:
+            state = fail[state]
+        state = goto[state].get(ch, 0)
+        found.update(output[state])
+    return found
+
+
+def _severity(findings):
+    """Return each finding's severity weight (1 when there is no severity column)."""
+    column = next((c for c in SEVERITY_COLUMNS if c in findings.columns), None)
+    if column is None:
+        return np.ones(len(findings))
+    values = findings[column]
+    numeric = pd.to_numeric(values, errors="coerce")
+    named = values.astype("string").str.strip().str.lower().map(SEVERITY_WEIGHTS)
+    return numeric.fillna(named).fillna(1).to_numpy(dtype=float)
+
+
+def _recency(findings):
+    """Return each finding's recency weight, halving every HALF_LIFE_YEARS (1 when undated)."""
+    column = next((c for c in DATE_COLUMNS if c in findings.columns), None)
+    if column is None:
+        return np.ones(len(findings))
+    dates = pd.to_datetime(findings[column], errors="coerce")
+    age_years = (dates.max() - dates).dt.days.to_numpy(dtype=float) / 365.25
+    weights = 0.5 ** (age_years / HALF_LIFE_YEARS)
+    # Undated findings count as the oldest dated one
+    oldest = np.nanmin(weights) if np.isfinite(weights).any() else 1.0
+    return np.where(np.isnan(weights), oldest, weights)
+
+
+def area_risk(findings):
+    """Return one row per finding area with its count, risk weight and risk score.
+
+    Each finding weighs its severity times its recency; an area's weight is the sum over
+    its findings, so frequent, severe and recent areas weigh most. Scores scale the
+    weights from BASE_SCORE to MAX_SCORE for the riskiest area.
+    """
+    areas = findings["Area Affected"].astype("string")
+    weighted = pd.DataFrame({
+        "Area Affected": areas,
+        "Weight": _severity(findings) * _recency(findings),
+    })
+    weighted = weighted[areas.notna().to_numpy() & areas.ne("").fillna(False).to_numpy()]
+    risk = weighted.groupby("Area Affected", sort=False).agg(
+        Findings=("Weight", "size"), **{"Risk Weight": ("Weight", "sum")}
+    )
+    top = risk["Risk Weight"].max() if len(risk) else 0
+    scale = risk["Risk Weight"] / top if top > 0 else 0
+    risk["Risk Score"] = (BASE_SCORE + (MAX_SCORE - BASE_SCORE) * scale).round(1)
+    return risk.reset_index().sort_values("Risk Score", ascending=False, kind="stable")
+
+
+def score_areas(areas, findings):
+    """Score each current area against the historical findings.
+
+    Returns a frame aligned with ``areas``: the ``Risk Category`` is the highest-scoring
+    finding area named in it (``Low Risk`` when none is), and the ``Risk Score`` is
+    that area's score. Each distinct area text is scanned once.
+    """
+    risk = area_risk(findings)
+    patterns = risk["Area Affected"].tolist()
+    scores = risk["Risk Score"].to_numpy(dtype=float)
+    automaton = build_automaton(patterns)
+
+    codes, uniques = pd.factorize(pd.Series(areas))
+    best = np.full(len(uniques) + 1, -1)
+    for i, text in enumerate(uniques):
+        found = find_patterns(automaton, str(text))
+        if found:
+            best[i] = max(found, key=lambda p: (scores[p], -p))
+
+    best = best[codes]
+    matched = best >= 0
+    return pd.DataFrame({
+        "Risk Category": np.where(matched, np.array(patterns + [LOW_RISK], dtype=object)[best], LOW_RISK),
+        "Risk Score": np.where(matched, np.append(scores, BASE_SCORE)[best], BASE_SCORE),
+    }, index=pd.Series(areas).index)
@@ -0,0 +1,163 @@
+"""Medicaid Claims Validation
+
+Maps claims to plans in the BIN/PCN/Group library and flags 340B billing issues such
+as unknown plans, missing FFS modifiers and MCO plans that exclude 340B. Plans are
+compiled into a lookup index once; each claim takes the most specific library entry
+that matches (BIN+PCN+Group, then BIN+PCN, then BIN), so BIN-only and wildcard-group
+entries still resolve.
+"""
+
+import numpy as np
+import pandas as pd
+
+PLAN_KEYS = ["BIN", "PCN", "Group"]
+
+# Library values that mean "any PCN/Group"
+WILDCARDS = {"", "*", "ALL", "ANY", "NAN", "NONE"}
+
+# Lookup levels, most specific first
+MATCH_LEVELS = [
+    ("BIN+PCN+Group", ["BIN", "PCN", "Group"]),
+    ("BIN+PCN", ["BIN", "PCN"]),
+    ("BIN", ["BIN"]),
+]
+
+UNKNOWN_PLAN = "❌ Unknown Plan (No 340B policy)"
+MISSING_MODIFIER = "❌ FFS claim missing required 340B modifier"
+MCO_EXCLUDED = "❌ MCO plan excludes 340B billing"
+
+FFS_MODIFIERS = ["UD", "U6"]
+
+
+ISSUES = ["", UNKNOWN_PLAN, MISSING_MODIFIER, MCO_EXCLUDED]
+
+
+def _text_codes(series, wildcards=()):
+    """Factorize a column into codes over stripped, upper-case values (missing as ``""``).
+
+    Each distinct value is normalized once, so millions of claims cost one hash pass.
+    """
+    codes, uniques = pd.factorize(series)
+    text = pd.Series(uniques, dtype="string").str.strip().str.upper().fillna("")
+    text = text.where(~text.isin(wildcards), "")
+    remap, values = pd.factorize(np.append(text.to_numpy(dtype=object), ""))
+    return remap[codes], np.asarray(values, dtype=object)
+
+
+def _text_in(series, options):
+    """Return a boolean array marking values that normalize to one of ``options``."""
+    codes, values = _text_codes(series)
+    return np.isin(values, options)[codes]
+
+
+def _key_codes(df):
+    """Return normalized code arrays and their values for BIN, PCN and Group."""
+    parts = []
+    for col in PLAN_KEYS:
+        if col in df.columns:
+            parts.append(_text_codes(df[col], WILDCARDS))
+        else:
+            parts.append((np.zeros(len(df), dtype=np.int64), np.array([""], dtype=object)))
+    return parts
+
+
+def _normalize_keys(df):
+    """Return BIN/PCN/Group as normalized text with wildcards and blanks as ``""``."""
+    return pd.DataFrame(
+        {col: values[codes] for col, (codes, values) in zip(PLAN_KEYS, _key_codes(df))},
+        index=df.index,
+    )
+
+
+def build_plan_index(plans_df):
+    """Compile the plan library into per-level hash lookups.
+
+    A library row belongs to the most specific level its non-wildcard keys allow; a
+    blank or wildcard PCN makes the entry BIN-wide whatever its Group says. When several
+    rows share a key the first one wins.
+    """
+    keys = _normalize_keys(plans_df)
+    has_pcn = keys["PCN"] != ""
+    has_group = keys["Group"] != ""
+    level_of = np.select([has_pcn & has_group, has_pcn], [0, 1], default=2)
+
+    levels = []
+    for level, (name, cols) in enumerate(MATCH_LEVELS):
+        rows = np.flatnonzero((level_of == level) & (keys["BIN"] != "").to_numpy())
+        lookup = pd.MultiIndex.from_frame(keys.iloc[rows][cols])
+        first = ~lookup.duplicated()
+        levels.append((name, cols, lookup[first], rows[first]))
+    return {"plans": plans_df.reset_index(drop=True), "levels": levels}
+
+
+def match_plans(claims_df, index):
+    """Return each claim's library row position (-1 if none) and the level it matched at.
+
+    The level is a categorical of the ``MATCH_LEVELS`` names, ``""`` when nothing matched.
+    """
+    # Resolve each distinct BIN/PCN/Group combination once, then broadcast to the claims
+    parts = _key_codes(claims_df)
+    combo = np.zeros(len(claims_df), dtype=np.int64)
+    for codes, values in parts:
+        combo = combo * len(values) + codes
+    inverse, uniques = pd.factorize(combo)
+    first = np.empty(len(uniques), dtype=np.int64)
+    first[inverse[::-1]] = np.arange(len(combo))[::-1]
+    distinct = pd.DataFrame({col: values[codes[first]] for col, (codes, values) in zip(PLAN_KEYS, parts)})
+
+    position = np.full(len(distinct), -1, dtype=np.int64)
+    level = np.full(len(distinct), len(MATCH_LEVELS), dtype=np.int8)
+    for i, (_, cols, lookup, rows) in enumerate(index["levels"]):
+        unresolved = position < 0
+        if not unresolved.any() or len(lookup) == 0:
+            continue
+        found = lookup.get_indexer(pd.MultiIndex.from_frame(distinct[cols]))
+        hit = unresolved & (found >= 0)
+        position[hit] = rows[found[hit]]
+        level[hit] = i
+
+    names = [name for name, _ in MATCH_LEVELS] + [""]
+    return position[inverse], pd.Categorical.from_codes(level[inverse], categories=names)
+
+
+def issue_column(merged):
+    """Classify every claim with column operations; the first failing check wins."""
+    ffs = _text_in(merged["Claim Type"], ["FFS"])
+    mco = _text_in(merged["Claim Type"], ["MCO"])
+    has_modifier = _text_in(merged["Modifier"], FFS_MODIFIERS) if "Modifier" in merged.columns else False
+    if "Allow 340B" in merged.columns:
+        excluded = _text_in(merged["Allow 340B"], ["FALSE", "NO", "N", "0"])
+    else:
+        excluded = False
+
+    codes = np.select(
+        [merged["Plan Match"].eq("").to_numpy(), ffs & ~has_modifier, mco & excluded],
+        [1, 2, 3],
+        default=0,
+    )
+    return pd.Categorical.from_codes(codes.astype(np.int8), categories=ISSUES)
+
+
+def validate_claims(claims_df, plans_df, index=None):
+    """Attach the best-matching plan to each claim and add ``Plan Match`` and ``Issue`` columns.
+
+    Pass a prebuilt ``index`` from :func:`build_plan_index` to reuse it across chunks.
+    Plan columns that clash with claim columns get a ``_plan`` suffix.
+    """
+    index = index or build_plan_index(plans_df)
+    position, matched = match_plans(claims_df, index)
+
+    plans = index["plans"].drop(columns=[c for c in PLAN_KEYS if c in index["plans"].columns])
+    plans = plans.rename(columns={c: f"{c}_plan" for c in plans.columns if c in claims_df.columns})
+    attached = plans.reindex(position).set_axis(claims_df.index)
+
+    merged = pd.concat([claims_df, attached], axis=1).reset_index(drop=True)
+    merged["Plan Match"] = matched
+    merged["Issue"] = issue_column(merged)
+    return merged
+
+
+def flag_claims(claims_df, plans_df, index=None):
+    """Return only the claims with a billing issue."""
+    merged = validate_claims(claims_df, plans_df, index)
+    return merged[merged["Issue"] != ""]
@@ -0,0 +1,130 @@
+"""340B Compliance Rule Engine
+
+Evaluates the monthly screening rules as columnar boolean masks instead of a per-row
+Python callback. Every claim receives a violation bitmask, so a claim failing several
+rules reports all of them rather than only the first.
+"""
+
+import numpy as np
+import pandas as pd
+
+from utils.intervals import effective_join
+from utils.ndc import ndc_isin
+
+INVALID_PROVIDER = 1
+PROVIDER_NOT_ACTIVE = 2
+UNREGISTERED_SITE = 4
+DUPLICATE_DISCOUNT = 8
+ORPHAN_RESTRICTION = 16
+
+COMPLIANT = "✅ Compliant"
+
+# Ordered by precedence: the first failing rule becomes the headline status
+RULE_LABELS = {
+    INVALID_PROVIDER: "❌ Invalid Provider",
+    PROVIDER_NOT_ACTIVE: "❌ Provider Not Active",
+    UNREGISTERED_SITE: "❌ Unregistered Site",
+    DUPLICATE_DISCOUNT: "❌ Duplicate Discount (Carved Out)",
+    ORPHAN_RESTRICTION: "❌ Orphan Drug Restriction",
+}
+
+ORPHAN_RESTRICTED_ENTITIES = ["PED", "CAN", "CAH"]
+
+_ALL_RULES = sum(RULE_LABELS)
+
+
+def _build_label_tables():
+    """Precompute the status and full violation label for every possible bitmask."""
+    first = [COMPLIANT]
+    full = [COMPLIANT]
+    for mask in range(1, _ALL_RULES + 1):
+        failed = [label for bit, label in RULE_LABELS.items() if mask & bit]
+        first.append(failed[0])
+        full.append("; ".join(failed))
+    return first, full
+
+
+_STATUS_BY_MASK, _VIOLATIONS_BY_MASK = _build_label_tables()
+_STATUS_CATEGORIES = [COMPLIANT] + list(RULE_LABELS.values())
+_STATUS_CODES = np.array([_STATUS_CATEGORIES.index(s) for s in _STATUS_BY_MASK], dtype=np.int8)
+
+
+def _column(df, name, default):
+    """Return a column if present, otherwise a constant Series aligned to the frame."""
+    if name in df.columns:
+        return df[name]
+    return pd.Series(default, index=df.index)
+
+
+def _truthy(series):
+    """Vectorized equivalent of Python truthiness for a flag column (missing counts as True)."""
+    return series.where(series.notna(), True).astype(bool)
+
+
+def rule_masks(merged):
+    """Return one boolean mask per compliance rule for a claims frame with reference data merged in."""
+    date = merged["Date"]
+    start = merged["Start Date"]
+    end = merged["End Date"]
+
+    carve_in = _column(merged, "Carve-In", True)
+    billed = _column(merged, "Billed 340B", False)
+    orphan = _column(merged, "Orphan", False).astype(bool)
+    entity = _column(merged, "Entity Type", "")
+
+    return {
+        INVALID_PROVIDER: merged["Provider Name"].isna(),
+        PROVIDER_NOT_ACTIVE: (date < start) | (end.notna() & (date > end)),
+        UNREGISTERED_SITE: merged["Site Type"].isna(),
+        DUPLICATE_DISCOUNT: (
+            merged["Claim Type"].eq("Medicaid")
+            & carve_in.eq(False)
+            & _truthy(billed)
+        ),
+        ORPHAN_RESTRICTION: orphan & entity.isin(ORPHAN_RESTRICTED_ENTITIES),
+    }
+
+
+def violation_mask(merged):
+    """Combine all rule masks into a single uint8 bitmask per claim."""
+    mask = np.zeros(len(merged), dtype=np.uint8)
+    for bit, rule in rule_masks(merged).items():
+        mask |= rule.to_numpy(dtype=bool, na_value=False).astype(np.uint8) * np.uint8(bit)
+    return mask
+
+
+def describe_violations(mask):
+    """Translate bitmasks into categorical headline status and full violation list."""
+    mask = np.asarray(mask, dtype=np.uint8)
+    status = pd.Categorical.from_codes(_STATUS_CODES[mask], categories=_STATUS_CATEGORIES)
+    violations = pd.Categorical.from_codes(mask, categories=_VIOLATIONS_BY_MASK)
+    return status, violations
+
+
+def evaluate_compliance(merged):
+    """Add violation bitmask, headline compliance status and full violation list columns."""
+    mask = violation_mask(merged)
+    status, violations = describe_violations(mask)
+    merged["Violation Mask"] = mask
+    merged["Compliance Status"] = status
+    merged["Violations"] = violations
+    return merged
+
+
+def screen_claims(claims, providers, sites, orphans, mef):
+    """Merge all reference data into the claims and evaluate every compliance rule."""
+    claims["Date"] = pd.to_datetime(claims["Date"])
+
+    # Each claim picks up the eligibility period in effect on its date (no row blow-up)
+    merged = effective_join(claims, providers, on="NPI", date_col="Date")
+    merged = pd.merge(merged, sites, on="Site", how="left")
+    merged["Orphan"] = ndc_isin(merged["NDC"], orphans["NDC"])
+    merged = pd.merge(merged, mef, on="NPI", how="left")
+
+    return evaluate_compliance(merged)
+
+
+def flag_violations(claims, providers, sites, orphans, mef):
+    """Return only the claims that fail at least one compliance rule."""
+    merged = screen_claims(claims, providers, sites, orphans, mef)
+    return merged[merged["Violation Mask"] != 0]
@@ -0,0 +1,123 @@
+"""Contract Coverage
+
+Resolves each invoice line to the contract in force on its purchase date. Contract
+periods are indexed per (NDC, Account Type, Wholesaler) and located with the as-of
+interval join, so an NDC with several periods or wholesalers never duplicates lines.
+A sweep over every contract's start and end finds the dates an NDC has no contract in
+force (gaps) or more than one (overlaps).
+"""
+
+import numpy as np
+import pandas as pd
+
+from utils.intervals import effective_join
+from utils.ndc import NDC_KEY, add_ndc_key, ndc_frames
+
+CONTRACT_KEYS = [NDC_KEY, "Account Type", "Wholesaler"]
+CONTRACT_ID = "Contract #"
+
+# Invoice columns holding the purchase date, in order of preference
+PURCHASE_DATE_COLUMNS = ["Purchase Date", "Invoice Date", "Date"]
+
+EXPIRING_DAYS = 30
+
+GAP = "⚠️ Coverage Gap"
+OVERLAP = "⚠️ Overlapping Contracts"
+
+_PURCHASE_DATE = "_purchase_date"
+
+# Day numbers standing in for an open start or end
+_OPEN_START = np.iinfo(np.int64).min // 2
+_OPEN_END = np.iinfo(np.int64).max // 2
+
+
+def contract_status(end_dates, today):
+    """Return each contract's status on ``today``: expired, expiring within EXPIRING_DAYS or active."""
+    end = pd.to_datetime(pd.Series(end_dates))
+    return pd.Series(np.select(
+        [end < today, end < today + pd.Timedelta(days=EXPIRING_DAYS)],
+        ["❌ Expired", "⚠️ Expires Soon"],
+        default="✅ Active",
+    ), index=end.index)
+
+
+def contract_coverage(invoice, contracts, today):
+    """Attach to each invoice line the contract in force on its purchase date and a coverage status.
+
+    Lines match contracts on NDC plus whichever of ``Account Type`` and ``Wholesaler`` the
+    invoice has. Any contract that started on or before the purchase date and has not
+    ended covers the line, even when a later, shorter contract has already ended; a line
+    is expired only when no started contract covers its date. Lines without a purchase
+    date are judged on ``today`` against the latest contract. The result keeps the
+    invoice's rows and order.
+    """
+    date_col = next((c for c in PURCHASE_DATE_COLUMNS if c in invoice.columns), None)
+    invoices, periods = ndc_frames(invoice, contracts.assign(**{CONTRACT_ID: np.arange(1, len(contracts) + 1)}))
+    invoices[_PURCHASE_DATE] = invoices[date_col] if date_col else pd.NaT
+    on = [c for c in CONTRACT_KEYS if c in invoices.columns and c in periods.columns]
+
+    merged = effective_join(invoices, periods, on=on, date_col=_PURCHASE_DATE, suffixes=("", "_contract"))
+    checked = merged[_PURCHASE_DATE].fillna(pd.Timestamp(today))
+    start = pd.to_datetime(merged["Start Date"])
+    end = pd.to_datetime(merged["End Date"])
+    merged["Contract Coverage Status"] = np.select(
+        [merged[CONTRACT_ID].isna(), checked > end, checked < start],
+        ["❌ Not Under Any Contract", "❌ Contract Expired", "❌ Before Contract Start"],
+        default="✅ Covered",
+    )
+    return merged.drop(columns=[_PURCHASE_DATE])
+
+
+def _day_numbers(dates, open_value):
+    """Return dates as day numbers, with missing dates as ``open_value``."""
+    dates = pd.to_datetime(pd.Series(dates)).astype("datetime64[ns]")
+    days = dates.to_numpy().astype("datetime64[D]").astype(np.int64)
+    return np.where(dates.isna().to_numpy(), open_value, days)
+
+
+def _dates(days):
+    """Convert day numbers back to dates, with open ends as missing."""
+    days = np.where((days <= _OPEN_START) | (days >= _OPEN_END - 1), np.iinfo(np.int64).min, days)
+    return pd.to_datetime(days.astype("datetime64[D]"), errors="coerce")
+
+
+def coverage_issues(contracts, by=None):
+    """Sweep the contract book for coverage gaps and overlaps per NDC (and Account Type).
+
+    Every contract adds one to its group's count of contracts in force on its start date
+    and removes one the day after its end date; one sorted pass over all the events gives
+    the count between consecutive events. Stretches with none in force between two
+    contracts are gaps, stretches with several are overlaps. Missing start or end dates
+    are open-ended. NDCs are reported in their canonical 11-digit form.
+    """
+    keyed = add_ndc_key(contracts).dropna(subset=[NDC_KEY])
+    by = by or [c for c in CONTRACT_KEYS[:2] if c in keyed.columns]
+    columns = by + ["Issue", "From", "To", "Days", "Contracts in Force"]
+    if keyed.empty:
+        return pd.DataFrame(columns=columns).rename(columns={NDC_KEY: "NDC"})
+
+    groups, uniques = pd.MultiIndex.from_frame(keyed[by].astype(object)).factorize()
+    start = _day_numbers(keyed["Start Date"], _OPEN_START)
+    end = _day_numbers(keyed["End Date"], _OPEN_END - 1) + 1
+
+    # Net change in contracts in force per group and day; each group nets to zero,
+    # so a running total over all groups is each group's count in force
+    events = pd.DataFrame({
+        "Group": np.concatenate([groups, groups]),
+        "Day": np.concatenate([start, end]),
+        "Change": np.concatenate([np.ones(len(groups), dtype=int), -np.ones(len(groups), dtype=int)]),
+    }).groupby(["Group", "Day"], sort=True)["Change"].sum().reset_index()
+    in_force = events["Change"].cumsum().to_numpy()
+
+    group, day = events["Group"].to_numpy(), events["Day"].to_numpy()
+    next_day = np.append(day[1:], _OPEN_END)
+    inside = np.append(group[1:] == group[:-1], False)
+    flagged = inside & ((in_force == 0) | (in_force > 1))
+
+    issues = pd.DataFrame(uniques[group[flagged]].tolist(), columns=by)
+    issues["Issue"] = np.where(in_force[flagged] == 0, GAP, OVERLAP)
+    issues["From"] = _dates(day[flagged])
+    issues["To"] = _dates(next_day[flagged] - 1)
+    issues["Days"] = np.where(issues["From"].notna() & issues["To"].notna(), next_day[flagged] - day[flagged], np.nan)
+    issues["Contracts in Force"] = in_force[flagged]
+    return issues[columns].rename(columns={NDC_KEY: "NDC"})
@@ -0,0 +1,124 @@
+"""Incremental Compliance Screening
+
+Monthly claims extracts are cumulative, so most rows were already screened last month.
+Each claim gets a row hash (its own contents) and a reference hash (the provider, site,
+MEF and orphan entries it depends on). Results are persisted in the library store with
+a date watermark per run; the next run screens only claims after the watermark, claims
+whose row changed, and claims whose reference entries changed.
+"""
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from utils.compliance import describe_violations, screen_claims
+from utils.ndc import ndc_isin
+from utils.store import append_rows, delete_rows, read_table
+
+RESULTS_TABLE = "compliance_screening"
+RUNS_TABLE = "compliance_screening_runs"
+
+_ROW = "_claim_row"
+
+
+def row_hashes(claims):
+    """Return a 64-bit hash of each claim's contents (as signed integers SQLite can store)."""
+    return pd.util.hash_pandas_object(claims, index=False).to_numpy().view(np.int64)
+
+
+def _key_fingerprints(reference, key, values):
+    """Fingerprint the reference rows for each value of ``key`` and look them up for ``values``.
+
+    A reference table without the key column is fingerprinted as a whole.
+    """
+    rows = pd.util.hash_pandas_object(reference, index=False).to_numpy(dtype=np.uint64)
+    if key not in reference.columns:
+        return np.full(len(values), rows.sum(dtype=np.uint64), dtype=np.uint64)
+    # Sums wrap around in uint64, so every hash bit counts; keys without rows get 0
+    codes, uniques = pd.factorize(reference[key].astype(str))
+    per_key = np.zeros(len(uniques) + 1, dtype=np.uint64)
+    np.add.at(per_key, codes, rows)
+    return per_key[pd.Index(uniques).get_indexer(pd.Series(values).astype(str))]
+
+
+def reference_hashes(claims, providers, sites, orphans, mef):
+    """Return a hash of the reference entries each claim is screened against."""
+    fingerprints = pd.DataFrame({
+        "providers": _key_fingerprints(providers, "NPI", claims["NPI"]),
+        "sites": _key_fingerprints(sites, "Site", claims["Site"]),
+        "mef": _key_fingerprints(mef, "NPI", claims["NPI"]),
+        "orphan": ndc_isin(claims["NDC"], orphans["NDC"]).to_numpy(),
+    })
+    return pd.util.hash_pandas_object(fingerprints, index=False).to_numpy().view(np.int64)
+
+
+def last_watermark():
+    """Return the latest claim date screened by a previous run, or None before the first run."""
+    runs = read_table(RUNS_TABLE, columns=["Watermark"])
+    if runs.empty:
+        return None
+    return pd.to_datetime(runs["Watermark"]).max()
+
+
+def incremental_screen(claims, providers, sites, orphans, mef):
+    """Screen a cumulative claims extract, reusing persisted results for unchanged claims.
+
+    Returns the screening results (aligned with ``claims``; reused compliant rows carry
+    only the claim columns and their status) and a one-row summary of the run.
+    """
+    claims = claims.reset_index(drop=True)
+    claims["Date"] = pd.to_datetime(claims["Date"])
+    row_hash = row_hashes(claims)
+    ref_hash = reference_hashes(claims, providers, sites, orphans, mef)
+    watermark = last_watermark()
+
+    previous = read_table(RESULTS_TABLE, columns=["Row Hash", "Reference Hash", "Violation Mask"])
+    previous = previous.drop_duplicates("Row Hash", keep="last")
+    found = pd.Index(previous["Row Hash"]).get_indexer(row_hash)
+    known = found >= 0
+    # A trailing placeholder makes the -1 of unknown claims index safely
+    prior_refs = np.append(previous["Reference Hash"].to_numpy(dtype=np.int64), 0)[found]
+    prior_mask = np.append(previous["Violation Mask"].to_numpy(dtype=np.int64), 0)[found]
+    same_refs = known & (prior_refs == ref_hash)
+    after_watermark = claims["Date"].gt(watermark).to_numpy() if watermark is not None else np.ones(len(claims), bool)
+    reuse = same_refs & ~after_watermark
+
+    # Reused violations are re-merged so their report rows carry the reference columns
+    merge_rows = ~reuse | (prior_mask != 0)
+    parts = []
+    if merge_rows.any():
+        screened = screen_claims(claims[merge_rows].assign(**{_ROW: np.flatnonzero(merge_rows)}),
+                                 providers, sites, orphans, mef)
+        parts.append(screened)
+    if (reuse & ~merge_rows).any():
+        compliant = claims[reuse & ~merge_rows].assign(**{_ROW: np.flatnonzero(reuse & ~merge_rows)})
+        status, violations = describe_violations(np.zeros(len(compliant), dtype=np.uint8))
+        compliant["Violation Mask"] = np.uint8(0)
+        compliant["Compliance Status"] = status
+        compliant["Violations"] = violations
+        parts.append(compliant)
+    results = pd.concat(parts).sort_values(_ROW, kind="stable") if parts else claims.iloc[:0]
+
+    # Persist results for the claims screened from scratch this run
+    fresh = np.flatnonzero(~reuse)
+    if len(fresh):
+        masks = results.groupby(_ROW)["Violation Mask"].max()
+        saved = pd.DataFrame({
+            "Row Hash": row_hash[fresh],
+            "Reference Hash": ref_hash[fresh],
+            "Violation Mask": masks.reindex(fresh).fillna(0).astype(np.int64).to_numpy(),
+        })
+        delete_rows(RESULTS_TABLE, "Row Hash", saved["Row Hash"][np.isin(saved["Row Hash"], previous["Row Hash"])])
+        append_rows(RESULTS_TABLE, saved)
+
+    summary = pd.DataFrame([{
+        "Run At": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "Watermark": claims["Date"].max(),
+        "Claims": len(claims),
+        "Screened": int(len(fresh)),
+        "Reused": int(reuse.sum()),
+        "Changed References": int((known & ~same_refs).sum()),
+    }])
+    append_rows(RUNS_TABLE, summary)
+    return results.drop(columns=_ROW, errors="ignore").reset_index(drop=True), summary
@@ -0,0 +1,131 @@
+"""Effective-Dated Interval Joins
+
+Matches each row of a fact table (claims, invoices, providers) to the reference period
+in effect on its date. Periods are sorted once per key and located with an as-of
+search, so a roster with several eligibility periods per NPI never multiplies rows.
+"""
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_numeric_dtype
+
+_ROW = "_row"
+_START = "_period_start"
+_END = "_period_end"
+_PERIOD = "_period"
+_REACH = "_period_reach"
+_HOLDER = "_period_holder"
+
+
+def _align_keys(left, periods, by):
+    """Cast join keys to a common dtype, since merge_asof refuses mismatched ``by`` columns."""
+    for col in by:
+        if left[col].dtype == periods[col].dtype:
+            continue
+        if is_numeric_dtype(left[col]) and is_numeric_dtype(periods[col]):
+            left[col] = left[col].astype("float64")
+            periods[col] = periods[col].astype("float64")
+        else:
+            left[col] = left[col].astype(str)
+            periods[col] = periods[col].astype(str)
+
+
+def _reach(periods, by):
+    """Return the latest end among each period and the earlier-starting periods of its key,
+    and the position of the period that ends then.
+
+    ``periods`` must be sorted by start. A date after a period's start but before its
+    reach is covered by the holder period even if the latest-started one has ended.
+    """
+    groups = periods.groupby(by, sort=False, observed=True)
+    reach = groups[_END].cummax()
+    position = pd.Series(np.arange(len(periods), dtype=float), index=periods.index)
+    # A key's first period always holds its own reach, so every period finds a holder
+    holder = position.where(periods[_END] == reach).groupby(groups.ngroup()).ffill()
+    return reach.to_numpy(), holder.to_numpy()
+
+
+def _asof(left, periods, on, date_col, direction):
+    """Run a single merge_asof pass against periods sorted by start date."""
+    return pd.merge_asof(
+        left.sort_values(date_col, kind="stable"),
+        periods,
+        left_on=date_col,
+        right_on=_START,
+        by=on,
+        direction=direction,
+    )
+
+
+def effective_join(left, periods, on, date_col, start_col="Start Date", end_col="End Date",
+                   nearest=True, suffixes=("_x", "_y")):
+    """Attach to each row of ``left`` the period from ``periods`` covering its date.
+
+    ``on`` is the key column (or list of columns) shared by both frames. A missing start
+    date means the period is open-ended at the beginning, a missing end date means it is
+    still in force. Where periods overlap, the one that started most recently wins if it
+    covers the date; otherwise, of the periods that started earlier, the one lasting
+    longest, so a shorter period nested inside a longer one never hides it.
+
+    With ``nearest=True`` a row whose key has periods but none covering its date gets
+    the closest one (the latest that already started, else the next one to start), so
+    callers can tell an inactive key from an unknown one. With ``nearest=False`` those
+    rows get missing values instead. Rows without a date always get the key's latest
+    period. The result keeps the row order and index of ``left``.
+    """
+    by = [on] if isinstance(on, str) else list(on)
+
+    periods = periods.copy()
+    periods[start_col] = pd.to_datetime(periods[start_col])
+    periods[end_col] = pd.to_datetime(periods[end_col])
+    periods[_START] = periods[start_col].fillna(pd.Timestamp.min).astype("datetime64[ns]")
+    periods[_END] = periods[end_col].fillna(pd.Timestamp.max).astype("datetime64[ns]")
+    periods = periods.dropna(subset=by).sort_values(_START, kind="stable").reset_index(drop=True)
+    periods[_PERIOD] = np.arange(len(periods), dtype=float)
+
+    index = left.index
+    left = left.reset_index(drop=True)
+    left[date_col] = pd.to_datetime(left[date_col]).astype("datetime64[ns]")
+    left[_ROW] = range(len(left))
+    keys = left[by].copy()
+    _align_keys(left, periods, by)
+
+    # Locate each row's period on the keys and bounds alone, then attach its columns
+    slim = periods[by + [_START, _END, _PERIOD]].copy()
+    slim[_REACH], slim[_HOLDER] = _reach(slim, by)
+    dated = left.loc[left[date_col].notna(), by + [date_col, _ROW]]
+    undated = left.loc[left[date_col].isna(), by + [_ROW]]
+
+    matched = _asof(dated, slim, by, date_col, "backward")
+    # The latest-started period has ended, but an earlier, longer one still covers the date
+    nested = (matched[date_col] > matched[_END]) & (matched[date_col] <= matched[_REACH])
+    matched[_PERIOD] = matched[_PERIOD].where(~nested, matched[_HOLDER])
+    pending = matched[matched[_PERIOD].isna()]
+    if not pending.empty:
+        # Rows dated before every period of their key fall back to the next period to start
+        retry = _asof(dated[dated[_ROW].isin(pending[_ROW])], slim, by, date_col, "forward")
+        matched = pd.concat([matched[matched[_PERIOD].notna()], retry])
+
+    if not undated.empty:
+        latest = slim.drop_duplicates(subset=by, keep="last")
+        matched = pd.concat([matched, pd.merge(undated, latest, on=by, how="left")])
+
+    chosen = left[[_ROW]].merge(matched[[_ROW, _PERIOD]], on=_ROW, how="left")[_PERIOD]
+    result = pd.merge(
+        left.assign(**{_PERIOD: chosen.to_numpy()}), periods.drop(columns=by),
+        on=_PERIOD, how="left", suffixes=suffixes,
+    )
+    if not nearest:
+        right_cols = [
+            c + suffixes[1] if c in left.columns else c
+            for c in periods.columns if c not in by and c != _PERIOD
+        ]
+        covered = result[date_col].isna() | (
+            (result[date_col] >= result[_START]) & (result[date_col] <= result[_END])
+        )
+        result[right_cols] = result[right_cols].where(covered)
+
+    result = result.drop(columns=[_ROW, _START, _END, _PERIOD])
+    result[by] = keys
+    result.index = index
+    return result
@@ -0,0 +1,147 @@
+"""Invoice Overcharge Checks
+
+Compares wholesaler invoice unit prices with the 340B ceiling price in effect on each
+invoice date and measures the overcharge on every invoice line. Ceiling prices change
+every quarter, so price files are kept as a history in the library store and matched
+with an as-of join per NDC.
+"""
+
+import numpy as np
+import pandas as pd
+
+from utils.intervals import effective_join
+from utils.ndc import NDC_KEY, canonical_ndc, ndc_frames
+from utils.store import read_table, update_table
+
+PRICE_HISTORY_TABLE = "ceiling_price_history"
+PRICE_COLUMN = "Ceiling Price"
+
+# Invoice columns holding the invoice date, in order of preference
+INVOICE_DATE_COLUMNS = ["Invoice Date", "Date"]
+
+_INVOICE_DATE = "_invoice_date"
+_PRICE_START = "Effective Date"
+_PRICE_END = "End Date"
+
+
+def _price_periods(price_df):
+    """Return ceiling prices with start/end columns, treating an undated file as always in effect."""
+    periods = price_df.copy()
+    for col in (_PRICE_START, _PRICE_END):
+        if col not in periods.columns:
+            periods[col] = pd.NaT
+    return periods
+
+
+def check_invoices(invoice_df, price_df):
+    """Attach the ceiling price in effect on each invoice line's date and compute any overcharge.
+
+    Lines without an invoice date are compared with the latest price for their NDC, and
+    lines dated before an NDC's first price get no ceiling price. ``Overcharge Amount`` is
+    per unit; ``Overcharge Total`` multiplies it by ``Quantity`` when present.
+    """
+    date_col = next((c for c in INVOICE_DATE_COLUMNS if c in invoice_df.columns), None)
+    invoices, prices = ndc_frames(invoice_df, _price_periods(price_df))
+    # Columns both files carry (e.g. Manufacturer) are taken from the invoice
+    overlap = [c for c in prices.columns if c in invoices.columns and c not in (NDC_KEY, _PRICE_START, _PRICE_END)]
+    prices = prices.drop(columns=overlap)
+    invoices[_INVOICE_DATE] = invoices[date_col] if date_col else pd.NaT
+
+    merged = effective_join(
+        invoices, prices, on=NDC_KEY, date_col=_INVOICE_DATE,
+        start_col=_PRICE_START, end_col=_PRICE_END, nearest=False,
+    )
+    added = [c for c in (_PRICE_START, _PRICE_END) if c not in price_df.columns and c not in invoice_df.columns]
+    merged = merged.drop(columns=[_INVOICE_DATE, NDC_KEY] + added)
+
+    merged["Overcharged"] = merged["Unit Price"] > merged["Ceiling Price"]
+    merged["Overcharge Amount"] = (
+        merged["Unit Price"] - merged["Ceiling Price"]
+    ).clip(lower=0)
+    if "Quantity" in merged.columns:
+        merged["Overcharge Total"] = merged["Overcharge Amount"] * merged["Quantity"]
+    return merged
+
+
+def flag_overcharges(invoice_df, price_df):
+    """Return only the overcharged invoice lines."""
+    merged = check_invoices(invoice_df, price_df)
+    return merged[merged["Overcharged"]]
+
+
+def overcharge_rollup(flagged):
+    """Total overcharges by manufacturer and calendar quarter of the invoice (or price) date."""
+    date_col = next((c for c in INVOICE_DATE_COLUMNS + [_PRICE_START] if c in flagged.columns), None)
+    dates = pd.to_datetime(flagged[date_col]) if date_col else pd.Series(pd.NaT, index=flagged.index)
+    manufacturer = flagged.get("Manufacturer", pd.Series("Unknown", index=flagged.index))
+    amount = flagged.get("Overcharge Total", flagged["Overcharge Amount"])
+
+    rollup = pd.DataFrame({
+        "Manufacturer": manufacturer.fillna("Unknown"),
+        "Quarter": dates.dt.to_period("Q").astype(str).where(dates.notna(), "Undated"),
+        "Overcharged Lines": 1,
+        "Overcharge ($)": amount.fillna(0),
+    })
+    return (
+        rollup.groupby(["Manufacturer", "Quarter"], as_index=False)
+        .sum()
+        .sort_values("Overcharge ($)", ascending=False, ignore_index=True)
+    )
+
+
+def _with_dates(history):
+    """Parse the stored effective dates."""
+    if _PRICE_START in history.columns:
+        history[_PRICE_START] = pd.to_datetime(history[_PRICE_START])
+    return history
+
+
+def price_history():
+    """Return every stored ceiling price, one row per NDC and effective date."""
+    return _with_dates(read_table(PRICE_HISTORY_TABLE))
+
+
+def store_price_history(price_df):
+    """Save a ceiling price file to the price history, one row per NDC and effective date.
+
+    New NDC/effective-date prices are appended. A stored price the file corrects (same NDC
+    and effective date, different ``Ceiling Price``) is replaced. The history is compared
+    and written in one transaction. Returns the numbers of prices added and replaced.
+    """
+    if _PRICE_START not in price_df.columns:
+        return 0, 0
+    prices = price_df.copy()
+    prices[_PRICE_START] = pd.to_datetime(prices[_PRICE_START])
+    prices[NDC_KEY] = canonical_ndc(prices["NDC"]).astype(object)
+    prices = prices.drop_duplicates(subset=[NDC_KEY, _PRICE_START], keep="last")
+    counts = {}
+
+    def merge_prices(stored):
+        if stored.empty:
+            counts.update(added=len(prices), replaced=0)
+            return prices.drop(columns=NDC_KEY), False
+
+        stored = _with_dates(stored)
+        stored[NDC_KEY] = canonical_ndc(stored["NDC"]).astype(object)
+        keys = [NDC_KEY, _PRICE_START]
+        compared = prices.merge(
+            stored[keys + [PRICE_COLUMN]].drop_duplicates(subset=keys, keep="last"),
+            on=keys, how="left", suffixes=("", "_stored"), indicator=True,
+        )
+        new = (compared["_merge"] == "left_only").to_numpy()
+        old_price = pd.to_numeric(compared[f"{PRICE_COLUMN}_stored"], errors="coerce")
+        changed = (~new) & ~np.isclose(pd.to_numeric(compared[PRICE_COLUMN], errors="coerce"), old_price, equal_nan=True)
+        counts.update(added=int(new.sum()), replaced=int(changed.sum()))
+
+        columns = list(dict.fromkeys(list(stored.columns) + list(prices.columns)))
+        if changed.any():
+            # Corrections rewrite the history, keeping the file's rows
+            replaced = prices[changed][keys]
+            kept = stored.merge(replaced, on=keys, how="left", indicator=True)
+            kept = kept[kept["_merge"] == "left_only"].drop(columns="_merge")
+            history = pd.concat([kept, prices[new | changed]], ignore_index=True)
+            return history.reindex(columns=columns).drop(columns=NDC_KEY), True
+        return prices[new].reindex(columns=columns).drop(columns=NDC_KEY), False
+
+    update_table(PRICE_HISTORY_TABLE, merge_prices)
+    return counts["added"], counts["replaced"]
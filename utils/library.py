@@ -0,0 +1,244 @@
+"""Document Library Storage
+
+Stores each distinct uploaded document once, under ``library/objects/`` and keyed by
+the SHA-256 of its contents. Uploads are hashed and copied in fixed-size blocks rather
+than buffered whole, and content already in the store is not written again. The
+``library_index`` table records each document's hash, size, category and upload time.
+
+When a document is first stored, its NDC, NPI and address columns are read once into an
+inverted index (``library_postings``) from each normalized identifier to the document,
+sheet and rows that mention it, so searches never re-open a spreadsheet.
+"""
+
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from utils.address import normalize_addresses
+from utils.ndc import canonical_ndc
+from utils.store import LIBRARY_FOLDER, append_rows, count_rows, read_rows_in, read_table
+
+OBJECTS_FOLDER = os.path.join(LIBRARY_FOLDER, "objects")
+INDEX_TABLE = "library_index"
+INDEX_COLUMNS = ["Filename", "Category", "Upload Date", "SHA-256", "Size", "Path"]
+POSTINGS_TABLE = "library_postings"
+POSTING_COLUMNS = ["Term", "Kind", "Sheet", "Rows", "Mentions"]
+
+BLOCK_BYTES = 1024 * 1024
+POSTING_CHUNK_ROWS = 250_000
+
+# Identifier kinds and the text a column name must contain to be indexed as that kind
+IDENTIFIER_KINDS = {"NDC": "NDC", "NPI": "NPI", "Address": "ADDRESS"}
+
+# Normalized terms outside these patterns (descriptions, blanks) are not indexed
+_VALID_TERMS = {"NDC": r"\d{11}", "NPI": r"\d{10}", "Address": r".+"}
+
+
+def file_digest(fileobj):
+    """Return the SHA-256 hex digest and size of a file-like object, read block by block."""
+    digest = hashlib.sha256()
+    size = 0
+    fileobj.seek(0)
+    for block in iter(lambda: fileobj.read(BLOCK_BYTES), b""):
+        digest.update(block)
+        size += len(block)
+    fileobj.seek(0)
+    return digest.hexdigest(), size
+
+
+def object_path(digest):
+    """Return where the document with this SHA-256 digest is stored."""
+    return os.path.join(OBJECTS_FOLDER, digest[:2], digest)
+
+
+def store_object(fileobj, digest):
+    """Copy a file-like object into the object store unless its digest is already there.
+
+    The copy goes to a temporary file that is renamed into place, so a concurrent upload
+    of the same content never sees a partial object. Returns the path and whether it was
+    written.
+    """
+    path = object_path(digest)
+    if os.path.exists(path):
+        return path, False
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            fileobj.seek(0)
+            shutil.copyfileobj(fileobj, out, BLOCK_BYTES)
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    fileobj.seek(0)
+    return path, True
+
+
+def normalize_terms(kind, values):
+    """Normalize identifiers of one kind the way postings are keyed."""
+    if kind == "NDC":
+        return canonical_ndc(values).astype(object).astype("string")
+    if kind == "NPI":
+        text = pd.Series(values, dtype="string").str.strip().str.replace(r"\.0$", "", regex=True)
+        return text.str.replace(r"\D", "", regex=True)
+    return normalize_addresses(values).astype("string")
+
+
+def _join_runs(texts, groups):
+    """Join consecutive run texts that share a group number with commas, one string per group."""
+    last = np.ones(len(groups), dtype=bool)
+    last[:-1] = groups[1:] != groups[:-1]
+    pieces = [text if end else text + "," for text, end in zip(texts, last)]
+    ends = np.cumsum([len(piece) for piece in pieces])
+    starts = np.concatenate([[0], ends[:-1]])
+    joined = "".join(pieces)
+    first = np.flatnonzero(np.concatenate([[True], last[:-1]]))
+    return [joined[a:b] for a, b in zip(starts[first], ends[last])]
+
+
+def _posting_lists(mentions):
+    """Collapse (kind, term, row) mentions into one posting per identifier.
+
+    Each posting lists its rows as ranges ("2-40,57") and counts its mentions, so an
+    identifier repeated on thousands of consecutive rows costs one short entry.
+    """
+    mentions = mentions.drop_duplicates().sort_values(["Kind", "Term", "Row"], kind="stable")
+    kind, term, row = (mentions[c].to_numpy() for c in ["Kind", "Term", "Row"])
+    new_key = np.ones(len(row), dtype=bool)
+    new_key[1:] = (kind[1:] != kind[:-1]) | (term[1:] != term[:-1])
+    run_start = new_key.copy()
+    run_start[1:] |= row[1:] != row[:-1] + 1
+
+    # Runs of consecutive rows become "start" or "start-end"
+    first = np.flatnonzero(run_start)
+    last = np.append(first[1:], len(row)) - 1
+    texts = [str(a) if a == b else f"{a}-{b}" for a, b in zip(row[first].tolist(), row[last].tolist())]
+    keys = np.cumsum(new_key)
+
+    key_first = np.flatnonzero(new_key)
+    return pd.DataFrame({
+        "Kind": kind[key_first],
+        "Term": term[key_first],
+        "Rows": _join_runs(texts, keys[first]),
+        "Mentions": np.diff(np.append(key_first, len(row))),
+    })
+
+
+def sheet_postings(frame, sheet):
+    """Return one posting per identifier in a sheet: term, kind, sheet, rows and mentions.
+
+    Rows are numbered as in the spreadsheet, with the header on row 1.
+    """
+    parts = []
+    for column in frame.columns:
+        kind = next((k for k, marker in IDENTIFIER_KINDS.items() if marker in str(column).upper()), None)
+        if kind is None:
+            continue
+        values = frame[column].dropna()
+        terms = normalize_terms(kind, values)
+        valid = terms.str.fullmatch(_VALID_TERMS[kind]).fillna(False).to_numpy(dtype=bool)
+        parts.append(pd.DataFrame({
+            "Term": terms.to_numpy(dtype=object)[valid],
+            "Kind": kind,
+            "Row": values.index.to_numpy()[valid] + 2,
+        }))
+    if not parts:
+        return pd.DataFrame(columns=POSTING_COLUMNS)
+    postings = _posting_lists(pd.concat(parts, ignore_index=True))
+    return postings.assign(Sheet=sheet)[POSTING_COLUMNS]
+
+
+def _document_sheets(fileobj, filename):
+    """Yield (sheet, frame) pairs of a stored document, reading CSVs in chunks."""
+    fileobj.seek(0)
+    if filename.lower().endswith(("xlsx", "xls")):
+        yield from pd.read_excel(fileobj, sheet_name=None, dtype=str).items()
+    elif filename.lower().endswith("csv"):
+        with pd.read_csv(fileobj, dtype=str, chunksize=POSTING_CHUNK_ROWS) as reader:
+            for chunk in reader:
+                yield "", chunk
+
+
+def index_document(fileobj, filename, digest):
+    """Add a document's identifier postings to the inverted index and return how many were added.
+
+    Documents that cannot be read as a table (PDFs, damaged files) get no postings.
+    """
+    added = 0
+    try:
+        for sheet, frame in _document_sheets(fileobj, filename):
+            postings = sheet_postings(frame, sheet)
+            if len(postings):
+                append_rows(POSTINGS_TABLE, postings.assign(**{"SHA-256": digest}))
+                added += len(postings)
+    except (ValueError, OSError, ImportError, pd.errors.ParserError):
+        pass
+    fileobj.seek(0)
+    return added
+
+
+def add_document(fileobj, filename, category):
+    """Store an uploaded document and index it under ``category``.
+
+    Returns the index entry and whether it is new; content already indexed under the
+    same category is neither written nor indexed again. New content is also added to
+    the identifier postings.
+    """
+    digest, size = file_digest(fileobj)
+    path, _ = store_object(fileobj, digest)
+    entry = {
+        "Filename": filename,
+        "Category": category,
+        "Upload Date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "SHA-256": digest,
+        "Size": size,
+        "Path": path,
+    }
+    if count_rows(INDEX_TABLE, {"SHA-256": digest, "Category": category}):
+        return entry, False
+    if not count_rows(POSTINGS_TABLE, {"SHA-256": digest}):
+        index_document(fileobj, filename, digest)
+    append_rows(INDEX_TABLE, pd.DataFrame([entry]))
+    return entry, True
+
+
+def library_index():
+    """Return the document index with every index column (older entries lack hash and size)."""
+    return read_table(INDEX_TABLE).reindex(columns=INDEX_COLUMNS)
+
+
+def search_library(query):
+    """Return every stored document row mentioning an NDC, NPI or site address.
+
+    The query is normalized as each identifier kind and looked up in the postings, so
+    "0002-1433-80" finds "00002143380" and "123 Main Street" finds "123 main st". Only
+    kinds the normalized query is valid for are searched, and a bare 10-digit number is
+    an NPI rather than an NDC that lost its leading zero.
+    """
+    text = str(query).strip()
+    query = pd.Series([text])
+    wanted = {kind: normalize_terms(kind, query).iloc[0] for kind in IDENTIFIER_KINDS}
+    wanted = {
+        kind: term for kind, term in wanted.items()
+        if pd.notna(term) and re.fullmatch(_VALID_TERMS[kind], term)
+    }
+    if re.fullmatch(_VALID_TERMS["NPI"], text):
+        wanted.pop("NDC", None)
+    hits = read_rows_in(POSTINGS_TABLE, "Term", set(wanted.values()))
+    columns = ["Filename", "Category", "Sheet", "Kind", "Term", "Mentions", "Rows", "SHA-256"]
+    if hits.empty:
+        return pd.DataFrame(columns=columns)
+    hits = hits[hits["Term"] == hits["Kind"].map(wanted)]
+    # A CSV read in chunks has one posting per chunk; join them back per document
+    hits = hits.groupby(["SHA-256", "Sheet", "Kind", "Term"], sort=False, as_index=False).agg(
+        Rows=("Rows", ",".join), Mentions=("Mentions", "sum")
+    )
+    documents = library_index()[["Filename", "Category", "SHA-256"]].drop_duplicates()
+    return hits.merge(documents, on="SHA-256")[columns].sort_values(["Filename", "Sheet"])
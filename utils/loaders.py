@@ -0,0 +1,205 @@
+"""Cached Table Loader
+
+Every page reads its uploads through :func:`load_table`. Files are keyed by a SHA-256
+of their bytes (plus the parsing rules), so the same OPAIS, MEF or claims extract is
+parsed once: later reruns, pages and sessions get it from an in-process LRU or from a
+Parquet copy on local disk. Both caches are bounded in bytes: the LRU by the frames'
+memory use, the disk copy by file size.
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from io import BytesIO
+
+import pandas as pd
+from pandas.api.types import is_string_dtype
+
+CACHE_FOLDER = os.environ.get("TABLE_CACHE_FOLDER", os.path.join(".cache", "tables"))
+MAX_CACHE_BYTES = int(os.environ.get("TABLE_CACHE_MAX_BYTES", 2 * 1024 ** 3))
+MAX_MEMORY_BYTES = int(os.environ.get("TABLE_CACHE_MEMORY_BYTES", 512 * 1024 ** 2))
+
+# Identifier columns keep their leading zeros instead of being parsed as numbers
+IDENTIFIER_COLUMNS = ["NDC", "NDC Key", "Old NDC", "New NDC", "NPI", "BIN", "PCN", "Group", "Store ID"]
+
+# Text columns read as dates: "Date", any name ending in " Date", and these
+DATE_COLUMNS = ["Date Submitted"]
+
+# Bump when parsing changes in ways the column lists above do not show, so cached
+# frames parsed the old way are not served
+PARSER_VERSION = 2
+
+# Cache key -> (frame, bytes in memory), least recently used first
+_memory = OrderedDict()
+_memory_bytes = 0
+_lock = threading.Lock()
+
+
+def source_name(source):
+    """Return the file name of an uploaded file or a path on disk."""
+    return getattr(source, "name", None) or os.fspath(source)
+
+
+def source_bytes(source):
+    """Return the raw bytes of an uploaded file or a path on disk."""
+    if hasattr(source, "getvalue"):
+        return source.getvalue()
+    with open(source, "rb") as f:
+        return f.read()
+
+
+def content_key(data):
+    """Return the SHA-256 hex digest identifying a file's contents."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def _is_excel(name):
+    """Return True when a file name has an Excel extension."""
+    return name.lower().endswith(("xlsx", "xls"))
+
+
+def _parse(data, name):
+    """Parse bytes as Excel or CSV, reading identifier columns as text."""
+    dtypes = {col: str for col in IDENTIFIER_COLUMNS}
+    if _is_excel(name):
+        df = pd.read_excel(BytesIO(data), dtype=dtypes)
+    else:
+        df = pd.read_csv(BytesIO(data), dtype=dtypes)
+    return _parse_dates(df)
+
+
+def _is_date_column(col):
+    """Return True when a column name marks a date column."""
+    col = str(col)
+    return col == "Date" or col.endswith(" Date") or col in DATE_COLUMNS
+
+
+def _parse_dates(df):
+    """Convert text date columns, leaving unparseable ones as text."""
+    for col in df.columns:
+        if _is_date_column(col) and is_string_dtype(df[col]):
+            try:
+                df[col] = pd.to_datetime(df[col])
+            except (ValueError, TypeError):
+                pass
+    return df
+
+
+def _parser_key():
+    """Return a short hash of the parsing rules, part of every cache key."""
+    rules = repr((PARSER_VERSION, IDENTIFIER_COLUMNS, DATE_COLUMNS))
+    return hashlib.sha256(rules.encode()).hexdigest()[:12]
+
+
+def _spill_path(key):
+    """Return the Parquet spill location for a cache key."""
+    return os.path.join(CACHE_FOLDER, f"{key}.parquet")
+
+
+def _read_spill(key):
+    """Return a cached frame from the Parquet spill, refreshing its LRU timestamp."""
+    path = _spill_path(key)
+    if not os.path.exists(path):
+        return None
+    try:
+        df = pd.read_parquet(path)
+    except (ImportError, OSError, ValueError):
+        return None
+    os.utime(path)
+    return df
+
+
+def _write_spill(key, df):
+    """Persist a parsed frame to the Parquet spill and evict the oldest files over budget."""
+    os.makedirs(CACHE_FOLDER, exist_ok=True)
+    path = _spill_path(key)
+    # A unique temp file per writer, so concurrent processes never clobber each other's copy
+    fd, tmp_path = tempfile.mkstemp(dir=CACHE_FOLDER, suffix=".tmp")
+    os.close(fd)
+    try:
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+    except (ImportError, OSError, ValueError, TypeError):
+        # Mixed-type columns or a missing Parquet engine only cost the disk cache
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return
+    _evict()
+
+
+def _evict():
+    """Delete least recently used spill files until the cache fits in MAX_CACHE_BYTES."""
+    entries = []
+    for entry in os.scandir(CACHE_FOLDER):
+        if entry.name.endswith(".parquet"):
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= MAX_CACHE_BYTES:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except FileNotFoundError:
+            pass
+
+
+def _remember(key, df):
+    """Store a parsed frame in the in-process LRU, evicting the oldest frames over MAX_MEMORY_BYTES.
+
+    A frame larger than the whole budget is not kept.
+    """
+    global _memory_bytes
+    size = int(df.memory_usage(index=True, deep=True).sum())
+    if size > MAX_MEMORY_BYTES:
+        return
+    with _lock:
+        if key in _memory:
+            _memory_bytes -= _memory.pop(key)[1]
+        _memory[key] = (df, size)
+        _memory_bytes += size
+        while _memory_bytes > MAX_MEMORY_BYTES:
+            _memory_bytes -= _memory.popitem(last=False)[1][1]
+
+
+def load_table(source):
+    """Load an uploaded file or path as a DataFrame, parsing each distinct file only once.
+
+    Returns a fresh copy, so callers may add or overwrite columns freely.
+    """
+    name = source_name(source)
+    data = source_bytes(source)
+    key = f"{content_key(data)}-{'xlsx' if _is_excel(name) else 'csv'}-{_parser_key()}"
+
+    with _lock:
+        entry = _memory.get(key)
+        if entry is not None:
+            _memory.move_to_end(key)
+    df = entry[0] if entry is not None else None
+    if df is None:
+        df = _read_spill(key)
+        if df is None:
+            df = _parse(data, name)
+            _write_spill(key, df)
+        _remember(key, df)
+    return df.copy()
+
+
+def load_optional(source):
+    """Load a file if one was uploaded, otherwise return an empty DataFrame."""
+    if not source:
+        return pd.DataFrame()
+    return load_table(source)
+
+
+def iter_csv_chunks(source, chunksize):
+    """Yield a CSV upload or path in typed chunks of ``chunksize`` rows."""
+    dtypes = {col: str for col in IDENTIFIER_COLUMNS}
+    if hasattr(source, "seek"):
+        source.seek(0)
+    with pd.read_csv(source, dtype=dtypes, chunksize=chunksize) as reader:
+        for chunk in reader:
+            yield _parse_dates(chunk)
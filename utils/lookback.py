@@ -0,0 +1,130 @@
+"""Lookback Window Join
+
+Finds, for every dispense, the closest encounter before and after the dispense date
+for the same patient using a single sorted search instead of a per-patient cartesian
+merge. Because the gaps do not depend on the window, every before/after combination
+can be answered from them without re-joining.
+"""
+
+import numpy as np
+import pandas as pd
+
+MAX_WINDOW_DAYS = 30
+
+# Composite sort key: patient code in the high bits, day number in the low 32 bits
+_STRIDE = np.int64(1) << 32
+_DAY_OFFSET = np.int64(1) << 31
+
+
+def _day_numbers(dates):
+    """Convert a datetime Series to integer day numbers."""
+    return dates.to_numpy(dtype="datetime64[ns]").astype("datetime64[D]").astype(np.int64)
+
+
+def visit_gaps(disp, visits):
+    """Return days back to the latest visit and forward to the next visit for each dispense.
+
+    The result is aligned with ``disp`` and has ``Days Before`` / ``Days After`` (missing
+    when the patient has no visit on that side) plus ``Prior Visit`` / ``Next Visit``,
+    the positional rows of those visits in ``visits`` (-1 when missing).
+    """
+    disp_dates = pd.to_datetime(disp["Dispense Date"])
+    visit_dates = pd.to_datetime(visits["Visit Date"])
+
+    codes, _ = pd.factorize(pd.concat([disp["Patient ID"], visits["Patient ID"]], ignore_index=True))
+    disp_codes = codes[:len(disp)].astype(np.int64)
+    visit_codes = codes[len(disp):].astype(np.int64)
+
+    usable = (visit_codes >= 0) & visit_dates.notna().to_numpy()
+    visit_rows = np.flatnonzero(usable)
+    visit_keys = visit_codes[usable] * _STRIDE + _day_numbers(visit_dates[usable]) + _DAY_OFFSET
+    order = np.argsort(visit_keys, kind="stable")
+    visit_keys = visit_keys[order]
+    visit_rows = visit_rows[order]
+
+    valid = (disp_codes >= 0) & disp_dates.notna().to_numpy()
+    disp_keys = disp_codes * _STRIDE + np.where(valid, _day_numbers(disp_dates.fillna(pd.Timestamp(0))), 0)
+    disp_keys = disp_keys + _DAY_OFFSET
+
+    n = len(visit_keys)
+    if n == 0:
+        visit_keys = np.array([-1], dtype=np.int64)
+        visit_rows = np.array([-1], dtype=np.int64)
+    prior = np.searchsorted(visit_keys, disp_keys, side="right") - 1
+    nxt = np.searchsorted(visit_keys, disp_keys, side="left")
+    prior_pos = np.clip(prior, 0, len(visit_keys) - 1)
+    next_pos = np.clip(nxt, 0, len(visit_keys) - 1)
+
+    has_prior = valid & (prior >= 0) & (visit_keys[prior_pos] // _STRIDE == disp_codes)
+    has_next = valid & (nxt < n) & (visit_keys[next_pos] // _STRIDE == disp_codes)
+
+    return pd.DataFrame({
+        "Days Before": pd.arrays.IntegerArray(disp_keys - visit_keys[prior_pos], ~has_prior),
+        "Days After": pd.arrays.IntegerArray(visit_keys[next_pos] - disp_keys, ~has_next),
+        "Prior Visit": np.where(has_prior, visit_rows[prior_pos], -1),
+        "Next Visit": np.where(has_next, visit_rows[next_pos], -1),
+    }, index=disp.index)
+
+
+def _gap_arrays(gaps):
+    """Return before/after gaps as float arrays with missing sides set to infinity."""
+    before = gaps["Days Before"].to_numpy(dtype=float, na_value=np.inf)
+    after = gaps["Days After"].to_numpy(dtype=float, na_value=np.inf)
+    return before, after
+
+
+def qualifies(gaps, before_days, after_days):
+    """Return a mask of dispenses with a visit inside the lookback window."""
+    before, after = _gap_arrays(gaps)
+    return pd.Series((before <= before_days) | (after <= after_days), index=gaps.index)
+
+
+def eligible_dispenses(disp, visits, gaps, before_days, after_days):
+    """Return qualifying dispenses joined to the nearest visit inside the window.
+
+    When visits fall on both sides the closer one wins, and ties go to the later visit.
+    """
+    gap_before, gap_after = _gap_arrays(gaps)
+    before = gap_before <= before_days
+    after = gap_after <= after_days
+    use_after = after & (~before | (gap_after <= gap_before))
+    keep = before | after
+
+    visit_pos = np.where(use_after, gaps["Next Visit"], gaps["Prior Visit"])[keep]
+    left = disp[keep]
+    right = visits.iloc[visit_pos].drop(columns="Patient ID")
+
+    overlap = set(left.columns) & set(right.columns)
+    left = left.rename(columns={c: f"{c}_disp" for c in overlap})
+    right = right.rename(columns={c: f"{c}_visit" for c in overlap})
+    right.index = left.index
+    return pd.concat([left, right], axis=1)
+
+
+def lookback_grid(gaps, savings=None, max_days=MAX_WINDOW_DAYS):
+    """Qualified dispense count and savings for every before/after window up to ``max_days``.
+
+    Each dispense is binned once by its (before, after) gap; a 2-D cumulative sum then
+    gives the union ``before <= b or after <= a`` for all windows in one pass.
+    """
+    size = max_days + 2
+    before, after = _gap_arrays(gaps)
+    cells = np.minimum(before, size - 1).astype(np.int64) * size + np.minimum(after, size - 1).astype(np.int64)
+
+    def union_table(weights):
+        hist = np.bincount(cells, weights=weights, minlength=size * size).reshape(size, size)
+        cum = hist.cumsum(axis=0).cumsum(axis=1)
+        by_before = cum[:max_days + 1, size - 1][:, None]
+        by_after = cum[size - 1, :max_days + 1][None, :]
+        return by_before + by_after - cum[:max_days + 1, :max_days + 1]
+
+    days = np.arange(max_days + 1)
+    grid = pd.DataFrame({
+        "Before Days": np.repeat(days, max_days + 1),
+        "After Days": np.tile(days, max_days + 1),
+        "Qualified Dispenses": union_table(None).ravel().astype(np.int64),
+    })
+    if savings is not None:
+        weights = pd.Series(savings).fillna(0).to_numpy(dtype=float)
+        grid["Qualified Savings ($)"] = union_table(weights).ravel()
+    return grid
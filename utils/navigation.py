@@ -0,0 +1,47 @@
+"""App Navigation
+
+Every tool runs as a page of the one Streamlit server started from ``main.py``, so pages
+share caches and session state. Each section lists its pages' scripts, titles and icons;
+``main.py`` builds the sidebar from them and the dashboard links to the same pages.
+"""
+
+DASHBOARD = ("dashboard.py", "Program Dashboard", "🏥")
+
+SECTION_ICONS = {
+    "Compliance & Claims": "🔍",
+    "Financial Tools": "💰",
+    "Program Operations": "🧠",
+    "Audit & Risk": "🛡️",
+}
+
+SECTIONS = {
+    "Compliance & Claims": [
+        ("pages/compliance_screener.py", "Compliance Screener", "🛡️"),
+        ("pages/claims_validator.py", "Claims Validator", "🧾"),
+        ("pages/lookback_impact_modeler.py", "Lookback Impact Modeler", "🕒"),
+        ("accumulator_checker.py", "Accumulator Checker", "📦"),
+        ("pages/provider_site_checker.py", "Provider-Site Checker", "🧑‍⚕️"),
+        ("pages/mef_opais_checker.py", "MEF & OPAIS Checker", "📍"),
+    ],
+    "Financial Tools": [
+        ("pages/invoice_checker.py", "Invoice Checker", "💰"),
+        ("pages/waste_recovery.py", "Waste Recovery", "🧮"),
+        ("pages/vendor_contract_analyzer.py", "Vendor Contract Analyzer", "📄"),
+        ("pages/contract_tracker.py", "Contract Tracker", "📑"),
+        ("pages/reverse_distribution_analyzer.py", "Reverse Distribution Analyzer", "♻️"),
+        ("pages/what_if_scenario_modeler.py", "What-If Scenario Modeler", "📊"),
+    ],
+    "Program Operations": [
+        ("pages/ndc_migration_checker.py", "NDC Migration Manager", "🔄"),
+        ("pages/rule_library_builder.py", "Rule Library", "📚"),
+        ("pages/document_library.py", "Document Library", "📂"),
+        ("pages/manufacturer_restriction_manager.py", "Manufacturer Restrictions", "🚫"),
+        ("pages/mcr_parser.py", "MCR Parser", "🏥"),
+        ("pages/report_generator.py", "Report Generator", "📈"),
+    ],
+    "Audit & Risk": [
+        ("pages/audit_request_response_generator.py", "Audit Request Generator", "📑"),
+        ("pages/audit_risk_analyzer_and_rca_generator.py", "Risk Analyzer & RCA", "🛡️"),
+        ("pages/change_evaluation_toolkit.py", "Change Evaluation Toolkit", "📝"),
+    ],
+}
@@ -0,0 +1,98 @@
+"""NDC Canonicalization
+
+NDCs arrive as 10-digit hyphenated codes (4-4-2, 5-3-2, 5-4-1), as 11-digit codes with
+or without hyphens, or as Excel integers that lost their leading zeros. Every join on an
+NDC goes through :func:`canonical_ndc`, which converts a column to the 11-digit 5-4-2 key
+(digits only). Each distinct value is parsed once and the key is stored as a categorical.
+"""
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+NDC_KEY = "NDC Key"
+
+_HYPHENATED = r"^(\d{4,5})-(\d{3,4})-(\d{1,2})$"
+
+# Segment lengths of each 10-digit format and where it takes the padding zero
+_PADDING = {
+    (4, 4, 2): lambda a, b, c: "0" + a + b + c,
+    (5, 3, 2): lambda a, b, c: a + "0" + b + c,
+    (5, 4, 1): lambda a, b, c: a + b + "0" + c,
+    (5, 4, 2): lambda a, b, c: a + b + c,
+}
+
+
+def _canonical_values(values):
+    """Convert distinct NDC strings to 11-digit keys, leaving unrecognized values as given."""
+    text = pd.Series(values, dtype="string").str.strip().str.replace(r"\.0$", "", regex=True)
+    text = text.str.replace(r"\s+", "-", regex=True)
+
+    parts = text.str.extract(_HYPHENATED)
+    a, b, c = parts[0].fillna(""), parts[1].fillna(""), parts[2].fillna("")
+    lengths = (a.str.len().to_numpy(), b.str.len().to_numpy(), c.str.len().to_numpy())
+    key = pd.Series(pd.NA, index=text.index, dtype="string")
+    for (la, lb, lc), pad in _PADDING.items():
+        fits = (lengths[0] == la) & (lengths[1] == lb) & (lengths[2] == lc)
+        key = key.mask(fits, pad(a, b, c))
+
+    # Plain digits are an 11-digit code, possibly with its leading zeros dropped by Excel
+    digits = text.str.fullmatch(r"\d{1,11}").fillna(False).to_numpy(dtype=bool)
+    key = key.mask(digits & key.isna().to_numpy(), text.str.zfill(11))
+    return key.fillna(text)
+
+
+def canonical_ndc(ndcs):
+    """Return a categorical Series of 11-digit NDC keys aligned with ``ndcs``.
+
+    Missing NDCs stay missing; values that are not a recognizable NDC are kept as
+    stripped text so they still match themselves.
+    """
+    ndcs = pd.Series(ndcs)
+    codes, uniques = pd.factorize(ndcs)
+    key_codes, categories = pd.factorize(_canonical_values(uniques))
+    key_codes = np.append(key_codes, -1)[codes]
+    return pd.Series(
+        pd.Categorical.from_codes(key_codes, categories=pd.Index(categories, dtype=object)),
+        index=ndcs.index,
+        name=ndcs.name,
+    )
+
+
+def add_ndc_key(df, column="NDC"):
+    """Return a copy of ``df`` with the canonical key of ``column`` in ``NDC Key``."""
+    return df.assign(**{NDC_KEY: canonical_ndc(df[column])})
+
+
+def _shared_categories(left, right):
+    """Give both key columns the same categories so joins compare category codes."""
+    categories = union_categoricals([left[NDC_KEY], right[NDC_KEY]], ignore_order=True).categories
+    left[NDC_KEY] = left[NDC_KEY].cat.set_categories(categories)
+    right[NDC_KEY] = right[NDC_KEY].cat.set_categories(categories)
+
+
+def ndc_frames(left, right, left_on="NDC", right_on="NDC"):
+    """Return copies of both frames keyed by canonical NDC with shared categories.
+
+    When both sides name the NDC column the same, the right-hand copy is dropped so the
+    left frame's NDC text survives the join unsuffixed.
+    """
+    left = add_ndc_key(left, left_on)
+    right = add_ndc_key(right, right_on)
+    if right_on == left_on:
+        right = right.drop(columns=right_on)
+    _shared_categories(left, right)
+    return left, right
+
+
+def merge_on_ndc(left, right, left_on="NDC", right_on="NDC", on=None, **kwargs):
+    """``pd.merge`` two frames on canonical NDC (plus any other ``on`` keys)."""
+    left, right = ndc_frames(left, right, left_on, right_on)
+    keys = [NDC_KEY] + ([on] if isinstance(on, str) else list(on or []))
+    return pd.merge(left, right, on=keys, **kwargs)
+
+
+def ndc_isin(ndcs, reference):
+    """Return a boolean Series marking NDCs whose canonical key appears in ``reference``."""
+    keys = canonical_ndc(ndcs)
+    return keys.isin(canonical_ndc(reference).dropna().unique()) & keys.notna()
@@ -0,0 +1,164 @@
+"""NDC Migration Checks
+
+Matches TPA accumulator NDCs against the discontinued/replacement NDC list and reports
+whether accumulation should move to the new NDC. Manufacturers re-package repeatedly,
+so the list is compiled into a resolved mapping that follows every chain (A → B → C → D)
+to its current NDC, with cycles and conflicting replacements flagged.
+"""
+
+import numpy as np
+import pandas as pd
+
+from utils.ndc import canonical_ndc
+
+# Migration list columns saying whether a hop may carry accumulation over
+ALLOW_COLUMNS = ["Allow Migration", "Migration Allowed"]
+_ALLOWED_VALUES = ["TRUE", "YES", "Y", "1", "1.0"]
+
+# EHR default-NDC report columns, in order of preference
+DEFAULT_NDC_COLUMNS = ["Default NDC", "NDC"]
+
+CURRENT = "✅ Current NDC"
+MIGRATION_ALLOWED = "🔁 Migration Allowed"
+MIGRATION_NOT_ALLOWED = "❌ Discontinued - Migration Not Allowed"
+CYCLE = "❌ Migration Cycle"
+FORK = "❌ Conflicting Replacement NDCs"
+
+STATUSES = [CURRENT, MIGRATION_ALLOWED, MIGRATION_NOT_ALLOWED, CYCLE, FORK]
+
+
+def _allowed(migration):
+    """Return whether each migration row allows accumulation to move (missing column means no)."""
+    column = next((c for c in ALLOW_COLUMNS if c in migration.columns), None)
+    if column is None:
+        return np.zeros(len(migration), dtype=bool)
+    text = migration[column].astype("string").str.strip().str.upper()
+    return text.isin(_ALLOWED_VALUES).fillna(False).to_numpy(dtype=bool)
+
+
+def compile_migrations(migration):
+    """Resolve the migration list into one row per discontinued NDC.
+
+    Every ``Old NDC`` is followed hop by hop to an NDC that is not itself discontinued,
+    using pointer jumping (path compression applied to all NDCs at once). The result has
+    the first hop (``New NDC``), the final ``Resolved NDC``, the number of ``Hops``,
+    whether every hop allowed migration, and a ``Chain Issue`` for NDCs on a cycle or
+    whose chain reaches an NDC listed with more than one replacement.
+    """
+    old = canonical_ndc(migration["Old NDC"]).astype(object).to_numpy()
+    new = canonical_ndc(migration["New NDC"]).astype(object).to_numpy()
+    valid = pd.notna(old) & pd.notna(new) & (old != new)
+    old, new, allowed = old[valid], new[valid], _allowed(migration)[valid]
+    new_text = migration["New NDC"].astype(object).to_numpy()[valid]
+    old_text = migration["Old NDC"].astype(object).to_numpy()[valid]
+
+    # Number every NDC that appears on either side of the list
+    codes, nodes = pd.factorize(np.concatenate([old, new]))
+    src, dst = codes[:len(old)], codes[len(old):]
+    n = len(nodes)
+    display = pd.Series(np.concatenate([old_text, new_text])).groupby(codes).first().to_numpy()
+
+    # An NDC replaced by more than one distinct NDC is a fork; it is not followed further
+    edges = pd.DataFrame({"src": src, "dst": dst, "allowed": allowed}).drop_duplicates(["src", "dst"])
+    targets = edges.groupby("src")["dst"].nunique()
+    fork = np.zeros(n, dtype=bool)
+    fork[targets.index[targets.to_numpy() > 1]] = True
+    edges = edges[~fork[edges["src"].to_numpy()]]
+
+    parent = np.arange(n)
+    hop_allowed = np.ones(n, dtype=bool)
+    parent[edges["src"].to_numpy()] = edges["dst"].to_numpy()
+    hop_allowed[edges["src"].to_numpy()] = edges["allowed"].to_numpy()
+    first_hop = parent.copy()
+
+    # Pointer jumping: each round doubles how far every NDC points along its chain, so
+    # log2(n) rounds reach the end of every chain (path compression for all NDCs at once)
+    root = parent.copy()
+    hops = (parent != np.arange(n)).astype(np.int64)
+    all_allowed = hop_allowed.copy()
+    for _ in range(int(np.ceil(np.log2(n + 1))) + 1):
+        hops = hops + hops[root]
+        all_allowed = all_allowed & all_allowed[root]
+        root = root[root]
+
+    # A chain that never reaches a replacement-free NDC loops back on itself
+    cycle = parent[root] != root
+
+    discontinued = np.zeros(n, dtype=bool)
+    discontinued[src] = True
+    chain_issue = np.select([cycle, fork[root] | fork], [CYCLE, FORK], default="")
+
+    mapping = pd.DataFrame({
+        "Old NDC Key": nodes,
+        "Old NDC": display,
+        "New NDC": np.where(first_hop != np.arange(n), display[first_hop], None),
+        "Resolved NDC": np.where(cycle, None, display[root]),
+        "Resolved NDC Key": np.where(cycle, None, nodes[root]),
+        "Hops": pd.arrays.IntegerArray(np.where(cycle, 0, hops), cycle),
+        "All Hops Allowed": all_allowed,
+        "Chain Issue": chain_issue,
+    })
+    return mapping[discontinued].reset_index(drop=True)
+
+
+def _lookup(ndcs, mapping):
+    """Return the canonical keys of ``ndcs`` and their row in ``mapping`` (-1 when not discontinued)."""
+    keys = canonical_ndc(ndcs)
+    rows = pd.Index(mapping["Old NDC Key"]).get_indexer(keys.astype(object))
+    return keys, rows
+
+
+def _attach(df, mapping, rows, columns):
+    """Append mapping columns to ``df`` by row position, leaving unmatched rows empty."""
+    attached = mapping[columns].reindex(rows).set_axis(df.index)
+    return pd.concat([df, attached], axis=1)
+
+
+def migration_status(report):
+    """Classify each row from its resolved chain, as a categorical ``Migration Status``."""
+    issue = report["Chain Issue"].fillna("")
+    codes = np.select(
+        [
+            report["Resolved NDC"].isna() & issue.eq(""),
+            issue.eq(CYCLE),
+            issue.eq(FORK),
+            report["All Hops Allowed"].fillna(False).astype(bool),
+        ],
+        [0, 3, 4, 1],
+        default=2,
+    )
+    return pd.Categorical.from_codes(codes, categories=STATUSES)
+
+
+def migration_report(acc, migration, chains=None):
+    """Resolve every accumulator NDC through the migration chains and add a ``Migration Status``.
+
+    Pass ``chains`` from :func:`compile_migrations` to reuse an already compiled list.
+    """
+    mapping = chains if chains is not None else compile_migrations(migration)
+    keys, rows = _lookup(acc["NDC"], mapping)
+
+    report = _attach(acc.assign(**{"NDC Key": keys}), mapping, rows, [
+        "New NDC", "Resolved NDC", "Hops", "All Hops Allowed", "Chain Issue",
+    ])
+    report["Migration Status"] = migration_status(report)
+    return report
+
+
+def default_ndc_check(default_ndc, migration, chains=None):
+    """Cross-check the EHR default-NDC report against the resolved migration chains.
+
+    Defaults that point at a discontinued NDC should be updated to its ``Resolved NDC``.
+    """
+    column = next(c for c in DEFAULT_NDC_COLUMNS if c in default_ndc.columns)
+    mapping = chains if chains is not None else compile_migrations(migration)
+    _, rows = _lookup(default_ndc[column], mapping)
+
+    report = _attach(default_ndc, mapping, rows, ["Resolved NDC", "Chain Issue"])
+    discontinued = rows >= 0
+    report["Default NDC Status"] = np.select(
+        [~discontinued, report["Chain Issue"].fillna("").ne("").to_numpy()],
+        ["✅ Default is current", "❌ Default is discontinued; replacement unresolved"],
+        default="⚠️ Default is discontinued; update to Resolved NDC",
+    )
+    return report
@@ -0,0 +1,115 @@
+"""What-If Monte Carlo Engine
+
+Fits savings distributions from the reports other modules produce (waste recovery,
+overcharges, reverse distribution returns, site savings) and simulates program savings
+under the scenario controls. Each savings pool is a compound of many items, so it is
+moment-matched to a lognormal from the item amounts; each recovery rate is a Beta
+around its slider value. All scenarios are drawn at once with NumPy.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Savings drivers: the report columns holding item amounts and the amount assumed when
+# no report is available (the modeler's former fixed values)
+DRIVERS = {
+    "Recovered Waste Savings": {"columns": ["Savings ($)"], "default": 50000},
+    "Resolved Overcharges": {"columns": ["Overcharge Total", "Overcharge Amount", "Overcharge ($)"], "default": 40000},
+    "Recouped Drug Returns": {"columns": ["Lost Value ($)"], "default": 20000},
+    "Savings per Site": {"columns": ["Site Savings ($)", "Annual Savings ($)", "Savings ($)"], "default": 15000},
+}
+SITE_DRIVER = "Savings per Site"
+SITE_SAVINGS = "Savings from Site Expansion"
+
+# Higher values make the recovery rates less uncertain around the slider value
+RATE_CONCENTRATION = 20
+
+DEFAULT_SCENARIOS = 100_000
+PERCENTILES = [10, 50, 90]
+
+
+def report_amounts(report, driver):
+    """Return the positive item amounts of a driver's report column (empty when it has none)."""
+    column = next((c for c in DRIVERS[driver]["columns"] if report is not None and c in report.columns), None)
+    if column is None:
+        return np.array([])
+    amounts = pd.to_numeric(report[column], errors="coerce").to_numpy(dtype=float)
+    return amounts[np.isfinite(amounts) & (amounts > 0)]
+
+
+def fit_pool(amounts, default, per_item=False):
+    """Fit the mean and spread of a savings pool from its item amounts.
+
+    A pool is the sum of its items (compound Poisson): its mean is the item total and its
+    variance the sum of squared items. With ``per_item`` the fit is for one item instead
+    (e.g. the savings of one site). Without amounts the driver is fixed at ``default``.
+    """
+    if not len(amounts):
+        return {"Mean": float(default), "Std": 0.0, "Items": 0, "Source": "Default"}
+    if per_item:
+        return {"Mean": amounts.mean(), "Std": amounts.std(), "Items": len(amounts), "Source": "Report"}
+    return {"Mean": amounts.sum(), "Std": np.sqrt((amounts ** 2).sum()), "Items": len(amounts), "Source": "Report"}
+
+
+def lognormal_draws(mean, std, size, rng):
+    """Draw lognormal values with the given mean and standard deviation."""
+    if mean <= 0 or std <= 0:
+        return np.full(size, max(mean, 0.0))
+    sigma2 = np.log1p((std / mean) ** 2)
+    return rng.lognormal(np.log(mean) - sigma2 / 2, np.sqrt(sigma2), size)
+
+
+def rate_draws(rate, size, rng, concentration=RATE_CONCENTRATION):
+    """Draw recovery rates from a Beta distribution centred on ``rate`` (0 to 1)."""
+    if rate <= 0 or rate >= 1:
+        return np.full(size, float(np.clip(rate, 0, 1)))
+    return rng.beta(rate * concentration, (1 - rate) * concentration, size)
+
+
+def simulate(fits, rates, new_sites, scenarios=DEFAULT_SCENARIOS, seed=0):
+    """Draw savings scenarios; returns one column per savings component plus ``Total``.
+
+    ``fits`` maps each driver to :func:`fit_pool` output and ``rates`` maps the pool
+    drivers to their recovery rate (0 to 1). New sites each add one draw of site savings.
+    """
+    rng = np.random.default_rng(seed)
+    draws = {}
+    for driver, rate in rates.items():
+        pool = lognormal_draws(fits[driver]["Mean"], fits[driver]["Std"], scenarios, rng)
+        draws[driver] = pool * rate_draws(rate, scenarios, rng)
+
+    # The sum of n site draws is approximated by one draw with n times the mean and variance
+    site = fits[SITE_DRIVER]
+    draws[SITE_SAVINGS] = lognormal_draws(site["Mean"] * new_sites, site["Std"] * np.sqrt(new_sites), scenarios, rng)
+
+    frame = pd.DataFrame(draws)
+    frame["Total"] = frame.to_numpy().sum(axis=1)
+    return frame
+
+
+def distribution_summary(draws):
+    """Return the mean, standard deviation and P10/P50/P90 of every simulated column."""
+    values = draws.to_numpy()
+    summary = pd.DataFrame({"Component": draws.columns, "Mean ($)": values.mean(axis=0), "Std ($)": values.std(axis=0)})
+    for p, column in zip(PERCENTILES, np.percentile(values, PERCENTILES, axis=0)):
+        summary[f"P{p} ($)"] = column
+    return summary
+
+
+def tornado(summary):
+    """Rank drivers by how far total savings swing between their P10 and P90.
+
+    Takes the :func:`distribution_summary` of the draws. Savings add up, so moving one
+    component from its P10 to its P90 with the others at their medians moves the total
+    by that component's P10–P90 range.
+    """
+    components = summary[summary["Component"] != "Total"]
+    low, median, high = (components[f"P{p} ($)"].to_numpy() for p in PERCENTILES)
+    base = median.sum()
+    ranking = pd.DataFrame({
+        "Driver": components["Component"].to_numpy(),
+        "Total at P10 ($)": base - median + low,
+        "Total at P90 ($)": base - median + high,
+    })
+    ranking["Swing ($)"] = ranking["Total at P90 ($)"] - ranking["Total at P10 ($)"]
+    return ranking.sort_values("Swing ($)", ascending=False, ignore_index=True)
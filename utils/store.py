@@ -0,0 +1,441 @@
+"""Library Data Store
+
+Keeps the shared ``library/`` tables (compliance flags, contract pharmacies, provider
+and site lists, logs) in an embedded SQLite database with indexes on the columns pages
+filter and count by. A CSV file dropped into ``library/`` is imported the first time its
+table is used. From then on the database holds the table: when the file changes, only
+the rows it adds are merged in, so rows written through the store are never lost.
+Writes run in transactions.
+
+Every write bumps the table's version number, so callers can cache a table until it
+changes, whichever session or process changed it.
+
+A table can keep a rollup: running row counts and column totals per key, updated in the
+same transaction as every append, so summaries never rescan the table.
+"""
+
+import os
+import sqlite3
+from contextlib import closing, contextmanager
+
+import pandas as pd
+from pandas.api.types import is_datetime64_any_dtype
+
+from utils.loaders import iter_csv_chunks
+
+LIBRARY_FOLDER = "library"
+DB_PATH = os.path.join(LIBRARY_FOLDER, "library.db")
+
+# Store tables, the CSV each one is imported from, and the columns worth indexing
+LIBRARY_TABLES = {
+    "compliance_flags": {"csv": "compliance_flags.csv", "indexes": ["Flag", "NDC", "NPI", "CE ID"]},
+    "contract_pharmacies": {"csv": "contract_pharmacies.csv", "indexes": ["Store ID", "CE ID"]},
+    "provider_list": {"csv": "provider_list.csv", "indexes": ["NPI", "CE ID"]},
+    "site_crosswalk": {"csv": "340B_site_crosswalk.csv", "indexes": ["Cost Center", "CE ID"]},
+    "invoice_overcharges": {"csv": "invoice_overcharges.csv", "indexes": ["NDC"]},
+    "ceiling_price_history": {"csv": "ceiling_price_history.csv", "indexes": ["NDC", "Effective Date"]},
+    "library_index": {"csv": "library_index.csv", "indexes": ["Category", "SHA-256"]},
+    "change_evaluation_log": {
+        "csv": "change_evaluation_log.csv",
+        "indexes": ["Change Type"],
+        "rollup": {
+            "table": "change_evaluation_rollup",
+            "keys": ["Change Type"],
+            "totals": ["Estimated Cost ($)", "Estimated Savings ($)", "ROI (%)", "Implementation Time (days)"],
+        },
+    },
+    "ndc_package_index": {"csv": "ndc_package_index.csv", "indexes": ["NDC Key"]},
+    "library_postings": {"csv": "library_postings.csv", "indexes": ["Term", "SHA-256"]},
+    "compliance_screening": {"csv": "compliance_screening.csv", "indexes": ["Row Hash"]},
+    "compliance_screening_runs": {"csv": "compliance_screening_runs.csv", "indexes": []},
+}
+
+
+def _quote(identifier):
+    """Quote a table or column name for SQL."""
+    return '"' + str(identifier).replace('"', '""') + '"'
+
+
+def connect():
+    """Open a connection to the library database, creating it if needed."""
+    os.makedirs(LIBRARY_FOLDER, exist_ok=True)
+    conn = sqlite3.connect(DB_PATH, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS _csv_imports "
+        "(table_name TEXT PRIMARY KEY, mtime REAL, size INTEGER)"
+    )
+    conn.execute("CREATE TABLE IF NOT EXISTS _table_versions (table_name TEXT PRIMARY KEY, version INTEGER)")
+    return conn
+
+
+@contextmanager
+def _write(conn):
+    """Run a block as one transaction that takes the write lock up front.
+
+    The explicit BEGIN keeps DROP and CREATE statements inside the transaction too, so a
+    failed write rolls everything back and readers never see it half done.
+    """
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        yield
+
+
+def _bump_version(conn, name):
+    """Count a write to a table, inside the caller's transaction."""
+    conn.execute(
+        "INSERT INTO _table_versions VALUES (?, 1) "
+        "ON CONFLICT (table_name) DO UPDATE SET version = version + 1",
+        (name,),
+    )
+
+
+def _table_exists(conn, name):
+    """Return True when ``name`` is a table in the database."""
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+    ).fetchone()
+    return row is not None
+
+
+def _create_indexes(conn, name):
+    """Create the configured indexes for columns the table actually has."""
+    columns = _columns(conn, name)
+    for column in LIBRARY_TABLES.get(name, {}).get("indexes", []):
+        if column in columns:
+            index = f"ix_{name}_{column}".replace(" ", "_")
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {_quote(index)} ON {_quote(name)} ({_quote(column)})")
+
+
+def _columns(conn, name):
+    """Return the column names of a table."""
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({_quote(name)})")]
+
+
+def _sync(conn, name):
+    """Import the table's CSV from ``library/`` when it is new or has changed since the last import.
+
+    A missing table is created from the file. An existing table keeps its rows and gains
+    the file's rows it does not already hold. Syncing a rollup syncs the table it sums.
+    """
+    spec = LIBRARY_TABLES.get(name)
+    if not spec:
+        source = next((t for t, s in LIBRARY_TABLES.items() if s.get("rollup", {}).get("table") == name), None)
+        if source:
+            _sync_rollup(conn, source)
+        return
+    path = os.path.join(LIBRARY_FOLDER, spec["csv"])
+    if not os.path.exists(path):
+        return
+    stat = os.stat(path)
+    seen = conn.execute(
+        "SELECT mtime, size FROM _csv_imports WHERE table_name = ?", (name,)
+    ).fetchone()
+    if seen == (stat.st_mtime, stat.st_size):
+        return
+
+    with _write(conn):
+        # Another connection may have imported the file while this one waited for the lock
+        seen = conn.execute(
+            "SELECT mtime, size FROM _csv_imports WHERE table_name = ?", (name,)
+        ).fetchone()
+        if seen == (stat.st_mtime, stat.st_size):
+            return
+        if not _table_exists(conn, name):
+            for chunk in iter_csv_chunks(path, chunksize=100_000):
+                _insert(conn, name, chunk)
+            if not _table_exists(conn, name):
+                _insert(conn, name, pd.read_csv(path, nrows=0))
+            _rebuild_rollup(conn, name)
+            _bump_version(conn, name)
+        else:
+            stored = pd.read_sql_query(f"SELECT * FROM {_quote(name)}", conn)
+            common = [c for c in pd.read_csv(path, nrows=0).columns if c in stored.columns]
+            known = set(_row_keys(stored, common))
+            added = 0
+            for chunk in iter_csv_chunks(path, chunksize=100_000):
+                if common:
+                    chunk = chunk[~_row_keys(chunk, common).isin(known).to_numpy()]
+                if len(chunk):
+                    _insert(conn, name, chunk)
+                    _add_to_rollup(conn, name, chunk)
+                    added += len(chunk)
+            if added:
+                _bump_version(conn, name)
+        conn.execute(
+            "INSERT OR REPLACE INTO _csv_imports VALUES (?, ?, ?)",
+            (name, stat.st_mtime, stat.st_size),
+        )
+
+
+def _sync_rollup(conn, name):
+    """Sync a table that keeps a rollup, building the rollup if the table predates it."""
+    _sync(conn, name)
+    rollup = LIBRARY_TABLES[name]["rollup"]["table"]
+    if _table_exists(conn, name) and not _table_exists(conn, rollup):
+        with _write(conn):
+            if not _table_exists(conn, rollup):
+                _rebuild_rollup(conn, name)
+
+
+def _plain(value):
+    """Return whole floats as ints, as SQLite stores them in INTEGER columns."""
+    return int(value) if isinstance(value, float) and value.is_integer() else value
+
+
+def _row_keys(df, columns):
+    """Hash each row's ``columns`` the same way for a frame and for the rows it was stored as."""
+    values = pd.DataFrame(_records(df.reindex(columns=columns)), columns=columns, dtype=object)
+    values = values.apply(lambda col: col.map(_plain)).astype(str)
+    return pd.util.hash_pandas_object(values, index=False)
+
+
+def _records(df):
+    """Convert a frame into row tuples SQLite can bind, with missing values as NULL."""
+    df = df.copy()
+    for column in df.columns:
+        if is_datetime64_any_dtype(df[column]):
+            df[column] = df[column].dt.strftime("%Y-%m-%d %H:%M:%S")
+    df = df.astype(object).where(df.notna(), None)
+    return list(df.itertuples(index=False, name=None))
+
+
+def _insert(conn, name, df):
+    """Insert a frame into a table inside the caller's transaction, creating the table if needed."""
+    if not _table_exists(conn, name):
+        conn.execute(pd.io.sql.get_schema(df, name, con=conn))
+    else:
+        # Columns added since the table was created are appended; older rows hold NULL
+        existing = _columns(conn, name)
+        for column in df.columns:
+            if column not in existing:
+                conn.execute(f"ALTER TABLE {_quote(name)} ADD COLUMN {_quote(column)}")
+    columns = ", ".join(_quote(c) for c in df.columns)
+    marks = ", ".join("?" for _ in df.columns)
+    conn.executemany(f"INSERT INTO {_quote(name)} ({columns}) VALUES ({marks})", _records(df))
+    _create_indexes(conn, name)
+
+
+def _rebuild_rollup(conn, name):
+    """Recompute a table's rollup from all of its rows, inside the caller's transaction."""
+    spec = LIBRARY_TABLES.get(name, {}).get("rollup")
+    if not spec:
+        return
+    keys, totals = spec["keys"], spec["totals"]
+    conn.execute(f"DROP TABLE IF EXISTS {_quote(spec['table'])}")
+    columns = ", ".join(
+        [f"{_quote(k)} TEXT NOT NULL" for k in keys] + ['"Rows" INTEGER']
+        + [f"{_quote(c)} REAL" for c in totals]
+    )
+    conn.execute(
+        f"CREATE TABLE {_quote(spec['table'])} ({columns}, PRIMARY KEY ({', '.join(_quote(k) for k in keys)}))"
+    )
+    if not _table_exists(conn, name):
+        return
+    existing = _columns(conn, name)
+    keyed = ", ".join(f"COALESCE({_quote(k)}, '')" if k in existing else "''" for k in keys)
+    sums = ", ".join(f"TOTAL({_quote(c)})" if c in existing else "0" for c in totals)
+    conn.execute(
+        f"INSERT INTO {_quote(spec['table'])} SELECT {keyed}, COUNT(*), {sums} "
+        f"FROM {_quote(name)} GROUP BY {keyed}"
+    )
+
+
+def _add_to_rollup(conn, name, df):
+    """Add appended rows to the table's rollup, inside the caller's transaction."""
+    spec = LIBRARY_TABLES.get(name, {}).get("rollup")
+    if not spec:
+        return
+    if not _table_exists(conn, spec["table"]):
+        # First append since the rollup was introduced; the rows are already in the table
+        _rebuild_rollup(conn, name)
+        return
+    keys, totals = spec["keys"], spec["totals"]
+    grouped = df.reindex(columns=keys + totals).assign(Rows=1)
+    grouped[keys] = grouped[keys].astype("string").fillna("")
+    grouped[totals] = grouped[totals].apply(pd.to_numeric, errors="coerce")
+    grouped = grouped.groupby(keys, as_index=False)[["Rows"] + totals].sum()
+    columns = keys + ["Rows"] + totals
+    updates = ", ".join(f"{_quote(c)} = {_quote(c)} + excluded.{_quote(c)}" for c in ["Rows"] + totals)
+    conn.executemany(
+        f"INSERT INTO {_quote(spec['table'])} ({', '.join(_quote(c) for c in columns)}) "
+        f"VALUES ({', '.join('?' for _ in columns)}) "
+        f"ON CONFLICT ({', '.join(_quote(k) for k in keys)}) DO UPDATE SET {updates}",
+        _records(grouped[columns]),
+    )
+
+
+def _where(filters):
+    """Build a parameterized WHERE clause from equality filters."""
+    if not filters:
+        return "", []
+    clause = " AND ".join(f"{_quote(column)} = ?" for column in filters)
+    return f" WHERE {clause}", list(filters.values())
+
+
+def table_columns(name):
+    """Return the column names of a library table (empty if it does not exist)."""
+    with closing(connect()) as conn:
+        _sync(conn, name)
+        return _columns(conn, name)
+
+
+def read_table(name, filters=None, columns=None, limit=None):
+    """Return a library table, optionally filtered on column equality and limited to some columns."""
+    with closing(connect()) as conn:
+        _sync(conn, name)
+        if not _table_exists(conn, name):
+            return pd.DataFrame(columns=columns)
+        select = ", ".join(_quote(c) for c in columns) if columns else "*"
+        where, params = _where(filters)
+        sql = f"SELECT {select} FROM {_quote(name)}{where}"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        return pd.read_sql_query(sql, conn, params=params)
+
+
+def read_latest(name, limit):
+    """Return the ``limit`` most recently added rows of a library table, newest first."""
+    with closing(connect()) as conn:
+        _sync(conn, name)
+        if not _table_exists(conn, name):
+            return pd.DataFrame()
+        sql = f"SELECT * FROM {_quote(name)} ORDER BY rowid DESC LIMIT {int(limit)}"
+        return pd.read_sql_query(sql, conn)
+
+
+def read_rows_in(name, column, values, columns=None):
+    """Return the rows of a library table whose ``column`` is one of ``values``."""
+    values = list(values)
+    with closing(connect()) as conn:
+        _sync(conn, name)
+        if not values or not _table_exists(conn, name) or column not in _columns(conn, name):
+            return pd.DataFrame(columns=columns)
+        select = ", ".join(_quote(c) for c in columns) if columns else "*"
+        marks = ", ".join("?" for _ in values)
+        sql = f"SELECT {select} FROM {_quote(name)} WHERE {_quote(column)} IN ({marks})"
+        return pd.read_sql_query(sql, conn, params=values)
+
+
+def iter_table_rows(name, filters=None, chunksize=50_000):
+    """Yield a library table as lists of up to ``chunksize`` row tuples, in ``table_columns`` order."""
+    with closing(connect()) as conn:
+        _sync(conn, name)
+        if not _table_exists(conn, name):
+            return
+        where, params = _where(filters)
+        cursor = conn.execute(f"SELECT * FROM {_quote(name)}{where}", params)
+        while True:
+            rows = cursor.fetchmany(chunksize)
+            if not rows:
+                break
+            yield rows
+
+
+def table_version(name):
+    """Return a number that changes on every write to a library table, including rows merged in from its CSV."""
+    with closing(connect()) as conn:
+        _sync(conn, name)
+        row = conn.execute("SELECT version FROM _table_versions WHERE table_name = ?", (name,)).fetchone()
+        return row[0] if row else 0
+
+
+def count_rows(name, filters=None):
+    """Return the number of rows in a library table matching the filters."""
+    with closing(connect()) as conn:
+        _sync(conn, name)
+        if not _table_exists(conn, name) or not set(filters or {}).issubset(_columns(conn, name)):
+            return 0
+        where, params = _where(filters)
+        return conn.execute(f"SELECT COUNT(*) FROM {_quote(name)}{where}", params).fetchone()[0]
+
+
+def count_distinct(name, column):
+    """Return the number of distinct non-null values of a column."""
+    with closing(connect()) as conn:
+        _sync(conn, name)
+        if not _table_exists(conn, name) or column not in _columns(conn, name):
+            return 0
+        sql = f"SELECT COUNT(DISTINCT {_quote(column)}) FROM {_quote(name)}"
+        return conn.execute(sql).fetchone()[0]
+
+
+def value_counts(name, column):
+    """Return row counts per value of a column, largest first."""
+    with closing(connect()) as conn:
+        _sync(conn, name)
+        if not _table_exists(conn, name) or column not in _columns(conn, name):
+            return pd.Series(dtype="int64")
+        sql = (
+            f"SELECT {_quote(column)} AS value, COUNT(*) AS count FROM {_quote(name)} "
+            f"GROUP BY {_quote(column)} ORDER BY count DESC"
+        )
+        counts = pd.read_sql_query(sql, conn)
+        return counts.set_index("value")["count"]
+
+
+def append_rows(name, df):
+    """Append rows to a library table in a single transaction, creating it if needed.
+
+    The table's rollup, if it keeps one, is updated in the same transaction, so
+    concurrent appends never lose rows or totals.
+    """
+    with closing(connect()) as conn:
+        _sync(conn, name)
+        with _write(conn):
+            _insert(conn, name, df)
+            _add_to_rollup(conn, name, df)
+            _bump_version(conn, name)
+
+
+def update_table(name, update):
+    """Read a library table, change it and write it back in a single transaction.
+
+    ``update`` receives the current rows and returns ``(rows, replace)``: the whole new
+    table when ``replace`` is true, otherwise only the rows to append. The write lock is
+    held from the read to the write, so rows other sessions write meanwhile are not lost.
+    """
+    with closing(connect()) as conn:
+        _sync(conn, name)
+        with _write(conn):
+            exists = _table_exists(conn, name)
+            current = pd.read_sql_query(f"SELECT * FROM {_quote(name)}", conn) if exists else pd.DataFrame()
+            rows, replace = update(current)
+            if replace:
+                conn.execute(f"DROP TABLE IF EXISTS {_quote(name)}")
+                _insert(conn, name, rows)
+                _rebuild_rollup(conn, name)
+            elif len(rows):
+                _insert(conn, name, rows)
+                _add_to_rollup(conn, name, rows)
+            else:
+                return
+            _bump_version(conn, name)
+
+
+def delete_rows(name, column, values):
+    """Delete the rows whose ``column`` is one of ``values`` in a single transaction."""
+    with closing(connect()) as conn:
+        _sync(conn, name)
+        if not _table_exists(conn, name):
+            return
+        with _write(conn):
+            conn.executemany(
+                f"DELETE FROM {_quote(name)} WHERE {_quote(column)} = ?",
+                [(v,) for v in pd.Series(values, dtype=object).tolist()],
+            )
+            _rebuild_rollup(conn, name)
+            _bump_version(conn, name)
+
+
+def replace_table(name, df):
+    """Replace the contents of a library table in a single transaction.
+
+    If any row fails to insert, the table keeps its previous contents.
+    """
+    with closing(connect()) as conn:
+        with _write(conn):
+            conn.execute(f"DROP TABLE IF EXISTS {_quote(name)}")
+            _insert(conn, name, df)
+            _rebuild_rollup(conn, name)
+            _bump_version(conn, name)
@@ -0,0 +1,71 @@
+"""Chunked Claims Screening
+
+Runs a screening function over a CSV claims file a fixed number of rows at a time.
+Reference tables stay in memory, flagged rows are appended to an output file after
+each chunk, and peak memory is set by the chunk size rather than the file size.
+"""
+
+import os
+import tempfile
+
+import pandas as pd
+
+from utils.loaders import iter_csv_chunks
+
+DEFAULT_CHUNK_ROWS = 250_000
+
+
+def stream_flagged(source, screen, output_path, chunksize=DEFAULT_CHUNK_ROWS):
+    """Apply ``screen`` to each chunk of ``source`` and append its result to ``output_path``.
+
+    ``screen`` takes a claims chunk and returns the flagged rows for it. Returns the
+    number of rows read and the number of rows written.
+    """
+    rows_read = rows_flagged = 0
+    first = True
+    for chunk in iter_csv_chunks(source, chunksize):
+        flagged = screen(chunk)
+        flagged.to_csv(output_path, mode="w" if first else "a", header=first, index=False)
+        rows_read += len(chunk)
+        rows_flagged += len(flagged)
+        first = False
+    if first:
+        open(output_path, "w").close()
+    return rows_read, rows_flagged
+
+
+def stream_to_tempfile(source, screen, chunksize=DEFAULT_CHUNK_ROWS, prefix="flagged_"):
+    """Run :func:`stream_flagged` into a new temporary CSV and return its path and counts."""
+    fd, output_path = tempfile.mkstemp(prefix=prefix, suffix=".csv")
+    os.close(fd)
+    try:
+        rows_read, rows_flagged = stream_flagged(source, screen, output_path, chunksize)
+    except Exception:
+        os.remove(output_path)
+        raise
+    return output_path, rows_read, rows_flagged
+
+
+def stream_cached(cache, key, source, screen, chunksize=DEFAULT_CHUNK_ROWS, prefix="flagged_"):
+    """Run :func:`stream_to_tempfile` once per ``key``, keeping the result in ``cache``.
+
+    ``cache`` is a dict such as ``st.session_state`` and ``key`` identifies the uploads,
+    so reruns reuse the output file. One output is kept per ``prefix``; the previous
+    file is removed when the key changes.
+    """
+    slot = f"{prefix}stream"
+    cached_key, result = cache.get(slot, (None, None))
+    if result is not None and cached_key == key and os.path.exists(result[0]):
+        return result
+    if result is not None and os.path.exists(result[0]):
+        os.remove(result[0])
+    result = stream_to_tempfile(source, screen, chunksize, prefix)
+    cache[slot] = (key, result)
+    return result
+
+
+def read_flagged(output_path, nrows=None):
+    """Read the flagged rows from an output file (empty when the upload had no rows)."""
+    if not os.path.getsize(output_path):
+        return pd.DataFrame()
+    return pd.read_csv(output_path, nrows=nrows)
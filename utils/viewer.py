@@ -0,0 +1,101 @@
+"""Paginated Result Viewer
+
+Pages show result frames through :func:`show_table` instead of passing the whole frame
+to ``st.dataframe``. Filtering, sorting and group-by summaries run on the server, and
+only the rows of the current page are sent to the browser, so multi-million-row
+results no longer freeze the tab.
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+DEFAULT_PAGE_SIZE = 100
+PAGE_SIZES = [50, 100, 250, 1000]
+
+_NONE = "(none)"
+
+
+def filter_positions(df, column, text):
+    """Return the row positions whose ``column`` contains ``text`` (case-insensitive).
+
+    Each distinct value is converted to text and tested once.
+    """
+    codes, uniques = pd.factorize(df[column])
+    matched = pd.Series(uniques.astype(str), dtype="string").str.contains(text, case=False, regex=False)
+    matched = np.append(matched.fillna(False).to_numpy(dtype=bool), False)
+    return np.flatnonzero(matched[codes])
+
+
+def sort_positions(df, positions, column, descending=False):
+    """Reorder row positions by one column, keeping ties in their original order and blanks last."""
+    keys = df[column].iloc[positions].reset_index(drop=True)
+    try:
+        keys = keys.sort_values(ascending=not descending, kind="stable", na_position="last")
+    except TypeError:
+        # Mixed text and numbers sort as text
+        keys = keys.astype("string").sort_values(ascending=not descending, kind="stable", na_position="last")
+    return positions[keys.index.to_numpy()]
+
+
+def group_summary(df, positions, column):
+    """Summarize the selected rows per value of ``column``: row count and numeric totals."""
+    numeric = [c for c in df.select_dtypes("number").columns if c != column]
+    selected = df[[column] + numeric].iloc[positions]
+    summary = selected.groupby(column, dropna=False, observed=True).agg(
+        **{"Rows": (column, "size")}, **{c: (c, "sum") for c in numeric}
+    )
+    return summary.sort_values("Rows", ascending=False).reset_index()
+
+
+def _page(total, key, page_size):
+    """Render the page picker and return the slice of rows to show."""
+    col1, col2 = st.columns([3, 1])
+    page_size = col2.selectbox("Rows per page", PAGE_SIZES, index=PAGE_SIZES.index(page_size), key=f"{key}_size")
+    pages = max(1, math.ceil(total / page_size))
+    # A narrower filter can leave the remembered page past the end
+    if st.session_state.get(f"{key}_page", 1) > pages:
+        st.session_state[f"{key}_page"] = pages
+    page = col1.number_input(f"Page (of {pages:,})", min_value=1, max_value=pages, key=f"{key}_page")
+    start = (int(page) - 1) * page_size
+    return start, min(start + page_size, total)
+
+
+def show_table(df, key, page_size=DEFAULT_PAGE_SIZE):
+    """Render ``df`` one page at a time with server-side filter, sort and group-by controls.
+
+    ``key`` keeps the widgets of several viewers on one page apart.
+    """
+    columns = [str(c) for c in df.columns]
+    df = df.set_axis(columns, axis=1)
+
+    with st.expander("🔧 Filter, sort and group"):
+        col1, col2, col3, col4 = st.columns(4)
+        filter_column = col1.selectbox("Filter column", [_NONE] + columns, key=f"{key}_filter_column")
+        filter_text = col2.text_input("Contains", key=f"{key}_filter_text", disabled=filter_column == _NONE)
+        sort_column = col3.selectbox("Sort by", [_NONE] + columns, key=f"{key}_sort_column")
+        descending = col4.checkbox("Descending", key=f"{key}_descending", disabled=sort_column == _NONE)
+        group_column = st.selectbox("Summarize by", [_NONE] + columns, key=f"{key}_group_column")
+
+    positions = np.arange(len(df))
+    if filter_column != _NONE and filter_text:
+        positions = filter_positions(df, filter_column, filter_text)
+
+    if group_column != _NONE:
+        view = group_summary(df, positions, group_column)
+        start, end = _page(len(view), key, page_size)
+        st.dataframe(view.iloc[start:end], hide_index=True)
+        noun, shown = "groups", len(view)
+    else:
+        if sort_column != _NONE:
+            positions = sort_positions(df, positions, sort_column, descending)
+        start, end = _page(len(positions), key, page_size)
+        st.dataframe(df.iloc[positions[start:end]])
+        noun, shown = "rows", len(positions)
+
+    caption = f"Showing {noun} {min(start + 1, shown):,}–{end:,} of {shown:,}"
+    if len(positions) < len(df):
+        caption += f" (filtered from {len(df):,} rows)"
+    st.caption(caption)
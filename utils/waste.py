@@ -0,0 +1,133 @@
+"""Waste Recovery Calculations
+
+Joins encounter and dispense records to measure drug waste per encounter and, when a
+price file is available, the recoverable 340B savings.
+
+Prices are per billing unit, which is not always a milligram: vials are billed per mL,
+per each or per package. An NDC package index (strength, volume, billing unit and
+package quantity) gives the milligrams in one billing unit of every NDC, so waste in mg
+converts to billable units and dollars in one vectorized step. Package sizes are kept in
+the library store and re-read only when the stored table changes.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from utils import store
+from utils.ndc import NDC_KEY, canonical_ndc, merge_on_ndc
+from utils.store import read_table, replace_table, table_version
+
+PACKAGE_TABLE = "ndc_package_index"
+
+STRENGTH = "Strength (mg/mL)"
+VOLUME = "Volume (mL)"
+BILLING_UNIT = "Billing Unit"
+PACKAGE_QUANTITY = "Package Quantity"
+MG_PER_UNIT = "mg per Billing Unit"
+
+# Billing unit spellings and the standard unit each one means
+BILLING_UNITS = {
+    "MG": "MG", "GM": "GM", "G": "GM", "ML": "ML",
+    "EA": "EA", "EACH": "EA", "UN": "EA", "UNIT": "EA", "VIAL": "EA",
+    "PKG": "PKG", "PK": "PKG", "PACKAGE": "PKG",
+}
+
+# Without a known billing unit, prices are taken as per mg
+ASSUMED_UNIT = "MG (assumed)"
+
+
+def package_index(packages):
+    """Build the NDC package index from any frame with an ``NDC`` and package columns.
+
+    Returns one row per canonical NDC with its strength, volume, billing unit, package
+    quantity and the milligrams in one billing unit. Strength is per mL for liquids and
+    per each for solids (no volume); an ``EA`` unit is one vial or each, ``PKG`` is
+    ``Package Quantity`` of them.
+    """
+    index = pd.DataFrame({"NDC": packages["NDC"], NDC_KEY: canonical_ndc(packages["NDC"]).astype(object)})
+    for column in [STRENGTH, VOLUME, PACKAGE_QUANTITY]:
+        index[column] = pd.to_numeric(packages[column], errors="coerce") if column in packages else np.nan
+    units = packages[BILLING_UNIT] if BILLING_UNIT in packages else pd.Series(pd.NA, index=packages.index)
+    index[BILLING_UNIT] = units.astype("string").str.strip().str.upper().map(BILLING_UNITS)
+
+    unit = index[BILLING_UNIT].to_numpy(dtype=object)
+    per_each = index[STRENGTH] * index[VOLUME].fillna(1)
+    index[MG_PER_UNIT] = np.select(
+        [unit == "MG", unit == "GM", unit == "ML", unit == "EA", unit == "PKG"],
+        [1.0, 1000.0, index[STRENGTH], per_each, per_each * index[PACKAGE_QUANTITY]],
+        default=np.nan,
+    )
+    return index.dropna(subset=[NDC_KEY]).drop_duplicates(NDC_KEY, keep="last").reset_index(drop=True)
+
+
+@lru_cache(maxsize=1)
+def _stored_packages(db_path, version):
+    """Read the stored package index once per database and table version."""
+    index = read_table(PACKAGE_TABLE)
+    if NDC_KEY in index.columns:
+        # Rows merged in from the CSV come last and win per NDC
+        index = index.drop_duplicates(NDC_KEY, keep="last").reset_index(drop=True)
+    return index
+
+
+def stored_packages():
+    """Return the package index kept in the library store (empty before one is saved).
+
+    Writes from any session or process, and rows merged in from the CSV, change the table
+    version, so they are picked up on the next call.
+    """
+    return _stored_packages(store.DB_PATH, table_version(PACKAGE_TABLE)).copy()
+
+
+def store_packages(packages):
+    """Merge a package-size file into the stored index (new rows win per NDC); returns its NDC count."""
+    index = package_index(packages)
+    stored = stored_packages()
+    if not stored.empty:
+        stored = stored[~stored[NDC_KEY].isin(index[NDC_KEY])]
+        index = pd.concat([stored, index], ignore_index=True)
+    replace_table(PACKAGE_TABLE, index)
+    return len(index)
+
+
+def _price_basis(merged):
+    """Return the milligrams per priced unit and how the unit was known, for every row."""
+    mg_per_unit = merged[MG_PER_UNIT].to_numpy(dtype=float) if MG_PER_UNIT in merged else np.full(len(merged), np.nan)
+    unit = merged[BILLING_UNIT].astype(object).to_numpy() if BILLING_UNIT in merged else np.full(len(merged), None)
+
+    # A vial billed per each can fall back on the dispensed vial size
+    if "Vial Size (mg)" in merged:
+        vial = merged["Vial Size (mg)"].to_numpy(dtype=float)
+        mg_per_unit = np.where((unit == "EA") & np.isnan(mg_per_unit), vial, mg_per_unit)
+
+    known = ~np.isnan(mg_per_unit)
+    return np.where(known, mg_per_unit, 1.0), np.where(known, unit, ASSUMED_UNIT)
+
+
+def waste_report(enc, disp, price=None, packages=None):
+    """Return encounter/dispense pairs with waste and, if priced, savings columns.
+
+    Package sizes come from ``packages``, else the stored package index, else any
+    package columns in ``price``; NDCs without one are priced per mg as before.
+    """
+    merged = merge_on_ndc(enc, disp, on="Encounter ID", how="inner")
+
+    merged["Waste (mg)"] = (
+        merged["Vial Size (mg)"] * merged["Vials Dispensed"]
+    ) - merged["Dose Administered (mg)"]
+
+    if price is not None:
+        merged = merge_on_ndc(merged, price[["NDC", "Unit Price ($)"]], how="left")
+
+        index = package_index(packages) if packages is not None else stored_packages()
+        if index.empty:
+            index = package_index(price)
+        merged = merge_on_ndc(merged, index[["NDC", BILLING_UNIT, MG_PER_UNIT]], how="left")
+
+        mg_per_unit, basis = _price_basis(merged)
+        merged["Price Basis"] = basis
+        merged["Billable Waste Units"] = merged["Waste (mg)"] / mg_per_unit
+        merged["Savings ($)"] = merged["Billable Waste Units"] * merged["Unit Price ($)"]
+    return merged
@@ -0,0 +1,109 @@
+"""Streaming Excel Workbook Writer
+
+Builds multi-tab workbooks from library store tables in a per-request in-memory buffer.
+Each table is read in chunks on its own thread while a constant-memory xlsxwriter
+workbook writes the rows as they arrive, so no tab is ever held whole in memory. Tabs
+longer than Excel's row limit continue on numbered sheets ("Claims (2)").
+"""
+
+import math
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+import pandas as pd
+import xlsxwriter
+
+from utils.store import count_rows, iter_table_rows, table_columns
+
+# Excel allows 1,048,576 rows per sheet, one of which is the header
+MAX_SHEET_ROWS = 1_048_575
+FETCH_ROWS = 50_000
+
+# Chunks read ahead of the writer, bounding memory while the writer catches up
+_READ_AHEAD = 8
+
+
+def part_names(sheet, parts):
+    """Return the sheet names of a tab split into ``parts`` (Excel names are at most 31 characters)."""
+    names = [sheet[:31]]
+    for part in range(2, parts + 1):
+        suffix = f" ({part})"
+        names.append(sheet[:31 - len(suffix)] + suffix)
+    return names
+
+
+def _read_table(chunks, sheet, table, filters):
+    """Queue a table's row chunks for the writer, then a final ``None`` (or the error raised)."""
+    try:
+        for rows in iter_table_rows(table, filters, FETCH_ROWS):
+            chunks.put((sheet, rows))
+        chunks.put((sheet, None))
+    except Exception as e:  # handed to the writer thread, which re-raises it
+        chunks.put((sheet, e))
+
+
+def _write_rows(state, rows, max_rows):
+    """Append rows to a tab, moving on to its next sheet at the row limit.
+
+    Rows beyond the count the sheets were sized for (appended while the workbook was
+    being written) are left out.
+    """
+    for row in rows[:max(0, state["total"] - state["written"])]:
+        part, offset = divmod(state["written"], max_rows)
+        state["parts"][part].write_row(offset + 1, 0, row)
+        state["written"] += 1
+
+
+def build_workbook(tabs, max_rows=MAX_SHEET_ROWS):
+    """Write library tables to an in-memory workbook, one tab per table.
+
+    ``tabs`` maps each tab name to a store table and its equality filters (or None).
+    Empty tables get no tab. Returns the workbook bytes and a per-tab summary of rows
+    and sheets written.
+    """
+    output = BytesIO()
+    workbook = xlsxwriter.Workbook(output, {"constant_memory": True})
+    header = workbook.add_format({"bold": True})
+
+    # Sheets are created up front, in order, so a split tab's parts sit side by side
+    sheets, summary = {}, []
+    for sheet, (table, filters) in tabs.items():
+        total = count_rows(table, filters)
+        if not total:
+            continue
+        columns = table_columns(table)
+        parts = []
+        for name in part_names(sheet, math.ceil(total / max_rows)):
+            worksheet = workbook.add_worksheet(name)
+            worksheet.write_row(0, 0, columns, header)
+            parts.append(worksheet)
+        sheets[sheet] = {"parts": parts, "written": 0, "total": total}
+        summary.append({"Tab": sheet, "Table": table, "Rows": total, "Sheets": len(parts)})
+
+    chunks = queue.Queue(maxsize=_READ_AHEAD)
+    error = None
+    with ThreadPoolExecutor(max_workers=max(1, len(sheets))) as pool:
+        for sheet in sheets:
+            table, filters = tabs[sheet]
+            pool.submit(_read_table, chunks, sheet, table, filters)
+
+        # Only this thread touches the workbook; readers keep running until drained
+        remaining = len(sheets)
+        while remaining:
+            sheet, rows = chunks.get()
+            if rows is None or isinstance(rows, Exception):
+                error = error or (rows if isinstance(rows, Exception) else None)
+                remaining -= 1
+                continue
+            if error is None:
+                # A write error stops the writing, but the queue is still drained so no
+                # reader is left blocked on a full queue
+                try:
+                    _write_rows(sheets[sheet], rows, max_rows)
+                except Exception as e:
+                    error = e
+    workbook.close()
+    if error is not None:
+        raise error
+    return output.getvalue(), pd.DataFrame(summary, columns=["Tab", "Table", "Rows", "Sheets"])